@@ -0,0 +1,112 @@
+"""Audio ensemble — Resemble Detect and HuggingFace Audio run concurrently, scores fused."""
+
+import asyncio
+import logging
+
+from adapters.hf_audio import HFAudioAdapter
+from adapters.resemble import ResembleAdapter, _convert_ogg_to_wav
+from api.schemas import AnalysisResult
+from core.config import settings
+from core.enums import MediaType, ModelUsed, Verdict
+from core.exceptions import ExternalAPIError
+from core.hedging import cancel_and_wait
+from core.memory_budget import memory_budget
+
+logger = logging.getLogger(__name__)
+
+FAKE_THRESHOLD = 0.75  # fused synthetic-speech probability → FAKE
+REAL_THRESHOLD = 0.30  # fused synthetic-speech probability → REAL
+
+
+def _decisive(result: AnalysisResult) -> bool:
+    return result.fake_score is not None and (
+        result.fake_score >= settings.audio_ensemble_decisive_fake
+        or result.fake_score <= settings.audio_ensemble_decisive_real
+    )
+
+
+def fuse(primary: AnalysisResult, secondary: AnalysisResult) -> AnalysisResult:
+    """Weighted mean of both detectors' ``fake_score``; a detector without a score is left out."""
+    weighted = [
+        (weight, result.fake_score)
+        for result, weight in (
+            (primary, settings.audio_ensemble_weight_resemble),
+            (secondary, settings.audio_ensemble_weight_hf),
+        )
+        if result.fake_score is not None and weight > 0
+    ]
+    if not weighted:
+        # Neither detector produced a score (timeouts, cold start): keep any firm verdict.
+        for result in (secondary, primary):
+            if result.verdict != Verdict.UNCERTAIN:
+                return result
+        return AnalysisResult(
+            verdict=Verdict.UNCERTAIN,
+            confidence=round((primary.confidence + secondary.confidence) / 2, 4),
+            model_used=primary.model_used,
+            explanation=f"{primary.explanation}\n---\nFallback: {secondary.explanation}",
+            media_type=MediaType.AUDIO,
+        )
+
+    score = sum(w * s for w, s in weighted) / sum(w for w, _ in weighted)
+    if score >= FAKE_THRESHOLD:
+        verdict, confidence = Verdict.FAKE, score
+    elif score <= REAL_THRESHOLD:
+        verdict, confidence = Verdict.REAL, 1 - score
+    else:
+        verdict, confidence = Verdict.UNCERTAIN, score
+
+    return AnalysisResult(
+        verdict=verdict,
+        confidence=round(confidence, 4),
+        model_used=ModelUsed.AUDIO_ENSEMBLE,
+        explanation=(
+            f"{primary.explanation}\n{secondary.explanation}\n"
+            f"Ансамбль: вероятность синтетической речи {round(score * 100)}%"
+        ),
+        media_type=MediaType.AUDIO,
+        fake_score=round(score, 4),
+    )
+
+
+class AudioEnsemble:
+    async def analyze(self, data: bytes) -> AnalysisResult:
+        # Decode once here so neither adapter runs its own ffmpeg pass.
+        wav_data = data
+        if data[:4] == b"OggS":
+            try:
+                wav_data = await _convert_ogg_to_wav(data)
+            except ExternalAPIError as exc:
+                logger.warning("Audio decode failed (%s), HF Audio only", exc.detail)
+                return await HFAudioAdapter().analyze(data)
+
+        async with memory_budget.hold(len(wav_data) if wav_data is not data else 0, "decode"):
+            return await self._run(wav_data)
+
+    async def _run(self, wav_data: bytes) -> AnalysisResult:
+        primary = asyncio.ensure_future(ResembleAdapter().analyze(wav_data))
+        secondary = asyncio.ensure_future(HFAudioAdapter().analyze(wav_data))
+        try:
+            await asyncio.wait({primary, secondary}, return_when=asyncio.FIRST_COMPLETED)
+            if primary.done() and not secondary.done():
+                if primary.exception() is None and _decisive(primary.result()):
+                    return primary.result()
+            await asyncio.wait({primary, secondary})
+            return self._combine(primary, secondary)
+        finally:
+            await cancel_and_wait(secondary)
+            await cancel_and_wait(primary)
+
+    @staticmethod
+    def _combine(primary: asyncio.Task, secondary: asyncio.Task) -> AnalysisResult:
+        primary_error = primary.exception()
+        if primary_error is not None:
+            if not isinstance(primary_error, ExternalAPIError):
+                raise primary_error
+            return secondary.result()  # raises the HF error too if both failed
+        if secondary.exception() is not None:
+            logger.warning("HF Audio failed in ensemble: %s", secondary.exception())
+            return primary.result()
+        if _decisive(primary.result()):
+            return primary.result()
+        return fuse(primary.result(), secondary.result())
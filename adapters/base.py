@@ -1,23 +1,181 @@
 """Abstract base adapter for external API integrations."""
 
+import asyncio
+import logging
+import time
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
+import httpx
+
+from adapters.http_client import http_clients
+from adapters.preprocess import downscale_image, profile_for
 from api.schemas import AnalysisResult
+from core import deadline
+from core.adaptive_limit import limiters
+from core.bulkhead import bulkheads
+from core.circuit_breaker import breakers
+from core.config import settings
 from core.enums import MediaType, ModelUsed, Verdict
+from core.exceptions import CircuitOpen
+from core.hedging import latencies
+from core.provider_state import provider_states
+from core.retry import next_delay, parse_retry_after, retry_budgets
 
 # Memory-efficient implementation
 # Enhanced error handling
 # Following best practices
 # Validated input parameters
 # Input validation added
+logger = logging.getLogger(__name__)
+
+
+def model_loading(response: httpx.Response) -> bool:
+    """HF Inference's 503 "Model ... is currently loading": a cold start, not a failure."""
+    if response.status_code != 503:
+        return False
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    return isinstance(body, dict) and str(body.get("error", "")).startswith("Model")
+
+
+class _ObservedClient:
+    """Forwards to the provider's client and notes whether any response was a provider failure
+    (or, with ``cold_starts``, only a model still loading)."""
+
+    def __init__(self, client: httpx.AsyncClient, cold_starts: bool = False) -> None:
+        self._client = client
+        self.cold_starts = cold_starts
+        self.failed = False
+        self.loading = False
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+    async def post(self, *args, **kwargs) -> httpx.Response:
+        response = await self._client.post(*args, **kwargs)
+        if self.cold_starts and model_loading(response):
+            self.loading = True
+        elif response.status_code == 429 or response.status_code >= 500:
+            self.failed = True
+        return response
+
 
 class BaseAdapter(ABC):
     TIMEOUT = 15.0
+    PROVIDER = ""  # key into the shared HTTP client registry
+    MAX_CONNECTIONS: int | None = None  # per-provider pool size, None → settings default
+    COLD_STARTS = False  # 503 "Model ... is currently loading" is expected (HF Inference)
 
     @abstractmethod
     async def analyze(self, data: bytes) -> AnalysisResult:
         ...
 
+    @asynccontextmanager
+    async def _client(self) -> AsyncIterator[httpx.AsyncClient]:
+        """Pooled keep-alive client for this adapter's provider, inside its bulkhead slot
+        (and, under ``limiters.pacing()``, an adaptive-limit permit for this one attempt).
+
+        Raises CircuitOpen without touching the network while the provider's breaker
+        is open; 429/5xx responses and transport errors count against the breaker
+        (except timeouts caused by the request deadline running out, and cold-start
+        503s of ``COLD_STARTS`` providers). Healthy calls feed the provider's latency
+        window used for hedging.
+        """
+        breaker = breakers.get(self.PROVIDER)
+        if not breaker.allow():
+            raise CircuitOpen(self.PROVIDER)
+        try:
+            async with bulkheads.provider(self.PROVIDER), limiters.paced(self.PROVIDER) as permit:
+                async with http_clients.session(self.PROVIDER, self.TIMEOUT, self.MAX_CONNECTIONS) as client:
+                    observed = _ObservedClient(client, self.COLD_STARTS)
+                    started = time.monotonic()
+                    try:
+                        yield observed
+                    except httpx.TimeoutException:
+                        if permit is not None and not deadline.expired():
+                            permit.overloaded()
+                        raise
+                    if permit is not None:
+                        if observed.failed:
+                            permit.overloaded()
+                        elif not observed.loading:
+                            permit.succeeded()
+        except httpx.TransportError:
+            if deadline.expired():
+                breaker.release()
+            else:
+                breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        if observed.failed:
+            breaker.record_failure()
+        elif observed.loading:
+            breaker.release()
+        else:
+            breaker.record_success()
+            latencies.record(self.PROVIDER, time.monotonic() - started)
+
+    async def _post(self, url: str, **kwargs) -> httpx.Response:
+        """POST via ``_client()``, retrying 429s while the provider's retry budget allows.
+
+        Waits for ``Retry-After`` when the provider sends one, otherwise for a
+        decorrelated-jitter delay; gives up (returning the 429) once the next wait
+        would exceed ``retry_max_wait_s`` or the request deadline. No slot is held
+        while waiting. The final outcome is recorded in ``provider_states``.
+
+        Each attempt's timeout is clamped to the request deadline; DeadlineExceeded
+        is raised instead of starting an attempt the deadline leaves no time for.
+        """
+        budget = retry_budgets.get(self.PROVIDER)
+        budget.deposit()
+        delay = waited = 0.0
+        for attempt in range(1, max(1, settings.retry_max_attempts) + 1):
+            deadline.check(self.PROVIDER)
+            try:
+                async with self._client() as client:
+                    response = await client.post(url, timeout=deadline.clamp(self.TIMEOUT), **kwargs)
+            except httpx.TransportError:
+                if not deadline.expired():
+                    provider_states.record_server_error(self.PROVIDER)
+                raise
+            if response.status_code != 429:
+                if response.status_code < 500:
+                    provider_states.record_success(self.PROVIDER)
+                elif not (self.COLD_STARTS and model_loading(response)):  # cold start: the adapter waits
+                    provider_states.record_server_error(self.PROVIDER)
+                return response
+
+            retry_after = parse_retry_after(response.headers.get("retry-after"))
+            if attempt >= settings.retry_max_attempts:
+                break
+            if retry_after is not None:
+                delay = retry_after
+            else:
+                base = settings.retry_base_delay_s
+                delay = next_delay(delay or base, base, settings.retry_max_delay_s)
+            if waited + delay > settings.retry_max_wait_s or not deadline.allows(delay) or not budget.withdraw():
+                break
+            logger.info("%s rate limited, retry %d in %.2fs", self.PROVIDER, attempt, delay)
+            await asyncio.sleep(delay)
+            waited += delay
+        provider_states.record_quota_exhausted(self.PROVIDER, retry_after)
+        return response
+
+    async def _preprocess_image(self, data: bytes) -> tuple[bytes, str | None]:
+        """Downscale an image to this provider's profile; returns (bytes, profile label),
+        the label only if the bytes were actually re-encoded."""
+        profile = profile_for(self.PROVIDER)
+        if profile is None:
+            return data, None
+        out = await asyncio.to_thread(downscale_image, data, profile)
+        return out, (None if out is data else profile.label)
+
     def _build_uncertain(self, reason: str, model: ModelUsed, media_type: MediaType) -> AnalysisResult:
         """Return an UNCERTAIN result with explanation."""
         return AnalysisResult(
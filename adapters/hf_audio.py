@@ -2,15 +2,15 @@
 
 import asyncio
 import logging
-import subprocess
 
 import httpx
 
 from adapters.base import BaseAdapter
+from adapters.media_tools import OGG_TO_WAV_ARGS, run_media_tool
 from api.schemas import AnalysisResult
+from core import deadline
 from core.config import settings
 from core.enums import MediaType, ModelUsed, Verdict
-from core.exceptions import ExternalAPIError
 
 logger = logging.getLogger(__name__)
 
@@ -20,29 +20,24 @@ COLD_START_DELAY = 10
 
 
 class HFAudioAdapter(BaseAdapter):
+    PROVIDER = "hf_audio"
+    COLD_STARTS = True
+
     async def analyze(self, data: bytes) -> AnalysisResult:
         # Ensure WAV format (convert OGG if needed)
         wav_data = data
         if data[:4] == b"OggS":
-            try:
-                proc = subprocess.run(
-                    ["ffmpeg", "-i", "pipe:0", "-f", "wav", "-acodec", "pcm_s16le", "pipe:1"],
-                    input=data,
-                    capture_output=True,
-                )
-                if proc.returncode == 0:
-                    wav_data = proc.stdout
-                else:
-                    logger.warning("ffmpeg conversion failed, sending raw data")
-            except FileNotFoundError:
-                raise ExternalAPIError("ffmpeg", "FFmpeg не установлен")
+            proc = await run_media_tool(OGG_TO_WAV_ARGS, input=data)
+            if proc.returncode == 0:
+                wav_data = proc.stdout
+            else:
+                logger.warning("ffmpeg conversion failed, sending raw data")
 
         headers = {"Authorization": f"Bearer {settings.hf_api_token}"}
 
         for attempt in range(MAX_RETRIES + 1):
             try:
-                async with httpx.AsyncClient(timeout=self.TIMEOUT) as client:
-                    response = await client.post(MODEL_URL, headers=headers, content=wav_data)
+                response = await self._post(MODEL_URL, headers=headers, content=wav_data)
             except httpx.TimeoutException:
                 return self._build_uncertain(
                     "HuggingFace Audio: таймаут запроса.",
@@ -53,7 +48,8 @@ class HFAudioAdapter(BaseAdapter):
             body = response.json()
 
             if isinstance(body, dict) and body.get("error", "").startswith("Model"):
-                if attempt < MAX_RETRIES:
+                # Not worth waiting for if the request deadline would run out meanwhile
+                if attempt < MAX_RETRIES and deadline.allows(COLD_START_DELAY):
                     logger.info("HF Audio model loading, retry in %ds...", COLD_START_DELAY)
                     await asyncio.sleep(COLD_START_DELAY)
                     continue
@@ -87,6 +83,7 @@ class HFAudioAdapter(BaseAdapter):
             verdict = Verdict.UNCERTAIN
 
         explanation = f"HuggingFace Audio: {label} с уверенностью {round(score * 100)}%"
+        fake_score = {"spoof": score, "bonafide": 1 - score}.get(label)
 
         return AnalysisResult(
             verdict=verdict,
@@ -94,4 +91,5 @@ class HFAudioAdapter(BaseAdapter):
             model_used=ModelUsed.HF_AUDIO,
             explanation=explanation,
             media_type=MediaType.AUDIO,
+            fake_score=round(fake_score, 4) if fake_score is not None else None,
         )
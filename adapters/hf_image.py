@@ -7,6 +7,7 @@ import httpx
 
 from adapters.base import BaseAdapter
 from api.schemas import AnalysisResult
+from core import deadline
 from core.config import settings
 from core.enums import MediaType, ModelUsed, Verdict
 
@@ -21,13 +22,16 @@ COLD_START_DELAY = 10
 
 
 class HFImageAdapter(BaseAdapter):
+    PROVIDER = "hf_image"
+    COLD_STARTS = True
+
     async def analyze(self, data: bytes) -> AnalysisResult:
+        data, preprocessing = await self._preprocess_image(data)
         headers = {"Authorization": f"Bearer {settings.hf_api_token}"}
 
         for attempt in range(MAX_RETRIES + 1):
             try:
-                async with httpx.AsyncClient(timeout=self.TIMEOUT) as client:
-                    response = await client.post(MODEL_URL, headers=headers, content=data)
+                response = await self._post(MODEL_URL, headers=headers, content=data)
             except httpx.TimeoutException:
                 return self._build_uncertain(
                     "HuggingFace Image: таймаут запроса.",
@@ -39,7 +43,8 @@ class HFImageAdapter(BaseAdapter):
 
             # Handle cold start
             if isinstance(body, dict) and body.get("error", "").startswith("Model"):
-                if attempt < MAX_RETRIES:
+                # Not worth waiting for if the request deadline would run out meanwhile
+                if attempt < MAX_RETRIES and deadline.allows(COLD_START_DELAY):
                     logger.info("HF Image model loading, retry in %ds...", COLD_START_DELAY)
                     await asyncio.sleep(COLD_START_DELAY)
                     continue
@@ -75,4 +80,5 @@ class HFImageAdapter(BaseAdapter):
             model_used=ModelUsed.HF_IMAGE,
             explanation=explanation,
             media_type=MediaType.IMAGE,
+            preprocessing=preprocessing,
         )
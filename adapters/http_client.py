@@ -0,0 +1,93 @@
+"""Process-wide pooled httpx clients shared by all adapters."""
+
+import importlib.util
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import httpx
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class HTTPClientRegistry:
+    """One keep-alive ``httpx.AsyncClient`` per provider, opened for the app lifespan.
+
+    Outside of ``lifespan()`` (scripts, tests) ``session()`` falls back to a
+    short-lived client per call, so adapters work the same either way.
+    """
+
+    def __init__(self) -> None:
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._started = False
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    async def start(self) -> None:
+        self._started = True
+        logger.info("HTTP client registry started (http2=%s)", self._use_http2())
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        self._started = False
+        for provider, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Failed to close HTTP client for %s: %s", provider, exc)
+
+    @asynccontextmanager
+    async def lifespan(self) -> AsyncIterator["HTTPClientRegistry"]:
+        await self.start()
+        try:
+            yield self
+        finally:
+            await self.aclose()
+
+    @asynccontextmanager
+    async def session(
+        self,
+        provider: str,
+        timeout: float,
+        max_connections: int | None = None,
+    ) -> AsyncIterator[httpx.AsyncClient]:
+        """Yield the pooled client for ``provider`` (or a one-shot client if not started)."""
+        if not self._started:
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                yield client
+            return
+
+        client = self._clients.get(provider)
+        if client is None:
+            client = self._create(provider, timeout, max_connections)
+            self._clients[provider] = client
+        yield client
+
+    def _create(self, provider: str, timeout: float, max_connections: int | None) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=max_connections or settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_s,
+        )
+        logger.info("Opening pooled HTTP client for %s (max_connections=%s)", provider, limits.max_connections)
+        return httpx.AsyncClient(timeout=timeout, limits=limits, http2=self._use_http2())
+
+    @staticmethod
+    def _use_http2() -> bool:
+        if not settings.http2_enabled:
+            return False
+        if not _http2_available():
+            logger.warning("HTTP/2 requested but 'h2' is not installed, using HTTP/1.1")
+            return False
+        return True
+
+
+http_clients = HTTPClientRegistry()
@@ -0,0 +1,161 @@
+"""Non-blocking ffmpeg/ffprobe execution on asyncio subprocesses."""
+
+import asyncio
+import contextlib
+import logging
+import weakref
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+
+from core import deadline
+from core.cancellation import abandoned, cancellations
+from core.config import settings
+from core.exceptions import DeadlineExceeded, ExternalAPIError
+
+logger = logging.getLogger(__name__)
+
+FFMPEG_MISSING = "FFmpeg не установлен. Установите с https://ffmpeg.org/download.html"
+STREAM_CHUNK_SIZE = 64 * 1024
+MAX_STDERR_BYTES = 64 * 1024
+
+OGG_TO_WAV_ARGS = ["ffmpeg", "-i", "pipe:0", "-f", "wav", "-acodec", "pcm_s16le", "pipe:1"]
+
+# One cap per event loop: the Appwrite entrypoint runs each call in a fresh loop.
+_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+@dataclass
+class MediaToolResult:
+    returncode: int
+    stdout: bytes
+    stderr: bytes
+
+
+def _limit() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = _limits.get(loop)
+    if sem is None:
+        sem = asyncio.Semaphore(settings.ffmpeg_max_concurrency)
+        _limits[loop] = sem
+    return sem
+
+
+async def _spawn(args: list[str]) -> asyncio.subprocess.Process:
+    try:
+        return await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except FileNotFoundError:
+        raise ExternalAPIError("ffmpeg", FFMPEG_MISSING)
+
+
+def _timed_out(tool: str, timeout: float) -> ExternalAPIError:
+    if deadline.expired():
+        logger.warning("%s stopped: request deadline reached", tool)
+        return DeadlineExceeded("ffmpeg")
+    logger.error("%s timed out after %.1fs", tool, timeout)
+    return ExternalAPIError("ffmpeg", "timeout")
+
+
+async def _kill(proc: asyncio.subprocess.Process) -> None:
+    if proc.returncode is None:
+        with contextlib.suppress(ProcessLookupError):
+            proc.kill()
+        with contextlib.suppress(Exception):
+            await proc.wait()
+
+
+async def run_media_tool(
+    args: list[str],
+    input: bytes | None = None,
+    timeout: float | None = None,
+) -> MediaToolResult:
+    """Run ``args`` feeding ``input`` on stdin; the process is killed on timeout or cancel.
+
+    The timeout is clamped to the request deadline (DeadlineExceeded when it runs out).
+    """
+    timeout = settings.ffmpeg_timeout_s if timeout is None else timeout
+    async with _limit():
+        deadline.check("ffmpeg")
+        timeout = deadline.clamp(timeout)
+        proc = await _spawn(args)
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(input), timeout)
+        except asyncio.TimeoutError:
+            await _kill(proc)
+            raise _timed_out(args[0], timeout)
+        except BaseException as exc:
+            if proc.returncode is None and abandoned(exc):
+                cancellations.record("ffmpeg")
+            await _kill(proc)
+            raise
+    return MediaToolResult(returncode=proc.returncode, stdout=stdout, stderr=stderr)
+
+
+async def stream_media_tool(
+    args: list[str],
+    input: bytes | None = None,
+    timeout: float | None = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """Yield stdout chunks as the tool produces them, writing ``input`` concurrently.
+
+    Raises ExternalAPIError on timeout or a non-zero exit code (DeadlineExceeded
+    when the request deadline cuts it short). Closing the generator early (or
+    cancelling its consumer) kills the process.
+    """
+    timeout = settings.ffmpeg_timeout_s if timeout is None else timeout
+    loop = asyncio.get_running_loop()
+    stderr_buf = bytearray()
+
+    async def _feed() -> None:
+        try:
+            if input:
+                proc.stdin.write(input)
+                await proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # tool stopped reading (e.g. ffprobe got what it needed)
+        finally:
+            with contextlib.suppress(Exception):
+                proc.stdin.close()
+
+    async def _drain_stderr() -> None:
+        while chunk := await proc.stderr.read(STREAM_CHUNK_SIZE):
+            if len(stderr_buf) < MAX_STDERR_BYTES:
+                stderr_buf.extend(chunk)
+
+    async with _limit():
+        deadline.check("ffmpeg")
+        timeout = deadline.clamp(timeout)
+        stop_at = loop.time() + timeout
+        proc = await _spawn(args)
+        helpers = [asyncio.create_task(_feed()), asyncio.create_task(_drain_stderr())]
+        try:
+            while True:
+                remaining = stop_at - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                chunk = await asyncio.wait_for(proc.stdout.read(chunk_size), remaining)
+                if not chunk:
+                    break
+                yield chunk
+            await asyncio.wait_for(proc.wait(), max(stop_at - loop.time(), 0.1))
+            await asyncio.wait_for(asyncio.gather(*helpers), max(stop_at - loop.time(), 0.1))
+        except asyncio.TimeoutError:
+            raise _timed_out(args[0], timeout)
+        except (asyncio.CancelledError, GeneratorExit) as exc:
+            if proc.returncode is None and abandoned(exc):
+                cancellations.record("ffmpeg")  # consumer's caller went away mid-stream
+            raise
+        finally:
+            await _kill(proc)
+            for task in helpers:
+                task.cancel()
+            await asyncio.gather(*helpers, return_exceptions=True)
+
+    if proc.returncode != 0:
+        logger.error("%s exited with %s: %s", args[0], proc.returncode, stderr_buf.decode(errors="replace"))
+        raise ExternalAPIError("ffmpeg", f"exit_code={proc.returncode}")
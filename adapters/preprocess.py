@@ -0,0 +1,68 @@
+"""Provider-aware image/frame downscaling before upload."""
+
+import io
+import logging
+from dataclasses import dataclass
+
+from PIL import Image, UnidentifiedImageError
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PreprocessProfile:
+    """Largest side (px) and JPEG quality a provider actually benefits from."""
+
+    provider: str
+    max_side: int
+    jpeg_quality: int
+
+    @property
+    def label(self) -> str:
+        return f"{self.provider}:{self.max_side}px/q{self.jpeg_quality}"
+
+    @property
+    def mjpeg_qscale(self) -> int:
+        """Map JPEG quality (1..100) onto ffmpeg's mjpeg ``-q:v`` scale (2 best .. 31 worst)."""
+        return max(2, min(31, round(2 + (100 - self.jpeg_quality) * 29 / 100)))
+
+
+def profile_for(provider: str) -> PreprocessProfile | None:
+    if not settings.image_preprocess_enabled:
+        return None
+    if provider == "sightengine":
+        return PreprocessProfile(provider, settings.sightengine_max_side, settings.sightengine_jpeg_quality)
+    if provider == "hf_image":
+        return PreprocessProfile(provider, settings.hf_image_max_side, settings.hf_image_jpeg_quality)
+    return None
+
+
+def downscale_image(data: bytes, profile: PreprocessProfile) -> bytes:
+    """Shrink ``data`` to fit ``profile`` and re-encode as JPEG; returns the input unchanged
+    if it already fits (or can't be decoded, so the provider still gets to decide)."""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            if max(img.size) <= profile.max_side:
+                return data
+            img.draft("RGB", (profile.max_side, profile.max_side))
+            img = img.convert("RGB")
+            img.thumbnail((profile.max_side, profile.max_side), Image.Resampling.BILINEAR)
+            out = io.BytesIO()
+            img.save(out, "JPEG", quality=profile.jpeg_quality)
+    except (UnidentifiedImageError, OSError, ValueError) as exc:
+        logger.debug("downscale skipped: %s", exc)
+        return data
+    resized = out.getvalue()
+    return resized if len(resized) < len(data) else data
+
+
+def downscaled_to(frame: bytes, profile: PreprocessProfile) -> bool:
+    """Whether a frame out of the video filter graph was shrunk to ``profile`` (its
+    longest side reached the cap); smaller sources pass the scale filter unchanged."""
+    try:
+        with Image.open(io.BytesIO(frame)) as img:
+            return max(img.size) >= profile.max_side
+    except (UnidentifiedImageError, OSError, ValueError):
+        return False
@@ -1,15 +1,16 @@
 """Resemble Detect adapter — audio deepfake detection."""
 
 import logging
-import subprocess
 
 import httpx
 
 from adapters.base import BaseAdapter
+from adapters.media_tools import OGG_TO_WAV_ARGS, run_media_tool
 from api.schemas import AnalysisResult
 from core.config import settings
 from core.enums import MediaType, ModelUsed, Verdict
 from core.exceptions import ExternalAPIError
+from core.memory_budget import memory_budget
 
 # Improved type safety
 # Thread-safe operation
@@ -17,17 +18,10 @@ from core.exceptions import ExternalAPIError
 logger = logging.getLogger(__name__)
 
 
-def _convert_ogg_to_wav(ogg_bytes: bytes) -> bytes:
+async def _convert_ogg_to_wav(ogg_bytes: bytes) -> bytes:
     """Convert OGG bytes to WAV bytes using ffmpeg (in-memory, no disk I/O)."""
-    try:
-        proc = subprocess.run(
-            ["ffmpeg", "-i", "pipe:0", "-f", "wav", "-acodec", "pcm_s16le", "pipe:1"],
-            input=ogg_bytes,
-            capture_output=True,
-        )
-    except FileNotFoundError:
-        raise ExternalAPIError("ffmpeg", "FFmpeg не установлен. Установите с https://ffmpeg.org/download.html")
-    
+    proc = await run_media_tool(OGG_TO_WAV_ARGS, input=ogg_bytes)
+
     if proc.returncode != 0:
         logger.error("ffmpeg OGG->WAV conversion failed: %s", proc.stderr.decode(errors="replace"))
         raise ExternalAPIError("resemble", "audio_conversion_failed")
@@ -36,16 +30,18 @@ def _convert_ogg_to_wav(ogg_bytes: bytes) -> bytes:
 
 class ResembleAdapter(BaseAdapter):
     URL = "https://detect.resemble.ai/api/v1/detect"
+    PROVIDER = "resemble"
 
     async def analyze(self, data: bytes) -> AnalysisResult:
         # Convert OGG to WAV if needed (Telegram voice messages come as OGG)
         wav_data = data
         if data[:4] == b"OggS":
-            wav_data = _convert_ogg_to_wav(data)
+            wav_data = await _convert_ogg_to_wav(data)
 
+        # Only a WAV decoded here is charged; the upload itself is charged at the door.
         try:
-            async with httpx.AsyncClient(timeout=self.TIMEOUT) as client:
-                response = await client.post(
+            async with memory_budget.hold(len(wav_data) if wav_data is not data else 0, "decode"):
+                response = await self._post(
                     self.URL,
                     headers={"Authorization": f"Token {settings.resemble_api_key}"},
                     files={"audio_file": ("audio.wav", wav_data, "audio/wav")},
@@ -83,4 +79,5 @@ class ResembleAdapter(BaseAdapter):
             model_used=ModelUsed.RESEMBLE,
             explanation=explanation,
             media_type=MediaType.AUDIO,
+            fake_score=round(score, 4),
         )
@@ -20,6 +20,7 @@ MAX_TEXT_LENGTH = 10_000
 
 class SaplingAdapter(BaseAdapter):
     URL = "https://api.sapling.ai/api/v1/aidetect"
+    PROVIDER = "sapling"
 
     async def analyze(self, data: bytes) -> AnalysisResult:
         text = data.decode("utf-8", errors="replace").strip()
@@ -41,8 +42,7 @@ class SaplingAdapter(BaseAdapter):
         payload = {"key": settings.sapling_api_key, "text": text}
 
         try:
-            async with httpx.AsyncClient(timeout=self.TIMEOUT) as client:
-                response = await client.post(self.URL, json=payload)
+            response = await self._post(self.URL, json=payload)
         except httpx.TimeoutException:
             return self._build_uncertain(
                 "Sapling AI: таймаут запроса.",
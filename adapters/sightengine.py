@@ -17,19 +17,21 @@ logger = logging.getLogger(__name__)
 
 class SightengineAdapter(BaseAdapter):
     URL = "https://api.sightengine.com/1.0/check.json"
+    PROVIDER = "sightengine"
+    MAX_CONNECTIONS = 10  # video frames fan out to this provider
 
     async def analyze(self, data: bytes) -> AnalysisResult:
+        data, preprocessing = await self._preprocess_image(data)
         try:
-            async with httpx.AsyncClient(timeout=self.TIMEOUT) as client:
-                response = await client.post(
-                    self.URL,
-                    data={
-                        "api_user": settings.sightengine_api_user,
-                        "api_secret": settings.sightengine_api_secret,
-                        "models": "genai",
-                    },
-                    files={"media": ("image.jpg", data, "image/jpeg")},
-                )
+            response = await self._post(
+                self.URL,
+                data={
+                    "api_user": settings.sightengine_api_user,
+                    "api_secret": settings.sightengine_api_secret,
+                    "models": "genai",
+                },
+                files={"media": ("image.jpg", data, "image/jpeg")},
+            )
         except httpx.TimeoutException:
             return self._build_uncertain(
                 "SightEngine: таймаут запроса, результат неопределён.",
@@ -63,4 +65,5 @@ class SightengineAdapter(BaseAdapter):
             model_used=ModelUsed.SIGHTENGINE,
             explanation=explanation,
             media_type=MediaType.IMAGE,
+            preprocessing=preprocessing,
         )
@@ -1,79 +1,409 @@
 """Video analysis pipeline — FFmpeg frame extraction + SightEngine per-frame analysis."""
 
 import asyncio
+import contextlib
 import logging
-import subprocess
+import math
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
 
 import ffmpeg
 
 from adapters.base import BaseAdapter
+from adapters.media_tools import FFMPEG_MISSING, run_media_tool, stream_media_tool
+from adapters.preprocess import downscaled_to, profile_for
 from api.schemas import AnalysisResult
+from core import deadline
+from core.adaptive_limit import limiters
+from core.cancellation import STOPPED
 from core.config import settings
 from core.enums import MediaType, ModelUsed, Verdict
 from core.exceptions import ExternalAPIError, FileTooLarge, VideoTooLong
+from core.hedging import cancel_and_wait
+from core.memory_budget import memory_budget
+from core.phash import hamming, phash
+from core.provider_state import provider_states
 
 # Output normalization applied
 logger = logging.getLogger(__name__)
 
 MAX_VIDEO_FILE_SIZE = 50 * 1024 * 1024  # 50 MB
-CONCURRENT_LIMIT = 5  # max concurrent SightEngine requests
+FAKE_FRAME_SCORE = 0.75  # per-frame fakeness counted as suspicious
+REAL_FRAME_SCORE = 0.35  # per-frame fakeness counted as authentic
+FAKE_RATIO_THRESHOLD = 0.40
+REAL_RATIO_THRESHOLD = 0.10
+PROVIDER_UNAVAILABLE = ("rate_limit", "server_error", "circuit_open")  # move frames to the fallback
+JPEG_SOI = b"\xff\xd8"
+JPEG_EOI = b"\xff\xd9"
 
 
-def _get_duration(video_bytes: bytes) -> float:
+async def _get_duration(video_bytes: bytes) -> float:
     """Get video duration in seconds using ffprobe via stdin."""
+    proc = await run_media_tool(
+        [
+            "ffprobe",
+            "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1",
+            "-i", "pipe:0",
+        ],
+        input=video_bytes,
+    )
     try:
-        proc = subprocess.run(
-            [
-                "ffprobe",
-                "-v", "error",
-                "-show_entries", "format=duration",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                "-i", "pipe:0",
-            ],
-            input=video_bytes,
-            capture_output=True,
-        )
         return float(proc.stdout.decode().strip())
-    except FileNotFoundError:
-        raise ExternalAPIError("ffmpeg", "FFmpeg не установлен. Установите с https://ffmpeg.org/download.html")
-    except (ValueError, AttributeError):
+    except ValueError:
         logger.warning("Could not determine video duration, assuming 0")
         return 0.0
 
 
-def _extract_frames(video_bytes: bytes) -> list[bytes]:
-    """Extract 1 frame per second as JPEG bytes using ffmpeg (in-memory, no disk I/O)."""
-    try:
-        out, _ = (
-            ffmpeg
-            .input("pipe:0")
-            .filter("fps", fps=settings.video_frame_sample_rate)
-            .output("pipe:1", format="image2", vcodec="mjpeg")
-            .run(input=video_bytes, capture_stdout=True, capture_stderr=True)
+def _frame_cap(duration: float) -> int:
+    """Most frames ``_frame_extraction_args(duration)`` lets ffmpeg emit (its ``-frames:v``)."""
+    cap = max(int(settings.max_video_duration_seconds * settings.video_frame_sample_rate), 1)
+    mode = settings.video_sampling_mode
+    if mode == "budget" and duration > 0:
+        return settings.video_frame_budget
+    if mode in ("keyframes", "scene") or duration <= 0:
+        return cap
+    return min(cap, math.ceil(duration * settings.video_frame_sample_rate) + 1)
+
+
+def _expected_frames(duration: float) -> int | None:
+    """How many frames ffmpeg will actually emit, if the mode and duration tell.
+
+    The fps filter emits ``round(duration * rate)``; key frames and cuts are unknown.
+    """
+    mode = settings.video_sampling_mode
+    if duration <= 0 or mode in ("keyframes", "scene"):
+        return None
+    if mode == "budget":
+        return settings.video_frame_budget
+    return min(_frame_cap(duration), math.floor(duration * settings.video_frame_sample_rate + 0.5))
+
+
+def _frame_extraction_args(duration: float) -> list[str]:
+    """Build the ffmpeg command for the configured ``video_sampling_mode``.
+
+    - ``fps``: fixed ``video_frame_sample_rate`` frames per second (default);
+    - ``keyframes``: decode key frames only (``-skip_frame nokey``), much cheaper to decode;
+    - ``scene``: first frame plus every frame whose scene score exceeds ``video_scene_threshold``;
+    - ``budget``: ``video_frame_budget`` frames spread uniformly over the duration.
+
+    In ``keyframes``/``scene`` mode with a known duration, picks are kept at least
+    ``duration / cap`` seconds apart so the frame cap covers the whole clip
+    instead of truncating it to the first key frames or cuts.
+    """
+    mode = settings.video_sampling_mode
+    max_frames = _frame_cap(duration)
+    output_kwargs: dict = {"format": "image2pipe", "vcodec": "mjpeg"}
+    spacing = None
+    if mode in ("keyframes", "scene") and duration > 0:
+        spacing = f"gte(t-prev_selected_t,{duration / max_frames:.3f})"
+
+    if mode == "keyframes":
+        stream = ffmpeg.input("pipe:0", skip_frame="nokey")
+        if spacing:
+            stream = stream.filter("select", f"isnan(prev_selected_t)+{spacing}")
+        output_kwargs["vsync"] = "vfr"
+    elif mode == "scene":
+        cut = f"gt(scene,{settings.video_scene_threshold})"
+        if spacing:
+            cut = f"{cut}*{spacing}"
+        stream = ffmpeg.input("pipe:0").filter("select", f"eq(n,0)+{cut}")
+        output_kwargs["vsync"] = "vfr"
+    elif mode == "budget" and duration > 0:
+        stream = ffmpeg.input("pipe:0").filter("fps", fps=f"{max_frames}/{duration:.3f}")
+    else:
+        if mode not in ("fps", "budget"):
+            logger.warning("Unknown video_sampling_mode=%r, using fixed fps", mode)
+        stream = ffmpeg.input("pipe:0").filter("fps", fps=settings.video_frame_sample_rate)
+
+    # Downscale inside the filter graph to what the primary frame provider needs
+    profile = profile_for("sightengine")
+    if profile is not None:
+        stream = stream.filter(
+            "scale",
+            f"min(iw,{profile.max_side})",
+            f"min(ih,{profile.max_side})",
+            force_original_aspect_ratio="decrease",
         )
-    except FileNotFoundError:
-        raise ExternalAPIError("ffmpeg", "FFmpeg не установлен. Установите с https://ffmpeg.org/download.html")
-    except ffmpeg.Error as exc:
-        logger.error("ffmpeg frame extraction error: %s", exc.stderr.decode(errors="replace") if exc.stderr else exc)
-        return []
-
-    # Split output into individual JPEG frames by SOI (FF D8) and EOI (FF D9) markers
-    frames: list[bytes] = []
-    soi = b"\xff\xd8"
-    eoi = b"\xff\xd9"
-
-    start = 0
-    while True:
-        s = out.find(soi, start)
-        if s == -1:
-            break
-        e = out.find(eoi, s)
-        if e == -1:
-            break
-        frames.append(out[s : e + 2])
-        start = e + 2
-
-    return frames
+        output_kwargs["q:v"] = profile.mjpeg_qscale
+
+    output_kwargs["frames:v"] = max_frames  # safety bound; spacing above already fits it
+    return stream.output("pipe:1", **output_kwargs).global_args("-v", "error").compile()
+
+
+async def _iter_frames(video_bytes: bytes, duration: float = 0.0) -> AsyncIterator[bytes]:
+    """Yield sampled frames as JPEG bytes as soon as ffmpeg writes them (in-memory, no disk I/O)."""
+    args = _frame_extraction_args(duration)
+
+    # Split the MJPEG stream into frames by SOI (FF D8) and EOI (FF D9) markers
+    buf = bytearray()
+    scan_from = 0
+    try:
+        async with contextlib.aclosing(stream_media_tool(args, input=video_bytes)) as chunks:
+            async for chunk in chunks:
+                buf.extend(chunk)
+                while True:
+                    s = buf.find(JPEG_SOI)
+                    if s == -1:
+                        del buf[:-1]  # keep a trailing FF in case the marker straddles chunks
+                        scan_from = 0
+                        break
+                    e = buf.find(JPEG_EOI, max(s + 2, scan_from))
+                    if e == -1:
+                        del buf[:s]
+                        scan_from = max(len(buf) - 1, 0)
+                        break
+                    yield bytes(buf[s : e + 2])
+                    del buf[: e + 2]
+                    scan_from = 0
+    except ExternalAPIError as exc:
+        if exc.detail == FFMPEG_MISSING:
+            raise
+        logger.error("ffmpeg frame extraction error: %s", exc.detail)
+
+
+async def _extract_frames(video_bytes: bytes, duration: float = 0.0) -> list[bytes]:
+    """Extract all sampled frames at once (see ``_iter_frames`` for the streaming form)."""
+    return [frame async for frame in _iter_frames(video_bytes, duration)]
+
+
+def _ratio_verdict(fake_ratio: float) -> Verdict:
+    """Map the share of suspicious frames to the video verdict."""
+    if fake_ratio >= FAKE_RATIO_THRESHOLD:
+        return Verdict.FAKE
+    if fake_ratio <= REAL_RATIO_THRESHOLD:
+        return Verdict.REAL
+    return Verdict.UNCERTAIN
+
+
+@dataclass(frozen=True)
+class _FrameScore:
+    """Fakeness 0..1 of one frame and the provider that scored it."""
+
+    score: float
+    provider: str
+
+
+def _one_provider(scores: list[tuple[_FrameScore | None, int]]) -> tuple[list[tuple[float, int]], str | None, int]:
+    """Keep the ``(score, weight)`` pairs of the provider that scored the most frames.
+
+    Providers score on different scales, so a clip that switched provider midway is
+    judged on one of them only (the later one on a tie). Also returns that provider
+    and the frame weight left out.
+    """
+    by_provider: dict[str, list[tuple[float, int]]] = {}
+    for frame_score, weight in scores:
+        if frame_score is not None:
+            by_provider.setdefault(frame_score.provider, []).append((frame_score.score, weight))
+    if not by_provider:
+        return [], None, 0
+    weights = {provider: sum(w for _, w in pairs) for provider, pairs in by_provider.items()}
+    provider = max(reversed(list(weights)), key=weights.__getitem__)
+    return by_provider[provider], provider, sum(weights.values()) - weights[provider]
+
+
+def _coarse_to_fine_order(count: int) -> list[int]:
+    """Frame indices spread across the timeline first, then filled in (van der Corput order)."""
+    order: list[int] = []
+    seen: set[int] = set()
+    k = 0
+    while len(order) < count and k < 4 * count:
+        # bit-reversed fraction of k: 0, 1/2, 1/4, 3/4, 1/8, ...
+        frac, denom, n = 0.0, 1.0, k
+        while n:
+            denom *= 2
+            frac += (n & 1) / denom
+            n >>= 1
+        idx = min(int(frac * count), count - 1)
+        if idx not in seen:
+            seen.add(idx)
+            order.append(idx)
+        k += 1
+    order.extend(i for i in range(count) if i not in seen)
+    return order
+
+
+def _settled_verdict(
+    fake: int,
+    scored: int,
+    remaining: int,
+    z: float,
+    min_frames: int,
+    samples: int | None = None,
+) -> Verdict | None:
+    """Return the final verdict if scoring the remaining frames can no longer change it.
+
+    ``fake``/``scored``/``remaining`` are frame counts; ``samples`` is the number of
+    independent observations behind them (scored clusters when frames are deduplicated).
+
+    Exact bound: even if every remaining frame went either way, the decision holds.
+    Sequential bound (after ``min_frames`` samples): a Wilson interval on the observed
+    fake share, with finite-population correction, projected onto the remaining frames.
+    """
+    total = scored + remaining
+    if total == 0:
+        return None
+    exact_low = _ratio_verdict(fake / total)
+    if exact_low == _ratio_verdict((fake + remaining) / total):
+        return exact_low
+    n = scored if samples is None else samples
+    if n < min_frames or n == 0:
+        return None
+
+    p = fake / scored
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    if total > 1:
+        half *= math.sqrt(remaining / (total - 1))
+    low = (fake + remaining * max(centre - half, 0.0)) / total
+    high = (fake + remaining * min(centre + half, 1.0)) / total
+    verdict = _ratio_verdict(low)
+    return verdict if verdict == _ratio_verdict(high) else None
+
+
+@dataclass
+class _FrameCluster:
+    """Run of near-identical consecutive frames, scored once through its first frame."""
+
+    frame: bytes
+    image_hash: int | None
+    weight: int = 1
+
+
+class _FrameDeduplicator:
+    """Groups consecutive frames whose perceptual hashes are within ``max_distance``.
+
+    Every retained frame is charged to the memory budget until ``release()``.
+    """
+
+    def __init__(self, max_distance: int | None) -> None:
+        self.max_distance = max_distance  # None disables deduplication
+        self.clusters: list[_FrameCluster] = []
+        self.held = 0
+
+    async def add(self, frame: bytes) -> _FrameCluster | None:
+        """Attach ``frame`` to the current run; return the new cluster if it starts one."""
+        image_hash = None
+        if self.max_distance is not None:
+            image_hash = await asyncio.to_thread(phash, frame)
+        current = self.clusters[-1] if self.clusters else None
+        if (
+            current is not None
+            and image_hash is not None
+            and current.image_hash is not None
+            and hamming(image_hash, current.image_hash) <= self.max_distance
+        ):
+            current.weight += 1
+            return None
+        await memory_budget.acquire(len(frame), "frames")
+        self.held += len(frame)
+        cluster = _FrameCluster(frame, image_hash)
+        self.clusters.append(cluster)
+        return cluster
+
+    def drop(self, cluster: _FrameCluster) -> None:
+        """Let go of a scored cluster's frame; its hash and weight stay."""
+        memory_budget.release(len(cluster.frame), "frames")
+        self.held -= len(cluster.frame)
+        cluster.frame = b""
+
+    def release(self) -> None:
+        memory_budget.release(self.held, "frames")
+        self.held = 0
+
+
+async def _score_streaming(
+    first_frame: bytes,
+    frames: AsyncIterator[bytes],
+    dedup: _FrameDeduplicator,
+    score_frame: Callable[[bytes], Awaitable[_FrameScore | None]],
+    wave_size: Callable[[], int],
+    frame_cap: int,
+    expected_frames: int | None = None,
+) -> tuple[list[tuple[_FrameScore | None, int]], int]:
+    """Score clusters in coarse-to-fine waves while ffmpeg keeps decoding, until the verdict is settled.
+
+    Each wave is up to ``wave_size()`` of the clusters decoded so far (as wide as the
+    provider currently takes), earliest in coarse-to-fine order over ``frame_cap``
+    frames. Until decoding ends the stop test counts every frame not decoded yet, up
+    to ``frame_cap``, as remaining, so stopping early never happens on a guess. A
+    scored frame is dropped from memory at once; decoding stops with the scoring.
+    No new wave starts once the request deadline has run out.
+
+    Returns ``(score, weight)`` per scored cluster and the number of frames skipped:
+    decoded but not scored, plus those not decoded yet out of ``expected_frames``
+    (when the sampling mode makes the count known).
+    """
+    rank = {idx: r for r, idx in enumerate(_coarse_to_fine_order(frame_cap))}
+    starts: list[int] = []  # index of each cluster's first frame
+    arrived = asyncio.Event()
+    decoded = 0
+    finished = False
+
+    async def _decode() -> None:
+        nonlocal decoded, finished
+        try:
+            frame: bytes | None = first_frame
+            while frame is not None:
+                if await dedup.add(frame) is not None:
+                    starts.append(decoded)
+                decoded += 1
+                arrived.set()
+                frame = await anext(frames, None)
+            finished = True
+        finally:
+            arrived.set()
+            await frames.aclose()
+
+    def _unscored(total: int) -> int:
+        return total - sum(cluster.weight for cluster, _ in scored)
+
+    def _remaining() -> int:  # for the stop test: an upper bound, never a guess
+        return _unscored(decoded if finished else max(frame_cap, decoded))
+
+    def _skipped() -> int:
+        known = finished or expected_frames is None
+        return _unscored(decoded if known else max(expected_frames, decoded))
+
+    scored: list[tuple[_FrameCluster, _FrameScore | None]] = []
+    done: set[int] = set()
+    decoder = asyncio.create_task(_decode())
+    try:
+        while not deadline.expired():
+            if decoder.done() and decoder.exception() is not None:
+                raise decoder.exception()
+            todo = sorted(
+                (i for i in range(len(dedup.clusters)) if i not in done),
+                key=lambda i: rank.get(starts[i], frame_cap + starts[i]),
+            )
+            if not todo:
+                if decoder.done():
+                    break
+                arrived.clear()
+                await arrived.wait()
+                continue
+            wave = todo[: wave_size()]
+            wave_scores = await asyncio.gather(*(score_frame(dedup.clusters[i].frame) for i in wave))
+            for i, score in zip(wave, wave_scores):
+                done.add(i)
+                scored.append((dedup.clusters[i], score))
+                dedup.drop(dedup.clusters[i])
+            valid, _, _ = _one_provider([(score, cluster.weight) for cluster, score in scored])
+            if _settled_verdict(
+                sum(w for score, w in valid if score >= FAKE_FRAME_SCORE),
+                sum(w for _, w in valid),
+                _remaining(),
+                settings.video_early_stop_z, settings.video_early_stop_min_frames,
+                samples=len(valid),
+            ) is not None:
+                break
+    finally:
+        # Stopping early (or on an error) is deliberate; being cancelled ourselves is not.
+        current = asyncio.current_task()
+        await cancel_and_wait(decoder, None if current is not None and current.cancelling() else STOPPED)
+    return [(score, cluster.weight) for cluster, score in scored], _skipped()
 
 
 class VideoPipeline(BaseAdapter):
@@ -85,63 +415,115 @@ class VideoPipeline(BaseAdapter):
             )
 
         # 1. Check duration
-        duration = _get_duration(data)
+        duration = await _get_duration(data)
         if duration > settings.max_video_duration_seconds:
             raise VideoTooLong(
                 f"Видео слишком длинное ({int(duration)}с). "
                 f"Максимум — {settings.max_video_duration_seconds}с."
             )
 
-        # 2. Extract frames
-        frames = _extract_frames(data)
-        if not frames:
+        # 2. Start streaming frame extraction — frames are scored while ffmpeg keeps decoding
+        frame_profile = profile_for("sightengine")
+        frames = _iter_frames(data, duration)
+        first_frame = await anext(frames, None)
+        if first_frame is None:
             return self._build_uncertain(
                 "Не удалось извлечь кадры из видео.",
                 ModelUsed.SIGHTENGINE_VIDEO,
                 MediaType.VIDEO,
             )
+        # ffmpeg re-encodes every frame anyway; report the profile only if it shrank them
+        preprocessing = (
+            f"video:{frame_profile.label}"
+            if frame_profile is not None and downscaled_to(first_frame, frame_profile)
+            else None
+        )
 
-        # 3. Analyze frames — try SightEngine first, fall back to HFImage if all fail
+        # 3. Analyze frames — SightEngine unless the shared provider state says its quota
+        # is gone or it keeps failing; a frame that finds it unavailable moves the rest
+        # of the video (and that frame) to HFImage.
         from adapters.hf_image import HFImageAdapter
         from adapters.sightengine import SightengineAdapter
 
-        semaphore = asyncio.Semaphore(CONCURRENT_LIMIT)
         sightengine_adapter = SightengineAdapter()
         hf_adapter = HFImageAdapter()
-        use_hf_fallback = False
+        use_hf_fallback = not provider_states.usable(SightengineAdapter.PROVIDER)
+        if use_hf_fallback:
+            logger.warning("SightEngine unavailable, using HFImage for video frames")
 
-        # Try one frame with SightEngine to detect quota exhaustion
-        test_frame = frames[0]
+        async def _score_with(adapter: BaseAdapter, frame_bytes: bytes) -> _FrameScore | None:
+            # Each HTTP attempt takes a process-wide adaptive-limit permit, so concurrent
+            # videos share one provider-sized budget and retry waits hold no slot.
+            try:
+                with limiters.pacing():
+                    result = await adapter.analyze(frame_bytes)
+            except ExternalAPIError as exc:
+                if adapter is sightengine_adapter and exc.detail in PROVIDER_UNAVAILABLE:
+                    raise
+                return None
+            # Normalize: for HF adapter confidence is already 0-1 for best label;
+            # for FAKE we keep it as-is, for REAL we convert to "fakeness" score = 1 - confidence
+            if result.verdict == Verdict.REAL:
+                score = 1.0 - result.confidence  # low fakeness
+            elif result.verdict == Verdict.FAKE:
+                score = result.confidence  # high fakeness
+            else:
+                score = 0.5  # UNCERTAIN → neutral
+            return _FrameScore(score, adapter.PROVIDER)
+
+        async def _analyze_frame(frame_bytes: bytes) -> _FrameScore | None:
+            nonlocal use_hf_fallback
+            if not use_hf_fallback:
+                try:
+                    return await _score_with(sightengine_adapter, frame_bytes)
+                except ExternalAPIError as exc:
+                    if not use_hf_fallback:
+                        logger.warning("SightEngine unavailable (%s), switching to HFImage", exc.detail)
+                    use_hf_fallback = True
+            return await _score_with(hf_adapter, frame_bytes)
+
+        def _wave_size() -> int:
+            active = hf_adapter if use_hf_fallback else sightengine_adapter
+            return limiters.get(active.PROVIDER).capacity
+
+        dedup = _FrameDeduplicator(settings.video_dedup_max_distance if settings.video_dedup_enabled else None)
+        skipped = 0
         try:
-            await sightengine_adapter.analyze(test_frame)
-        except ExternalAPIError as exc:
-            if exc.detail in ("rate_limit", "server_error"):
-                logger.warning("SightEngine unavailable (%s), switching to HFImage for video frames", exc.detail)
-                use_hf_fallback = True
+            if settings.video_early_stop:
+                # Spend provider calls in coarse-to-fine waves over the frames decoded so
+                # far, until the verdict can no longer change.
+                weighted_scores, skipped = await _score_streaming(
+                    first_frame, frames, dedup, _analyze_frame, _wave_size,
+                    _frame_cap(duration), _expected_frames(duration),
+                )
             else:
-                raise
+                pending: list[tuple[asyncio.Task, _FrameCluster]] = []
 
-        active_adapter = hf_adapter if use_hf_fallback else sightengine_adapter
-        model_used = ModelUsed.HF_IMAGE if use_hf_fallback else ModelUsed.SIGHTENGINE_VIDEO
+                async def _submit(frame: bytes) -> None:
+                    cluster = await dedup.add(frame)
+                    if cluster is not None:
+                        pending.append((asyncio.create_task(_analyze_frame(cluster.frame)), cluster))
 
-        async def _analyze_frame(frame_bytes: bytes) -> float | None:
-            async with semaphore:
                 try:
-                    result = await active_adapter.analyze(frame_bytes)
-                    # Normalize: for HF adapter confidence is already 0-1 for best label;
-                    # for FAKE we keep it as-is, for REAL we convert to "fakeness" score = 1 - confidence
-                    if result.verdict == Verdict.REAL:
-                        return 1.0 - result.confidence  # low fakeness
-                    if result.verdict == Verdict.FAKE:
-                        return result.confidence  # high fakeness
-                    return 0.5  # UNCERTAIN → neutral
-                except ExternalAPIError:
-                    return None
-
-        tasks = [_analyze_frame(f) for f in frames]
-        raw_scores: list[float | None] = list(await asyncio.gather(*tasks))
-        valid_scores: list[float] = [s for s in raw_scores if s is not None]
+                    await _submit(first_frame)
+                    async for frame in frames:
+                        await _submit(frame)
+                    scores = await asyncio.gather(*(task for task, _ in pending))
+                except BaseException:
+                    for task, _ in pending:
+                        task.cancel()
+                    raise
+                finally:
+                    await frames.aclose()
+                # weights are final only once every frame has been assigned
+                weighted_scores = [(score, cluster.weight) for score, (_, cluster) in zip(scores, pending)]
+        finally:
+            dedup.release()
 
+        valid_scores, provider, other_provider_frames = _one_provider(weighted_scores)
+        if provider is not None:
+            use_hf_fallback = provider == hf_adapter.PROVIDER
+        model_used = ModelUsed.HF_IMAGE if use_hf_fallback else ModelUsed.SIGHTENGINE_VIDEO
         if not valid_scores:
             return self._build_uncertain(
                 "Не удалось проанализировать кадры видео.",
@@ -149,26 +531,23 @@ class VideoPipeline(BaseAdapter):
                 MediaType.VIDEO,
             )
 
-        # 4. Aggregate (scores are "fakeness" 0..1)
-        total_frames = len(valid_scores)
-        fake_count = sum(1 for s in valid_scores if s >= 0.75)
-        real_count = sum(1 for s in valid_scores if s <= 0.35)
+        # 4. Aggregate (scores are "fakeness" 0..1, each weighted by its cluster size)
+        total_frames = sum(w for _, w in valid_scores)
+        fake_scores_list = [(s, w) for s, w in valid_scores if s >= FAKE_FRAME_SCORE]
+        real_scores_list = [(s, w) for s, w in valid_scores if s <= REAL_FRAME_SCORE]
+        fake_count = sum(w for _, w in fake_scores_list)
+        real_count = sum(w for _, w in real_scores_list)
         fake_ratio = fake_count / total_frames
 
-        fake_scores_list = [s for s in valid_scores if s >= 0.75]
-        real_scores_list = [s for s in valid_scores if s <= 0.35]
-
-        if fake_ratio >= 0.40:
-            verdict = Verdict.FAKE
+        verdict = _ratio_verdict(fake_ratio)
+        if verdict == Verdict.FAKE:
             # confidence = avg of fakeness scores for fake frames
-            confidence = sum(fake_scores_list) / len(fake_scores_list)
-        elif fake_ratio <= 0.10:
-            verdict = Verdict.REAL
+            confidence = sum(s * w for s, w in fake_scores_list) / fake_count
+        elif verdict == Verdict.REAL:
             # confidence = 1 - avg_fakeness of real frames  → high real confidence
-            avg_fakeness = sum(real_scores_list) / len(real_scores_list) if real_scores_list else 0.15
+            avg_fakeness = sum(s * w for s, w in real_scores_list) / real_count if real_count else 0.15
             confidence = 1.0 - avg_fakeness
         else:
-            verdict = Verdict.UNCERTAIN
             confidence = 0.5
 
         fallback_note = " (использован HuggingFace как резервный)" if use_hf_fallback else ""
@@ -177,6 +556,14 @@ class VideoPipeline(BaseAdapter):
             f"Подозрительных: {fake_count}, подлинных: {real_count}. "
             f"Доля подозрительных: {round(fake_ratio * 100)}%."
         )
+        if len(weighted_scores) < total_frames:
+            explanation += f" Отправлено на анализ уникальных кадров: {len(weighted_scores)}."
+        if other_provider_frames:
+            explanation += f" Кадры другого провайдера не учтены: {other_provider_frames}."
+        if skipped and deadline.expired():
+            explanation += f" Время запроса истекло: не проверено кадров — {skipped}."
+        elif skipped:
+            explanation += f" Ранняя остановка: пропущено кадров — {skipped}."
 
         return AnalysisResult(
             verdict=verdict,
@@ -184,4 +571,7 @@ class VideoPipeline(BaseAdapter):
             model_used=model_used,
             explanation=explanation,
             media_type=MediaType.VIDEO,
+            frames_analyzed=len(weighted_scores),
+            frames_skipped=skipped,
+            preprocessing=preprocessing,
         )
@@ -0,0 +1,100 @@
+"""Admission control at the door: shed uploads (or wait for memory) before their body is read."""
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.admission import admission
+from core.exceptions import Overloaded
+from core.memory_budget import memory_budget
+
+# POST paths guarded and the kind they are admitted as. /analyze doesn't know its
+# media type before the upload is read; the endpoint re-checks video once it does.
+GUARDED_PATHS = {
+    "/analyze": "media",
+    "/analyze/text/hybrid": "text",
+    "/bigcheck": "batch",
+    "/bigcheck/stream": "batch",
+    "/jobs": "batch",
+}
+OVERLOADED_DETAIL = "Сервис перегружен, попробуйте через минуту"
+LENGTH_REQUIRED_DETAIL = "Загрузка без Content-Length не принимается"
+UPLOAD_CHARGE = "upload_charge"  # scope["state"] key: bytes still charged for this upload
+
+
+def overloaded_response(exc: Overloaded) -> JSONResponse:
+    return JSONResponse(
+        {"detail": OVERLOADED_DETAIL},
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+async def overloaded_handler(request: Request, exc: Overloaded) -> JSONResponse:
+    return overloaded_response(exc)
+
+
+def _content_length(scope: Scope) -> int | None:
+    """Declared upload size; None if absent (chunked) or malformed."""
+    for name, value in scope.get("headers", []):
+        if name == b"content-length":
+            try:
+                return max(int(value), 0)
+            except ValueError:
+                return None
+    return None
+
+
+def take_upload_charge(request: Request) -> int:
+    """Take over this request's memory charge (released by the caller, not at response end).
+
+    For uploads that outlive the request, like locally run jobs.
+    """
+    return request.scope.get("state", {}).pop(UPLOAD_CHARGE, 0)
+
+
+class AdmissionMiddleware:
+    """Pure ASGI, so a shed request is answered without reading its body.
+
+    Admitted uploads are charged to the memory budget (waiting for room if
+    needed) for the whole request, streamed responses included, unless the
+    endpoint takes the charge over with ``take_upload_charge()``. Both charges
+    use Content-Length (the server holds the body to it), so guarded uploads
+    without one (chunked) are refused with 411.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        kind = None
+        if scope["type"] == "http" and scope["method"] == "POST":
+            kind = GUARDED_PATHS.get(scope["path"].rstrip("/"))
+        if kind is None:
+            await self.app(scope, receive, send)
+            return
+
+        size = _content_length(scope)
+        if size is None:
+            await JSONResponse({"detail": LENGTH_REQUIRED_DETAIL}, status_code=411)(scope, receive, send)
+            return
+        try:
+            if admission is not None:
+                admission.admit(kind, size)
+            try:
+                await memory_budget.acquire(size, "upload", admit=True)
+            except BaseException:
+                if admission is not None:
+                    admission.release(size)
+                raise
+        except Overloaded as exc:
+            await overloaded_response(exc)(scope, receive, send)
+            return
+        state = scope.setdefault("state", {})
+        state[UPLOAD_CHARGE] = size
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            memory_budget.release(state.pop(UPLOAD_CHARGE, 0), "upload")
+            if admission is not None:
+                admission.release(size)
@@ -0,0 +1,48 @@
+"""Cancel an endpoint's analysis when its HTTP client goes away."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable
+from typing import TypeVar
+
+from fastapi import HTTPException, Request
+
+from core.cancellation import cancellations
+from core.hedging import cancel_and_wait
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLIENT_CLOSED_REQUEST = 499  # nginx convention; nobody reads it, but logs do
+
+
+async def _disconnected(request: Request) -> None:
+    """Return once the server reports ``http.disconnect`` (the body is already read)."""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def cancel_on_disconnect(request: Request, work: Awaitable[T], endpoint: str) -> T:
+    """Await ``work``; if the client disconnects first, cancel it with every task it spawned.
+
+    Provider calls, ffmpeg processes and queued scheduler slots are released by
+    their own cancellation handling. The request context (e.g. its deadline) is
+    copied into the task.
+    """
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(_disconnected(request))
+    try:
+        done, _ = await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if task not in done:
+            logger.info("Client left %s, cancelling its analysis", endpoint)
+            cancellations.record(endpoint)
+            await cancel_and_wait(task)
+            raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
+        return task.result()
+    finally:
+        await cancel_and_wait(watcher)
+        if not task.done():
+            await cancel_and_wait(task)  # we were cancelled ourselves (shutdown)
@@ -1,11 +1,16 @@
 """FastAPI application — entry point."""
 
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from api.routers import analyze, bigcheck, health
+from adapters.http_client import http_clients
+from api.admission import AdmissionMiddleware, overloaded_handler
+from api.routers import analyze, bigcheck, health, jobs, metrics
+from core.exceptions import Overloaded
+from core.jobs import job_runner
 
 # Enhanced error handling
 # Type hints added
@@ -13,15 +18,31 @@ from api.routers import analyze, bigcheck, health
 # Cleaner API design
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open pooled provider connections on startup; stop background jobs and close them on shutdown."""
+    async with http_clients.lifespan():
+        try:
+            yield
+        finally:
+            await job_runner.aclose()
+
+
 app = FastAPI(
     title="Источник API",
     version="0.5.0",
     docs_url="/docs",
     redoc_url=None,
+    lifespan=lifespan,
 )
 
+app.add_middleware(AdmissionMiddleware)
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+app.add_exception_handler(Overloaded, overloaded_handler)
 
 app.include_router(analyze.router, prefix="/analyze", tags=["analyze"])
 app.include_router(bigcheck.router, prefix="/bigcheck", tags=["bigcheck"])
+app.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
 app.include_router(health.router, tags=["health"])
+app.include_router(metrics.router, tags=["metrics"])
@@ -1,18 +1,28 @@
 """POST /analyze — main analysis endpoint."""
 
 import logging
+import math
 import time
 
-from fastapi import APIRouter, Body, File, Form, Header, HTTPException, UploadFile
+from fastapi import APIRouter, Body, File, Form, Header, HTTPException, Request, UploadFile
+from api.disconnect import cancel_on_disconnect
 from api.schemas import AnalysisResult, HybridAnalysisResponse
+from core.admission import admission
 from core.analyzer import HybridTextAnalyzer
 from core.config import settings
+from core.deadline import DEADLINE_HEADER, deadline_scope, parse_deadline_ms
+from core.enums import MediaType, Priority
 from core.exceptions import (
+    BulkheadFull,
     ExternalAPIError,
     FileTooLarge,
     UnsupportedMediaType,
     VideoTooLong,
 )
+from core.hedging import hedge_policy
+from core.phash import image_index
+from core.result_cache import result_cache
+from core.scheduler import priority_for, scheduler
 from router.media_router import MediaRouter
 
 # Cleaner API design
@@ -22,14 +32,18 @@ from router.media_router import MediaRouter
 # Type hints added
 router = APIRouter()
 logger = logging.getLogger(__name__)
-media_router = MediaRouter()
+media_router = MediaRouter(
+    cache=result_cache, image_index=image_index, scheduler=scheduler, hedge=hedge_policy
+)
 hybrid_analyzer = HybridTextAnalyzer()
 
 
 @router.post("/text/hybrid", response_model=HybridAnalysisResponse)
 async def analyze_text_hybrid(
+    request: Request,
     payload: dict = Body(..., example={"text": "Введите текст для проверки"}),
     x_api_secret: str = Header(..., alias="x-api-secret"),
+    x_deadline_ms: str | None = Header(None, alias=DEADLINE_HEADER),
 ):
     if x_api_secret != settings.api_secret_key:
         raise HTTPException(status_code=403, detail="Invalid API secret")
@@ -41,8 +55,11 @@ async def analyze_text_hybrid(
         raise HTTPException(status_code=400, detail="Минимум 50 символов для анализа")
 
     try:
-        result = await hybrid_analyzer.analyze(text)
+        with deadline_scope(parse_deadline_ms(x_deadline_ms)):
+            result = await cancel_on_disconnect(request, hybrid_analyzer.analyze(text), "analyze_text_hybrid")
         return HybridAnalysisResponse(**result)
+    except HTTPException:
+        raise
     except Exception as exc:  # noqa: BLE001
         logger.exception("Hybrid analyze failed: %s", exc)
         raise HTTPException(status_code=503, detail="Hybrid analyzer unavailable")
@@ -50,36 +67,64 @@ async def analyze_text_hybrid(
 
 @router.post("", response_model=AnalysisResult)
 async def analyze(
+    request: Request,
     file: UploadFile = File(...),
     user_id: int = Form(...),
     username: str = Form(""),
     first_name: str = Form(""),
     text_content: str = Form(""),
     x_api_secret: str = Header(..., alias="x-api-secret"),
+    x_deadline_ms: str | None = Header(None, alias=DEADLINE_HEADER),
 ) -> AnalysisResult:
     # 1. Auth check
     if x_api_secret != settings.api_secret_key:
         raise HTTPException(status_code=403, detail="Invalid API secret")
 
-    # 2. Read file
+    # 2. Detect media type; under load, shed video before its upload is pulled into memory
+    media_type = detect_media_type(file, text_content)
+    if admission is not None:
+        admission.check(media_type.value)
+
+    # 3. Read file
     file_bytes = await file.read()
 
-    # 3. Detect media type
+    # 4. Analyze within the caller's deadline (if it sent one), until it disconnects
+    with deadline_scope(parse_deadline_ms(x_deadline_ms)):
+        work = analyze_bytes(media_type, file_bytes, text_content, priority_for(user_id), user_id)
+        return await cancel_on_disconnect(request, work, "analyze")
+
+
+def detect_media_type(file: UploadFile, text_content: str = "") -> MediaType:
     try:
-        media_type = media_router.detect_type(file.content_type, file.filename, text_content)
+        return media_router.detect_type(file.content_type, file.filename, text_content)
     except UnsupportedMediaType:
         raise HTTPException(status_code=400, detail="Неподдерживаемый тип файла")
 
-    # 4. Analyze
+
+async def analyze_bytes(
+    media_type: MediaType,
+    file_bytes: bytes,
+    text_content: str = "",
+    priority: Priority = Priority.FREE,
+    user_id: int | None = None,
+) -> AnalysisResult:
+    """Route one payload and map domain errors onto HTTP errors (shared with /jobs)."""
     start_time = time.monotonic()
     try:
-        result = await media_router.route(media_type, file_bytes, text_content)
+        result = await media_router.route(media_type, file_bytes, text_content, priority, user_id)
     except FileTooLarge as exc:
         raise HTTPException(status_code=400, detail=str(exc))
     except VideoTooLong as exc:
         raise HTTPException(status_code=400, detail=str(exc))
     except UnsupportedMediaType:
         raise HTTPException(status_code=400, detail="Неподдерживаемый тип файла")
+    except BulkheadFull as exc:
+        logger.warning("Rejected %s analysis: %s pool is full", media_type.value, exc.service)
+        raise HTTPException(
+            status_code=503,
+            detail="Сервис перегружен, попробуйте через минуту",
+            headers={"Retry-After": str(math.ceil(settings.admission_retry_after_s))},
+        )
     except ExternalAPIError as exc:
         logger.error("External API error: %s — %s", exc.service, exc.detail)
         raise HTTPException(status_code=503, detail=f"Сервис {exc.service} недоступен: {exc.detail}")
@@ -1,22 +1,39 @@
 """POST /bigcheck — multi-file cross-analysis endpoint."""
 
+import asyncio
+import json
 import logging
 import time
+from collections.abc import AsyncIterator, Coroutine
+from typing import Any
 
-from fastapi import APIRouter, File, Form, Header, HTTPException, UploadFile
+from fastapi import APIRouter, File, Form, Header, HTTPException, Request, UploadFile
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from api.disconnect import cancel_on_disconnect
 from api.schemas import AnalysisResult
+from core.admission import admission
+from core.cancellation import cancellations
 from core.config import settings
-from core.enums import MediaType, Verdict
-from core.exceptions import ExternalAPIError, UnsupportedMediaType
+from core.deadline import DEADLINE_HEADER, deadline_scope, parse_deadline_ms
+from core.enums import MediaType, Priority, Verdict
+from core.exceptions import ExternalAPIError, Overloaded, UnsupportedMediaType
+from core.hedging import hedge_policy
+from core.phash import image_index
+from core.result_cache import result_cache
+from core.scheduler import flow_cap, priority_for, scheduler
 from router.media_router import MediaRouter
 
 # Following best practices
 # Optimized for async execution
 router = APIRouter()
 logger = logging.getLogger(__name__)
-media_router = MediaRouter()
+media_router = MediaRouter(
+    cache=result_cache, image_index=image_index, scheduler=scheduler, hedge=hedge_policy
+)
+# Shared by every Big Check request in this process
+_global_limit = asyncio.Semaphore(settings.bigcheck_global_concurrency)
 
 
 class BigCheckFileResult(BaseModel):
@@ -29,6 +46,7 @@ class BigCheckFileResult(BaseModel):
     model_used: str
     explanation: str
     processing_ms: int
+    cached: bool = False
 
 
 class BigCheckResponse(BaseModel):
@@ -94,129 +112,91 @@ def _cross_analysis(results: list[AnalysisResult]) -> tuple[Verdict, float, str]
     return verdict, round(confidence, 4), summary
 
 
-@router.post("", response_model=BigCheckResponse)
-async def bigcheck(
-    files: list[UploadFile] = File(...),
-    user_id: int = Form(...),
-    username: str = Form(""),
-    first_name: str = Form(""),
-    text_content: str = Form(""),
-    x_api_secret: str = Header(..., alias="x-api-secret"),
-) -> BigCheckResponse:
-    """
-    Big Check: analyze multiple files + optional text in a single request.
-    Performs cross-analysis to determine overall verdict.
-    """
-    # 1. Auth
-    if x_api_secret != settings.api_secret_key:
-        raise HTTPException(status_code=403, detail="Invalid API secret")
-
-    # 2. Rate limit — each file counts as one check
-    total_items = len(files) + (1 if text_content and text_content.strip() else 0)
-    if total_items == 0:
-        raise HTTPException(status_code=400, detail="Загрузите хотя бы один файл или введите текст")
-    if total_items > 10:
-        raise HTTPException(status_code=400, detail="Максимум 10 элементов за раз")
+def _error_result(filename: str, media_type: str, explanation: str) -> BigCheckFileResult:
+    return BigCheckFileResult(
+        filename=filename,
+        media_type=media_type,
+        verdict="UNCERTAIN",
+        confidence=0.0,
+        model_used="fallback_uncertain",
+        explanation=explanation,
+        processing_ms=0,
+    )
 
-    # 3. Process each file
-    individual_results: list[AnalysisResult] = []
-    file_results: list[BigCheckFileResult] = []
-    total_start = time.monotonic()
 
-    for upload_file in files:
-        file_bytes = await upload_file.read()
-        if len(file_bytes) == 0:
-            continue
+def _file_result(filename: str, result: AnalysisResult) -> BigCheckFileResult:
+    return BigCheckFileResult(
+        filename=filename,
+        media_type=result.media_type.value,
+        verdict=result.verdict.value,
+        confidence=result.confidence,
+        model_used=result.model_used.value,
+        explanation=result.explanation,
+        processing_ms=result.processing_ms,
+        cached=result.cached,
+    )
 
-        try:
-            media_type = media_router.detect_type(
-                upload_file.content_type, upload_file.filename, ""
-            )
-        except UnsupportedMediaType:
-            file_results.append(
-                BigCheckFileResult(
-                    filename=upload_file.filename or "unknown",
-                    media_type="unknown",
-                    verdict="UNCERTAIN",
-                    confidence=0.0,
-                    model_used="fallback_uncertain",
-                    explanation="Неподдерживаемый тип файла",
-                    processing_ms=0,
-                )
-            )
-            continue
 
+async def _analyze_file(
+    filename: str | None,
+    content_type: str | None,
+    file_bytes: bytes,
+    limit: asyncio.Semaphore,
+    priority: Priority,
+    user_id: int | None,
+) -> tuple[AnalysisResult | None, BigCheckFileResult]:
+    """Analyze one uploaded file; failures become an UNCERTAIN row instead of failing the batch."""
+    try:
+        media_type = media_router.detect_type(content_type, filename, "")
+    except UnsupportedMediaType:
+        return None, _error_result(filename or "unknown", "unknown", "Неподдерживаемый тип файла")
+    try:
+        if admission is not None:
+            admission.check(media_type.value)
+    except Overloaded:
+        return None, _error_result(filename or "unknown", media_type.value, "Сервис перегружен, файл не проверен")
+
+    async with limit, _global_limit:
         start_time = time.monotonic()
         try:
-            result = await media_router.route(media_type, file_bytes, "")
+            with flow_cap(settings.bigcheck_item_concurrency):  # ``limit`` already bounds the batch
+                result = await media_router.route(media_type, file_bytes, "", priority, user_id)
+        except Overloaded:  # memory budget stayed full for the whole wait
+            return None, _error_result(filename or "unknown", media_type.value, "Сервис перегружен, файл не проверен")
         except (ExternalAPIError, Exception) as exc:
-            logger.error("BigCheck file error (%s): %s", upload_file.filename, exc)
-            file_results.append(
-                BigCheckFileResult(
-                    filename=upload_file.filename or "unknown",
-                    media_type=media_type.value,
-                    verdict="UNCERTAIN",
-                    confidence=0.0,
-                    model_used="fallback_uncertain",
-                    explanation=f"Ошибка анализа: {exc}",
-                    processing_ms=0,
-                )
-            )
-            continue
-
-        elapsed_ms = int((time.monotonic() - start_time) * 1000)
-        result.processing_ms = elapsed_ms
-
-        individual_results.append(result)
-        file_results.append(
-            BigCheckFileResult(
-                filename=upload_file.filename or "file",
-                media_type=result.media_type.value,
-                verdict=result.verdict.value,
-                confidence=result.confidence,
-                model_used=result.model_used.value,
-                explanation=result.explanation,
-                processing_ms=elapsed_ms,
-            )
-        )
+            logger.error("BigCheck file error (%s): %s", filename, exc)
+            return None, _error_result(filename or "unknown", media_type.value, f"Ошибка анализа: {exc}")
 
-    # 4. Process text if provided
-    if text_content and text_content.strip():
+    result.processing_ms = int((time.monotonic() - start_time) * 1000)
+    return result, _file_result(filename or "file", result)
+
+
+async def _analyze_text(
+    text_content: str,
+    limit: asyncio.Semaphore,
+    priority: Priority,
+    user_id: int | None,
+) -> tuple[AnalysisResult | None, BigCheckFileResult]:
+    async with limit, _global_limit:
         start_time = time.monotonic()
         try:
-            text_result = await media_router.route(
-                MediaType.TEXT, b"", text_content
-            )
-            elapsed_ms = int((time.monotonic() - start_time) * 1000)
-            text_result.processing_ms = elapsed_ms
-
-            individual_results.append(text_result)
-            file_results.append(
-                BigCheckFileResult(
-                    filename="text_input",
-                    media_type=text_result.media_type.value,
-                    verdict=text_result.verdict.value,
-                    confidence=text_result.confidence,
-                    model_used=text_result.model_used.value,
-                    explanation=text_result.explanation,
-                    processing_ms=elapsed_ms,
-                )
-            )
+            with flow_cap(settings.bigcheck_item_concurrency):
+                result = await media_router.route(MediaType.TEXT, b"", text_content, priority, user_id)
         except Exception as exc:
             logger.error("BigCheck text error: %s", exc)
-            file_results.append(
-                BigCheckFileResult(
-                    filename="text_input",
-                    media_type="text",
-                    verdict="UNCERTAIN",
-                    confidence=0.0,
-                    model_used="fallback_uncertain",
-                    explanation=f"Ошибка анализа текста: {exc}",
-                    processing_ms=0,
-                )
-            )
-
-    # 5. Cross-analysis
+            return None, _error_result("text_input", "text", f"Ошибка анализа текста: {exc}")
+
+    result.processing_ms = int((time.monotonic() - start_time) * 1000)
+    return result, _file_result("text_input", result)
+
+
+def build_response(
+    outcomes: list[tuple[AnalysisResult | None, BigCheckFileResult]],
+    total_ms: int,
+) -> BigCheckResponse:
+    individual_results = [result for result, _ in outcomes if result is not None]
+    file_results = [row for _, row in outcomes]
+
     overall_verdict, overall_confidence, summary = _cross_analysis(individual_results)
 
     # Calculate authenticity index
@@ -225,8 +205,6 @@ async def bigcheck(
     else:
         authenticity_index = round(overall_confidence * 100)
 
-    total_ms = int((time.monotonic() - total_start) * 1000)
-
     return BigCheckResponse(
         overall_verdict=overall_verdict.value,
         overall_confidence=overall_confidence,
@@ -236,3 +214,130 @@ async def bigcheck(
         total_files=len(file_results),
         total_processing_ms=total_ms,
     )
+
+
+async def read_uploads(
+    files: list[UploadFile],
+    text_content: str,
+    x_api_secret: str,
+) -> list[tuple[str | None, str | None, bytes]]:
+    """Validate a Big Check request and read its files as ``(filename, content_type, bytes)``."""
+    # 1. Auth
+    if x_api_secret != settings.api_secret_key:
+        raise HTTPException(status_code=403, detail="Invalid API secret")
+
+    # 2. Rate limit — each file counts as one check
+    total_items = len(files) + (1 if text_content and text_content.strip() else 0)
+    if total_items == 0:
+        raise HTTPException(status_code=400, detail="Загрузите хотя бы один файл или введите текст")
+    if total_items > 10:
+        raise HTTPException(status_code=400, detail="Максимум 10 элементов за раз")
+
+    return [(f.filename, f.content_type, await f.read()) for f in files]
+
+
+def bigcheck_items(
+    uploads: list[tuple[str | None, str | None, bytes]],
+    text_content: str = "",
+    user_id: int | None = None,
+) -> list[Coroutine[Any, Any, tuple[AnalysisResult | None, BigCheckFileResult]]]:
+    """One analysis coroutine per ``(filename, content_type, bytes)`` upload (+ text), in input order.
+
+    Batches go to the batch lane unless the user is premium.
+    """
+    limit = asyncio.Semaphore(settings.bigcheck_item_concurrency)
+    priority = priority_for(user_id, Priority.BATCH)
+    items = [
+        _analyze_file(filename, content_type, file_bytes, limit, priority, user_id)
+        for filename, content_type, file_bytes in uploads
+        if file_bytes
+    ]
+    if text_content and text_content.strip():
+        items.append(_analyze_text(text_content, limit, priority, user_id))
+    return items
+
+
+async def run_bigcheck(
+    items: list[Coroutine[Any, Any, tuple[AnalysisResult | None, BigCheckFileResult]]],
+) -> BigCheckResponse:
+    """Run prepared Big Check items concurrently and cross-analyse them (input order kept)."""
+    total_start = time.monotonic()
+    outcomes = list(await asyncio.gather(*items))
+    return build_response(outcomes, int((time.monotonic() - total_start) * 1000))
+
+
+@router.post("", response_model=BigCheckResponse)
+async def bigcheck(
+    request: Request,
+    files: list[UploadFile] = File(...),
+    user_id: int = Form(...),
+    username: str = Form(""),
+    first_name: str = Form(""),
+    text_content: str = Form(""),
+    x_api_secret: str = Header(..., alias="x-api-secret"),
+    x_deadline_ms: str | None = Header(None, alias=DEADLINE_HEADER),
+) -> BigCheckResponse:
+    """
+    Big Check: analyze multiple files + optional text in a single request.
+    Items run concurrently (bounded per request and process-wide); results keep input order.
+    Performs cross-analysis to determine overall verdict.
+    """
+    uploads = await read_uploads(files, text_content, x_api_secret)
+    items = bigcheck_items(uploads, text_content, user_id)
+    with deadline_scope(parse_deadline_ms(x_deadline_ms)):
+        return await cancel_on_disconnect(request, run_bigcheck(items), "bigcheck")
+
+
+@router.post("/stream")
+async def bigcheck_stream(
+    request: Request,
+    files: list[UploadFile] = File(...),
+    user_id: int = Form(...),
+    username: str = Form(""),
+    first_name: str = Form(""),
+    text_content: str = Form(""),
+    x_api_secret: str = Header(..., alias="x-api-secret"),
+    x_deadline_ms: str | None = Header(None, alias=DEADLINE_HEADER),
+) -> StreamingResponse:
+    """
+    Streaming Big Check: emits each ``BigCheckFileResult`` as soon as it is ready,
+    then a final ``BigCheckResponse`` with the cross-analysis.
+
+    NDJSON by default (``{"type": "item", "index": i, "result": {...}}`` per line,
+    then ``{"type": "summary", "result": {...}}``); Server-Sent Events with the same
+    payloads when the client sends ``Accept: text/event-stream``.
+    """
+    total_start = time.monotonic()
+    uploads = await read_uploads(files, text_content, x_api_secret)
+    items = bigcheck_items(uploads, text_content, user_id)
+    use_sse = "text/event-stream" in request.headers.get("accept", "")
+
+    def _frame(kind: str, payload: dict) -> str:
+        if use_sse:
+            return f"event: {kind}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+        return json.dumps({"type": kind, **payload}, ensure_ascii=False) + "\n"
+
+    async def _indexed(index: int, item: Coroutine) -> tuple[int, tuple[AnalysisResult | None, BigCheckFileResult]]:
+        return index, await item
+
+    async def _events() -> AsyncIterator[str]:
+        # tasks copy the current context, so each item keeps the request's deadline
+        with deadline_scope(parse_deadline_ms(x_deadline_ms)):
+            tasks = [asyncio.create_task(_indexed(i, item)) for i, item in enumerate(items)]
+        outcomes: list = [None] * len(tasks)
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, outcome = await next_done
+                outcomes[index] = outcome
+                yield _frame("item", {"index": index, "total": len(tasks), "result": outcome[1].model_dump()})
+            response = build_response(outcomes, int((time.monotonic() - total_start) * 1000))
+            yield _frame("summary", {"result": response.model_dump()})
+        finally:
+            # client went away mid-stream: don't keep analysing for nobody
+            if not all(task.done() for task in tasks):
+                cancellations.record("bigcheck_stream")
+            for task in tasks:
+                task.cancel()
+
+    media_type = "text/event-stream" if use_sse else "application/x-ndjson"
+    return StreamingResponse(_events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
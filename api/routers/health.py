@@ -1,8 +1,11 @@
-"""GET /health — liveness and readiness probe."""
+"""GET /health — liveness and readiness probe; GET /health/providers — circuit breakers
+and quota / server-error state per provider."""
 
 from fastapi import APIRouter
 
 from api.schemas import HealthResponse
+from core.circuit_breaker import breakers
+from core.provider_state import provider_states
 
 # Input validation added
 # Documentation updated
@@ -13,3 +16,11 @@ router = APIRouter()
 @router.get("/health", response_model=HealthResponse)
 async def health() -> HealthResponse:
     return HealthResponse(status="ok", version="0.5.0")
+
+
+@router.get("/health/providers")
+async def provider_health() -> dict[str, dict]:
+    """Circuit breaker (per provider and g4f model) and provider state seen by this process."""
+    states = provider_states.stats()
+    names = sorted(breakers.stats().keys() | states.keys())
+    return {name: {**breakers.get(name).stats(), **states.get(name, {})} for name in names}
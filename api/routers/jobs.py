@@ -0,0 +1,131 @@
+"""POST /jobs, GET /jobs/{id} — asynchronous analysis with polling or webhook callback."""
+
+import base64
+import json
+import logging
+from functools import partial
+
+from fastapi import APIRouter, File, Form, Header, HTTPException, Request, UploadFile
+from pydantic import BaseModel
+
+from api.admission import take_upload_charge
+from api.routers.analyze import analyze_bytes, detect_media_type
+from api.routers.bigcheck import bigcheck_items, read_uploads, run_bigcheck
+from api.schemas import JobInfo
+from core.config import settings
+from core.enums import MediaType, Priority
+from core.exceptions import JobFailed
+from core.jobs import job_runner
+from core.memory_budget import memory_budget
+from core.scheduler import priority_for
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+JOB_KINDS = ("analyze", "bigcheck")
+
+
+class TaskPayload(BaseModel):
+    """Everything a job needs to run, detached from the request (so a worker can run it)."""
+
+    kind: str
+    user_id: int | None = None
+    text_content: str = ""
+    media_type: MediaType | None = None  # analyze only
+    uploads: list[tuple[str | None, str | None, bytes]] = []  # (filename, content_type, bytes)
+
+    def to_bytes(self) -> bytes:
+        data = self.model_dump(mode="python")
+        data["uploads"] = [
+            [filename, content_type, base64.b64encode(blob).decode()]
+            for filename, content_type, blob in self.uploads
+        ]
+        return json.dumps(data).encode()
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "TaskPayload":
+        data = json.loads(raw)
+        data["uploads"] = [
+            (filename, content_type, base64.b64decode(blob)) for filename, content_type, blob in data["uploads"]
+        ]
+        return cls.model_validate(data)
+
+
+async def run_task(payload: TaskPayload) -> BaseModel:
+    """Execute a job payload; shared by the in-process runner and worker/main.py."""
+    if payload.kind == "bigcheck":
+        return await run_bigcheck(bigcheck_items(payload.uploads, payload.text_content, payload.user_id))
+    _, _, file_bytes = payload.uploads[0]
+    try:
+        return await analyze_bytes(
+            payload.media_type,
+            file_bytes,
+            payload.text_content,
+            priority_for(payload.user_id, Priority.BATCH),
+            payload.user_id,
+        )
+    except HTTPException as exc:
+        raise JobFailed(exc.detail)
+
+
+@router.post("", response_model=JobInfo, status_code=202)
+async def submit_job(
+    request: Request,
+    files: list[UploadFile] = File(...),
+    user_id: int = Form(...),
+    username: str = Form(""),
+    first_name: str = Form(""),
+    text_content: str = Form(""),
+    kind: str = Form("analyze"),
+    callback_url: str = Form(""),
+    x_api_secret: str = Header(..., alias="x-api-secret"),
+) -> JobInfo:
+    """
+    Accept the same inputs as /analyze (``kind=analyze``, one file) or /bigcheck
+    (``kind=bigcheck``) and return a job id right away. The job runs in this process
+    or, with ``job_executor=queue``, on a worker. Poll ``GET /jobs/{id}``, or
+    pass ``callback_url`` to get the finished job POSTed back (signed with
+    ``x-signature`` = HMAC-SHA256 of the body with the API secret).
+    """
+    if x_api_secret != settings.api_secret_key:
+        raise HTTPException(status_code=403, detail="Invalid API secret")
+    if kind not in JOB_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind должен быть одним из: {', '.join(JOB_KINDS)}")
+    if callback_url and not callback_url.startswith(("http://", "https://")):
+        raise HTTPException(status_code=400, detail="callback_url должен быть http(s) URL")
+
+    if kind == "bigcheck":
+        uploads = await read_uploads(files, text_content, x_api_secret)
+        payload = TaskPayload(kind=kind, user_id=user_id, text_content=text_content, uploads=uploads)
+    else:
+        if len(files) != 1:
+            raise HTTPException(status_code=400, detail="Для kind=analyze нужен ровно один файл")
+        file = files[0]
+        payload = TaskPayload(
+            kind=kind,
+            user_id=user_id,
+            text_content=text_content,
+            media_type=detect_media_type(file, text_content),
+            uploads=[(file.filename, file.content_type, await file.read())],
+        )
+
+    if job_runner.queue is not None:
+        return await job_runner.enqueue(kind, payload.to_bytes(), callback_url)
+    # The payload waits in this process until the job ends: keep it on the memory budget.
+    held = take_upload_charge(request)
+    return await job_runner.submit(
+        kind, lambda: run_task(payload), callback_url, partial(memory_budget.release, held, "upload")
+    )
+
+
+@router.get("/{job_id}", response_model=JobInfo)
+async def get_job(
+    job_id: str,
+    x_api_secret: str = Header(..., alias="x-api-secret"),
+) -> JobInfo:
+    if x_api_secret != settings.api_secret_key:
+        raise HTTPException(status_code=403, detail="Invalid API secret")
+    job = await job_runner.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    return job
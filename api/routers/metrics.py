@@ -0,0 +1,31 @@
+"""GET /metrics — admission load, in-flight media memory, scheduler queue depth and wait
+times, bulkhead occupancy, hedging, adaptive provider limits, retry budgets, cancelled work (JSON)."""
+
+from fastapi import APIRouter
+
+from core.adaptive_limit import limiters
+from core.admission import admission
+from core.bulkhead import bulkheads
+from core.cancellation import cancellations
+from core.hedging import hedge_policy, latencies
+from core.jobs import job_runner
+from core.memory_budget import memory_budget
+from core.retry import retry_budgets
+from core.scheduler import scheduler
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def metrics() -> dict:
+    return {
+        "admission": admission.stats() if admission is not None else None,
+        "memory": memory_budget.stats(),
+        "scheduler": scheduler.stats() if scheduler is not None else None,
+        "bulkheads": bulkheads.stats(),
+        "hedging": hedge_policy.stats() if hedge_policy is not None else {"latency": latencies.stats()},
+        "adaptive_limits": limiters.stats(),
+        "retry_budgets": retry_budgets.stats(),
+        "cancellations": cancellations.stats(),
+        "task_queue_depth": await job_runner.queue.depth() if job_runner.queue is not None else None,
+    }
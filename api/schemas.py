@@ -2,7 +2,7 @@
 
 from pydantic import BaseModel, ConfigDict
 
-from core.enums import MediaType, ModelUsed, Verdict
+from core.enums import JobStatus, MediaType, ModelUsed, Verdict
 
 
 class AnalysisResult(BaseModel):
@@ -14,6 +14,11 @@ class AnalysisResult(BaseModel):
     explanation: str
     media_type: MediaType
     processing_ms: int = 0
+    cached: bool = False
+    frames_analyzed: int | None = None  # video only
+    frames_skipped: int | None = None  # video only: frames not scored after early stop
+    preprocessing: str | None = None  # downscale profile applied before upload
+    fake_score: float | None = None  # audio only: detector's probability of synthetic speech
 
 
 class FactCheckItem(BaseModel):
@@ -45,6 +50,18 @@ class AnalysisRequest(BaseModel):
     first_name: str | None = None
 
 
+class JobInfo(BaseModel):
+    job_id: str
+    kind: str  # analyze | bigcheck
+    status: JobStatus
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: dict | None = None  # AnalysisResult or BigCheckResponse, once succeeded
+    error: str | None = None
+    callback_url: str | None = None
+
+
 class HealthResponse(BaseModel):
     status: str
     version: str
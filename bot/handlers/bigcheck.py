@@ -1,7 +1,9 @@
 """Handler for /bigcheck — multi-file batch analysis mode in Telegram."""
 
-import asyncio
+import html
+import json
 import logging
+import time
 from io import BytesIO
 from typing import Any
 
@@ -13,6 +15,7 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
 
+from bot.utils.backoff import overloaded_text
 from bot.utils.formatters import (
     VERDICT_EMOJI,
     VERDICT_TEXT,
@@ -20,6 +23,7 @@ from bot.utils.formatters import (
     calculate_authenticity_index,
 )
 from core.config import settings
+from core.deadline import deadline_header
 
 # Better exception handling
 # Logging improved
@@ -29,6 +33,8 @@ logger = logging.getLogger(__name__)
 
 MAX_BIGCHECK_FILES = 10
 MAX_FILE_SIZE = 20 * 1024 * 1024  # 20 MB
+API_TIMEOUT_S = 120.0  # the API gets this budget minus a margin (x-deadline-ms)
+PROGRESS_EDIT_INTERVAL_S = 2.0  # Telegram rate-limits edits of one message
 
 
 class BigCheckStates(StatesGroup):
@@ -269,44 +275,62 @@ async def handle_bigcheck_analyze(callback: CallbackQuery, bot: Bot, state: FSMC
         except Exception:
             pass
 
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                f"{settings.api_base_url}/bigcheck",
-                headers={"x-api-secret": settings.api_secret_key},
+        result: dict | None = None
+        async with httpx.AsyncClient(timeout=API_TIMEOUT_S) as client:
+            async with client.stream(
+                "POST",
+                f"{settings.api_base_url}/bigcheck/stream",
+                headers={"x-api-secret": settings.api_secret_key, **deadline_header(API_TIMEOUT_S)},
                 data=form_data,
                 files=multipart_files,
-            )
-
-        if response.status_code == 429:
-            await progress_msg.edit_text(
-                "⛔ Дневной лимит исчерпан (3/день)\n\n"
-                "Обновится завтра в 00:00 МСК.\n"
-                "Premium: 100 проверок в месяц — 199₽"
-            )
-            return
-
-        if response.status_code == 400:
-            detail = response.json().get("detail", "Ошибка валидации")
-            await progress_msg.edit_text(f"❌ {detail}")
-            return
-
-        if response.status_code != 200:
+            ) as response:
+                if response.status_code == 429:
+                    await progress_msg.edit_text(
+                        "⛔ Дневной лимит исчерпан (3/день)\n\n"
+                        "Обновится завтра в 00:00 МСК.\n"
+                        "Premium: 100 проверок в месяц — 199₽"
+                    )
+                    return
+
+                if response.status_code == 400:
+                    await response.aread()
+                    detail = response.json().get("detail", "Ошибка валидации")
+                    await progress_msg.edit_text(f"❌ {detail}")
+                    return
+
+                if response.status_code == 503:
+                    await progress_msg.edit_text(overloaded_text(response))
+                    return
+
+                if response.status_code != 200:
+                    await progress_msg.edit_text("❌ Ошибка сервера. Попробуйте позже.")
+                    return
+
+                done: list[dict] = []
+                last_edit = 0.0
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    frame = json.loads(line)
+                    if frame.get("type") == "summary":
+                        result = frame["result"]
+                    elif frame.get("type") == "item":
+                        done.append(frame["result"])
+                        if time.monotonic() - last_edit < PROGRESS_EDIT_INTERVAL_S:
+                            continue  # the final result replaces the message anyway
+                        last_edit = time.monotonic()
+                        try:
+                            await progress_msg.edit_text(
+                                _format_bigcheck_progress(done, frame.get("total", total)),
+                                parse_mode="HTML",
+                            )
+                        except Exception as exc:  # noqa: BLE001
+                            logger.warning("BigCheck progress update failed: %s", exc)
+
+        if result is None:
             await progress_msg.edit_text("❌ Ошибка сервера. Попробуйте позже.")
             return
 
-        # Update progress
-        try:
-            await progress_msg.edit_text(
-                "🔬 <b>Большая проверка</b>\n\n"
-                "📊 Формирование кросс-анализа...",
-                parse_mode="HTML",
-            )
-        except Exception:
-            pass
-
-        await asyncio.sleep(0.5)
-
-        result = response.json()
         formatted = _format_bigcheck_result(result)
 
         # Share keyboard
@@ -350,6 +374,18 @@ async def handle_bigcheck_new(callback: CallbackQuery, state: FSMContext) -> Non
     )
 
 
+def _format_bigcheck_progress(done: list[dict], total: int) -> str:
+    """Format the interim Big Check message shown while items are still streaming in."""
+    text = (
+        "🔬 <b>Большая проверка</b>\n\n"
+        f"⏳ Готово: {len(done)}/{total}\n"
+    )
+    for fr in done:
+        v = fr.get("verdict", "UNCERTAIN")
+        text += f"\n{VERDICT_EMOJI.get(v, '❓')} {html.escape(fr.get('filename', 'файл'))}"
+    return text
+
+
 def _format_bigcheck_result(result: dict) -> str:
     """Format Big Check API response into a Telegram message."""
     overall_verdict = result.get("overall_verdict", "UNCERTAIN")
@@ -386,7 +422,7 @@ def _format_bigcheck_result(result: dict) -> str:
         for i, fr in enumerate(file_results, 1):
             media_type = fr.get("media_type", "unknown")
             icon = {"image": "📷", "audio": "🎵", "video": "🎬", "text": "📝"}.get(media_type, "📄")
-            fname = fr.get("filename", "файл")
+            fname = html.escape(fr.get("filename", "файл"))
             v = fr.get("verdict", "UNCERTAIN")
             v_emoji = VERDICT_EMOJI.get(v, "❓")
             v_text = "Подлинное" if v == "REAL" else "Сгенерировано" if v == "FAKE" else "Неопред."
@@ -10,8 +10,10 @@ from aiogram.types import CallbackQuery, Message
 
 from api.schemas import AnalysisResult
 from bot.keyboards.inline import share_result_keyboard
+from bot.utils.backoff import overloaded_text, post_with_backoff
 from bot.utils.formatters import format_result
 from core.config import settings
+from core.deadline import deadline_header
 
 # Improved maintainability
 router = Router()
@@ -19,6 +21,7 @@ logger = logging.getLogger(__name__)
 
 MAX_FILE_SIZE_GENERAL = 20 * 1024 * 1024  # 20 MB
 MAX_FILE_SIZE_VIDEO = 50 * 1024 * 1024    # 50 MB
+API_TIMEOUT_S = 90.0  # the API gets this budget minus a margin (x-deadline-ms)
 
 RATE_LIMIT_MSG = (
     "⛔ Дневной лимит исчерпан (3/день)\n\n"
@@ -86,10 +89,11 @@ async def _send_to_api(
         pass  # Ignore if edit fails
 
     try:
-        async with httpx.AsyncClient(timeout=90.0) as client:
-            response = await client.post(
+        async with httpx.AsyncClient(timeout=API_TIMEOUT_S) as client:
+            response = await post_with_backoff(
+                client,
                 f"{settings.api_base_url}/analyze",
-                headers={"x-api-secret": settings.api_secret_key},
+                headers={"x-api-secret": settings.api_secret_key, **deadline_header(API_TIMEOUT_S)},
                 data={
                     "user_id": str(message.from_user.id),
                     "username": message.from_user.username or "",
@@ -114,7 +118,7 @@ async def _send_to_api(
             return
 
         if response.status_code == 503:
-            await progress_msg.edit_text("⚠️ Сервис анализа временно недоступен. Попробуйте позже.")
+            await progress_msg.edit_text(overloaded_text(response))
             return
 
         if response.status_code != 200:
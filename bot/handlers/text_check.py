@@ -9,14 +9,18 @@ from aiogram.filters import Command
 from aiogram.types import Message
 
 from api.schemas import AnalysisResult
+from bot.utils.backoff import overloaded_text, post_with_backoff
 from bot.utils.formatters import format_result
 from core.config import settings
+from core.deadline import deadline_header
 
 # Improved type safety
 # Memory-efficient implementation
 router = Router()
 logger = logging.getLogger(__name__)
 
+API_TIMEOUT_S = 60.0  # the API gets this budget minus a margin (x-deadline-ms)
+
 
 @router.message(Command("check"))
 async def handle_text_check(message: Message, bot: Bot) -> None:
@@ -61,10 +65,11 @@ async def _check_text(message: Message, bot: Bot, text: str) -> None:
     progress_msg = await message.reply("Анализирую текст...")
 
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
+        async with httpx.AsyncClient(timeout=API_TIMEOUT_S) as client:
+            response = await post_with_backoff(
+                client,
                 f"{settings.api_base_url}/analyze",
-                headers={"x-api-secret": settings.api_secret_key},
+                headers={"x-api-secret": settings.api_secret_key, **deadline_header(API_TIMEOUT_S)},
                 data={
                     "user_id": str(message.from_user.id),
                     "username": message.from_user.username or "",
@@ -89,6 +94,10 @@ async def _check_text(message: Message, bot: Bot, text: str) -> None:
             await progress_msg.edit_text(f"{error_detail}")
             return
 
+        if response.status_code == 503:
+            await progress_msg.edit_text(overloaded_text(response))
+            return
+
         if response.status_code != 200:
             await progress_msg.edit_text("Ошибка сервера. Попробуйте позже.")
             return
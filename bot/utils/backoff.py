@@ -0,0 +1,35 @@
+"""Honouring the API's load shedding: 503 with a Retry-After hint."""
+
+import asyncio
+import logging
+import math
+import random
+
+import httpx
+
+from core.config import settings
+from core.retry import parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+
+async def post_with_backoff(client: httpx.AsyncClient, url: str, **kwargs) -> httpx.Response:
+    """POST; if the API sheds the request with a short enough Retry-After, wait it out
+    (plus jitter, so shed users don't return in lockstep) and try once more."""
+    response = await client.post(url, **kwargs)
+    if response.status_code != 503:
+        return response
+    wait = parse_retry_after(response.headers.get("retry-after"))
+    if wait is None or wait > settings.bot_overload_max_wait_s:
+        return response
+    logger.info("API overloaded, retrying in %.0fs", wait)
+    await asyncio.sleep(wait * random.uniform(1.0, 1.5))
+    return await client.post(url, **kwargs)
+
+
+def overloaded_text(response: httpx.Response) -> str:
+    """User-facing message for a 503, with the API's retry hint when it sent one."""
+    wait = parse_retry_after(response.headers.get("retry-after"))
+    if wait:
+        return f"⚠️ Сервис перегружен. Попробуйте через {math.ceil(wait)} с."
+    return "⚠️ Сервис анализа временно недоступен. Попробуйте позже."
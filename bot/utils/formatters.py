@@ -21,6 +21,7 @@ MODEL_NAMES = {
     "sapling": "Sapling AI (\u0442\u0435\u043a\u0441\u0442)",
     "hf_image_inference": "HuggingFace (\u0444\u043e\u0442\u043e)",
     "hf_audio_inference": "HuggingFace (\u0430\u0443\u0434\u0438\u043e)",
+    "audio_ensemble": "Resemble + HuggingFace (\u0430\u0443\u0434\u0438\u043e)",
     "fallback_uncertain": "\u0420\u0435\u0437\u0435\u0440\u0432\u043d\u0430\u044f \u0441\u0438\u0441\u0442\u0435\u043c\u0430",
 }
 
@@ -29,6 +30,7 @@ MODEL_ACCURACY = {
     "hf_image_inference": "94.4%",
     "resemble_detect": "99.5%",
     "hf_audio_inference": "99.5%",
+    "audio_ensemble": "99.5%",
     "sightengine_video_pipeline": "81%",
     "sapling": "98%",
 }
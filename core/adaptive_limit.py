@@ -0,0 +1,204 @@
+"""Adaptive (AIMD) concurrency limits per provider, shared by every request in the process.
+
+The limit grows by roughly one slot per limit's worth of healthy calls made
+while it was saturated, and is cut multiplicatively when the provider answers
+429/5xx (``overloaded``) or when latency drifts well above its long-run
+baseline. Only calls started after the last cut can trigger another, so one
+burst of failures costs one back-off, not one per in-flight request.
+
+Permits are taken per HTTP attempt (``BaseAdapter._client``) for calls made
+under ``limiters.pacing()``, so retry waits between attempts hold no slot and
+never count as latency.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SHORT_ALPHA = 0.2  # EWMA weight of the recent-latency estimate
+LONG_ALPHA = 0.02  # EWMA weight of the baseline estimate
+
+_pacing: ContextVar[bool] = ContextVar("adaptive_limit_pacing", default=False)
+
+
+class Permit:
+    """One granted slot; report how the call went with ``succeeded()`` / ``overloaded()``."""
+
+    def __init__(self, saturated: bool) -> None:
+        self._saturated = saturated
+        self.started = time.monotonic()
+        self.outcome: str | None = None
+
+    def succeeded(self) -> None:
+        self.outcome = "ok"
+
+    def overloaded(self) -> None:
+        self.outcome = "overloaded"
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that tracks what the provider can take right now.
+
+    Waiters are plain futures, so one instance can serve several event loops.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: float = 5,
+        min_limit: float = 1,
+        max_limit: float = 32,
+        backoff: float = 0.5,
+        latency_backoff: float = 0.9,
+        latency_tolerance: float = 2.0,
+    ) -> None:
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_backoff = latency_backoff
+        self.latency_tolerance = latency_tolerance
+        self.inflight = 0
+        self.short_rtt: float | None = None
+        self.long_rtt: float | None = None
+        self.decreases = 0
+        self._last_decrease = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @classmethod
+    def from_settings(cls, name: str) -> "AdaptiveLimiter":
+        """Disabled adaptation pins the limit at ``adaptive_limit_initial``."""
+        adaptive = settings.adaptive_limit_enabled
+        return cls(
+            name,
+            initial=settings.adaptive_limit_initial,
+            min_limit=settings.adaptive_limit_min if adaptive else settings.adaptive_limit_initial,
+            max_limit=settings.adaptive_limit_max if adaptive else settings.adaptive_limit_initial,
+            backoff=settings.adaptive_limit_backoff,
+            latency_backoff=settings.adaptive_limit_latency_backoff,
+            latency_tolerance=settings.adaptive_limit_latency_tolerance,
+        )
+
+    @property
+    def capacity(self) -> int:
+        return max(1, int(self.limit))
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Permit]:
+        saturated = self.inflight + 1 >= self.capacity or bool(self._waiters)
+        if self.inflight < self.capacity and not self._waiters:
+            self.inflight += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter  # the releaser hands its slot over
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._release()
+                else:
+                    self._waiters.remove(waiter)
+                raise
+        permit = Permit(saturated)
+        try:
+            yield permit
+        finally:
+            self._record(permit)
+            self._release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "inflight": self.inflight,
+            "queued": len(self._waiters),
+            "latency_ms": round(self.short_rtt * 1000) if self.short_rtt is not None else None,
+            "baseline_ms": round(self.long_rtt * 1000) if self.long_rtt is not None else None,
+            "decreases": self.decreases,
+        }
+
+    def _record(self, permit: Permit) -> None:
+        if permit.outcome is None:  # cancelled or failed for reasons unrelated to load
+            return
+        if permit.outcome == "overloaded":
+            self._decrease(permit, self.backoff, "overloaded")
+            return
+
+        rtt = time.monotonic() - permit.started
+        self.short_rtt = rtt if self.short_rtt is None else self.short_rtt + SHORT_ALPHA * (rtt - self.short_rtt)
+        self.long_rtt = rtt if self.long_rtt is None else self.long_rtt + LONG_ALPHA * (rtt - self.long_rtt)
+        if self.short_rtt > self.long_rtt * self.latency_tolerance:
+            self._decrease(permit, self.latency_backoff, "latency rising")
+        elif permit._saturated:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._wake()
+
+    def _decrease(self, permit: Permit, factor: float, reason: str) -> None:
+        if permit.started < self._last_decrease:
+            return  # already backed off for the load this call saw
+        self._last_decrease = time.monotonic()
+        self.decreases += 1
+        self.limit = max(self.min_limit, self.limit * factor)
+        logger.info("Adaptive limit %s → %.1f (%s)", self.name, self.limit, reason)
+
+    def _release(self) -> None:
+        while self._waiters and self.inflight <= self.capacity:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # slot handed over, inflight unchanged
+                return
+        self.inflight -= 1
+
+    def _wake(self) -> None:
+        # a raised limit may admit queued waiters right away
+        while self._waiters and self.inflight < self.capacity:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.inflight += 1
+                waiter.set_result(None)
+
+
+class AdaptiveLimiterRegistry:
+    def __init__(self) -> None:
+        self._limiters: dict[str, AdaptiveLimiter] = {}
+
+    def get(self, provider: str) -> AdaptiveLimiter:
+        limiter = self._limiters.get(provider)
+        if limiter is None:
+            limiter = self._limiters[provider] = AdaptiveLimiter.from_settings(provider)
+        return limiter
+
+    @contextmanager
+    def pacing(self) -> Iterator[None]:
+        """Pace provider calls made in this context (and tasks started from it)."""
+        token = _pacing.set(True)
+        try:
+            yield
+        finally:
+            _pacing.reset(token)
+
+    @asynccontextmanager
+    async def paced(self, provider: str) -> AsyncIterator[Permit | None]:
+        """A permit from ``provider``'s limiter under ``pacing()``; None (no limit) otherwise."""
+        if not _pacing.get():
+            yield None
+            return
+        async with self.get(provider).acquire() as permit:
+            yield permit
+
+    def stats(self) -> dict[str, dict]:
+        return {name: limiter.stats() for name, limiter in sorted(self._limiters.items())}
+
+    def reset(self) -> None:
+        self._limiters.clear()
+
+
+limiters = AdaptiveLimiterRegistry()
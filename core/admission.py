@@ -0,0 +1,102 @@
+"""Admission control: shed excess requests at the door instead of queueing them forever.
+
+Load is the highest of three ratios: admitted requests in flight over
+``admission_max_inflight``, their upload bytes over ``admission_max_bytes``, and
+the scheduler's current queue wait over ``admission_max_queue_wait_s``. Each
+kind of request is shed once load would pass its own threshold, so under a
+spike video goes first, then Big Check batches and audio, while photos and text
+are admitted until the service is actually full.
+"""
+
+import logging
+import math
+from collections import Counter
+from collections.abc import Callable
+
+from core.config import settings
+from core.exceptions import Overloaded
+from core.scheduler import scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_inflight: int = 64,
+        max_bytes: int = 512 * 1024 * 1024,
+        max_queue_wait_s: float = 10.0,
+        shed_at: dict[str, float] | None = None,
+        retry_after_s: float = 5.0,
+        queue_wait: Callable[[], float] = lambda: 0.0,
+    ) -> None:
+        self.max_inflight = max_inflight
+        self.max_bytes = max_bytes
+        self.max_queue_wait_s = max_queue_wait_s
+        self.shed_at = shed_at or {}  # kinds not listed are shed only at full load
+        self.retry_after_s = retry_after_s
+        self.queue_wait = queue_wait
+        self.inflight = 0
+        self.bytes = 0
+        self.shed: Counter[str] = Counter()
+
+    @classmethod
+    def from_settings(cls) -> "AdmissionController":
+        return cls(
+            max_inflight=settings.admission_max_inflight,
+            max_bytes=settings.admission_max_bytes,
+            max_queue_wait_s=settings.admission_max_queue_wait_s,
+            shed_at={
+                "video": settings.admission_shed_video_at,
+                "batch": settings.admission_shed_batch_at,
+                "audio": settings.admission_shed_audio_at,
+            },
+            retry_after_s=settings.admission_retry_after_s,
+            queue_wait=scheduler.queue_wait if scheduler is not None else lambda: 0.0,
+        )
+
+    def load(self, extra_requests: int = 0, extra_bytes: int = 0) -> float:
+        return max(
+            (self.inflight + extra_requests) / self.max_inflight,
+            (self.bytes + extra_bytes) / self.max_bytes,
+            self.queue_wait() / self.max_queue_wait_s,
+        )
+
+    def check(self, kind: str) -> None:
+        """Shed an already admitted request now that its ``kind`` is known (e.g. video)."""
+        self._judge(kind, self.load())
+
+    def admit(self, kind: str, size: int = 0) -> None:
+        """Take an in-flight place (and ``size`` upload bytes) or raise Overloaded.
+
+        Every successful ``admit`` must be paired with ``release(size)``.
+        """
+        self._judge(kind, self.load(1, size))
+        self.inflight += 1
+        self.bytes += size
+
+    def release(self, size: int = 0) -> None:
+        self.inflight -= 1
+        self.bytes -= size
+
+    def stats(self) -> dict:
+        return {
+            "inflight": self.inflight,
+            "max_inflight": self.max_inflight,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "queue_wait_ms": round(self.queue_wait() * 1000, 1),
+            "load": round(self.load(), 3),
+            "shed": dict(sorted(self.shed.items())),
+        }
+
+    def _judge(self, kind: str, load: float) -> None:
+        if load <= self.shed_at.get(kind, 1.0):
+            return
+        self.shed[kind] += 1
+        retry_after = math.ceil(max(self.retry_after_s, self.queue_wait()))
+        logger.warning("Shedding %s request at load %.2f, retry after %ds", kind, load, retry_after)
+        raise Overloaded(kind, retry_after)
+
+
+admission: AdmissionController | None = AdmissionController.from_settings() if settings.admission_enabled else None
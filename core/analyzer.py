@@ -8,7 +8,11 @@ from typing import Any, Dict, List
 import g4f
 
 from adapters.sapling import SaplingAdapter
-from core.enums import ModelUsed
+from core import deadline
+from core.bulkhead import bulkheads
+from core.circuit_breaker import breakers
+from core.enums import MediaType, ModelUsed
+from core.exceptions import DeadlineExceeded
 
 # Strict system prompt for web-enabled fact-checking
 FACTCHECK_SYSTEM_PROMPT = (
@@ -32,25 +36,30 @@ class HybridTextAnalyzer:
         "command-r",     # fallback 2
     ]
 
-    FACTCHECK_TIMEOUT_S = 12
+    FACTCHECK_TIMEOUT_S = 12  # whole cascade
+    FACTCHECK_MODEL_TIMEOUT_S = 8  # one model, so a hung primary leaves the fallback time
 
     def __init__(self) -> None:
         self.sapling = SaplingAdapter()
 
-    async def _call_g4f(self, model_name: str, text: str) -> Dict[str, Any]:
+    async def _call_g4f(self, model_name: str, text: str, timeout: float | None = None) -> Dict[str, Any]:
         messages = [
             {"role": "system", "content": FACTCHECK_SYSTEM_PROMPT},
             {"role": "user", "content": text},
         ]
 
+        timeout = deadline.clamp(self.FACTCHECK_TIMEOUT_S if timeout is None else timeout)
+
         def _run():
             return g4f.ChatCompletion.create(
                 model=model_name,
                 messages=messages,
-                timeout=self.FACTCHECK_TIMEOUT_S,
+                timeout=timeout,
             )
 
-        raw = await asyncio.to_thread(_run)
+        # g4f blocks a worker thread per call; cap them so the shared pool stays free.
+        # The slot outlives a cancelled call until its thread actually returns.
+        raw = await bulkheads.run_in_thread("g4f", _run)
         content = "" if raw is None else ("".join(raw) if not isinstance(raw, str) else raw)
         ok, parsed = self._parse_json(content)
         if not ok or not isinstance(parsed, dict) or "fact_checks" not in parsed:
@@ -82,15 +91,46 @@ class HybridTextAnalyzer:
             return False, None
 
     async def fact_check(self, text: str) -> tuple[Dict[str, Any], str]:
-        """Run g4f with cascade fallback; returns (parsed_json, model_name)."""
+        """Run g4f with cascade fallback; returns (parsed_json, model_name).
+
+        Each model gets up to ``FACTCHECK_MODEL_TIMEOUT_S`` of the cascade's
+        ``FACTCHECK_TIMEOUT_S``; a model that times out counts as a failure on its
+        breaker. Raises asyncio.TimeoutError once the cascade is out of time, and
+        stops moving down it once the request deadline has run out.
+        """
         last_error = ""
+        timed_out = False
+        cascade_end = time.monotonic() + deadline.clamp(self.FACTCHECK_TIMEOUT_S)
         for model in self.MODEL_CASCADE:
+            if deadline.expired():
+                last_error = last_error or "deadline exceeded"
+                break
+            remaining = cascade_end - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            breaker = breakers.get(f"g4f:{model}")
+            if not breaker.allow():
+                last_error = f"{model}: circuit open"
+                continue
+            timeout = min(self.FACTCHECK_MODEL_TIMEOUT_S, remaining)
             try:
-                parsed = await self._call_g4f(model, text)
-                return parsed, model
+                parsed = await asyncio.wait_for(self._call_g4f(model, text, timeout), timeout)
+            except asyncio.TimeoutError:
+                breaker.record_failure()
+                last_error, timed_out = f"{model}: timed out", True
+                continue
+            except asyncio.CancelledError:
+                breaker.release()
+                raise
             except Exception as exc:  # noqa: BLE001
-                last_error = str(exc)
+                breaker.record_failure()
+                last_error, timed_out = str(exc), False
                 continue
+            breaker.record_success()
+            return parsed, model
+        if timed_out:
+            raise asyncio.TimeoutError(f"g4f cascade out of time: {last_error}")
         raise RuntimeError(f"All g4f models failed: {last_error}")
 
     @staticmethod
@@ -151,15 +191,25 @@ class HybridTextAnalyzer:
         fc_parsed: Dict[str, Any] = {"fact_checks": []}
         fc_model = "g4f_timeout"
         try:
-            fc_parsed, fc_model = await asyncio.wait_for(
-                self.fact_check(text),
-                timeout=self.FACTCHECK_TIMEOUT_S,
-            )
-        except Exception:
-            fc_parsed = {"fact_checks": []}
-            fc_model = "g4f_unavailable"
+            try:
+                fc_parsed, fc_model = await self.fact_check(text)
+            except asyncio.TimeoutError:
+                fc_parsed = {"fact_checks": []}
+                fc_model = "g4f_timeout"
+            except Exception:
+                fc_parsed = {"fact_checks": []}
+                fc_model = "g4f_unavailable"
 
-        sapling_res = await sapling_task
+            try:
+                sapling_res = await sapling_task
+            except DeadlineExceeded:
+                # Partial answer: keep whatever the fact-check found.
+                sapling_res = self.sapling._build_uncertain(
+                    "Sapling: не хватило времени на анализ.", ModelUsed.SAPLING, MediaType.TEXT
+                )
+        finally:
+            # cancelled (client gone): don't leave the Sapling call running
+            sapling_task.cancel()
 
         raw_checks = fc_parsed.get("fact_checks", []) if isinstance(fc_parsed, dict) else []
         fact_checks = []
@@ -0,0 +1,172 @@
+"""Bulkheads: isolated, bounded concurrency pools per media type and provider.
+
+``workload(media_type)`` wraps a whole analysis and remembers the media type in
+a context variable, so every provider call made on its behalf lands in its own
+``"<provider>:<media type>"`` pool. Video frames therefore queue in
+``sightengine:video`` and can't take the ``sightengine:image`` slots that
+single photos use. A pool whose queue is already full rejects at once instead
+of letting waiters pile up.
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import TypeVar
+
+from core.config import settings
+from core.enums import MediaType
+from core.exceptions import BulkheadFull
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+current_workload: contextvars.ContextVar[str | None] = contextvars.ContextVar("current_workload", default=None)
+
+
+class Bulkhead:
+    """Counting semaphore with a bounded wait queue.
+
+    Waiters are plain futures created on the caller's loop, so one instance can
+    serve several event loops (the Appwrite entrypoint runs one loop per call).
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int) -> None:
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.active = 0
+        self.rejected = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        await self._enter()
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def run_in_thread(self, func: Callable[[], T]) -> T:
+        """Run blocking ``func`` in a worker thread, holding a slot until the thread returns.
+
+        Cancelling the caller doesn't stop the thread, so the slot isn't given back
+        before it ends; otherwise the pool wouldn't bound live threads.
+        """
+        await self._enter()
+        loop = asyncio.get_running_loop()
+        lock = threading.Lock()
+        state = {"started": False, "abandoned": False}
+
+        def _run():
+            with lock:
+                if state["abandoned"]:
+                    return None  # cancelled before it started; the slot is already back
+                state["started"] = True
+            try:
+                return func()
+            finally:
+                loop.call_soon_threadsafe(self._release)
+
+        try:
+            return await asyncio.to_thread(_run)
+        except asyncio.CancelledError:
+            with lock:
+                if not state["started"]:
+                    state["abandoned"] = True
+                    self._release()
+            raise
+
+    async def _enter(self) -> None:
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+        else:
+            if len(self._waiters) >= self.max_queue:
+                self.rejected += 1
+                logger.warning("Bulkhead %s full (%s active, %s queued)", self.name, self.active, len(self._waiters))
+                raise BulkheadFull(self.name)
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter  # the releaser hands its slot over (active stays the same)
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._release()
+                else:
+                    self._waiters.remove(waiter)
+                raise
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "queued": len(self._waiters),
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+        }
+
+    def _release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class BulkheadRegistry:
+    def __init__(self) -> None:
+        self._pools: dict[str, Bulkhead] = {}
+
+    def get(self, name: str) -> Bulkhead:
+        pool = self._pools.get(name)
+        if pool is None:
+            pool = Bulkhead(
+                name,
+                settings.bulkhead_concurrency.get(name, settings.bulkhead_default_concurrency),
+                settings.bulkhead_queue.get(name, settings.bulkhead_default_queue),
+            )
+            self._pools[name] = pool
+        return pool
+
+    @asynccontextmanager
+    async def workload(self, media_type: MediaType) -> AsyncIterator[None]:
+        """Run one analysis in its media type's pool and tag provider calls made inside it."""
+        token = current_workload.set(media_type.value)
+        try:
+            if not settings.bulkhead_enabled:
+                yield
+                return
+            async with self.get(media_type.value).acquire():
+                yield
+        finally:
+            current_workload.reset(token)
+
+    @asynccontextmanager
+    async def provider(self, provider: str) -> AsyncIterator[None]:
+        """Hold a slot in ``provider``'s pool for the current workload."""
+        if not settings.bulkhead_enabled or not provider:
+            yield
+            return
+        async with self._provider_pool(provider).acquire():
+            yield
+
+    async def run_in_thread(self, provider: str, func: Callable[[], T]) -> T:
+        """``asyncio.to_thread(func)`` holding a slot in ``provider``'s pool until the thread returns."""
+        if not settings.bulkhead_enabled or not provider:
+            return await asyncio.to_thread(func)
+        return await self._provider_pool(provider).run_in_thread(func)
+
+    def _provider_pool(self, provider: str) -> Bulkhead:
+        workload = current_workload.get()
+        return self.get(f"{provider}:{workload}" if workload else provider)
+
+    def stats(self) -> dict[str, dict]:
+        return {name: pool.stats() for name, pool in sorted(self._pools.items())}
+
+
+bulkheads = BulkheadRegistry()
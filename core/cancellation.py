@@ -0,0 +1,39 @@
+"""Counts of work abandoned because nobody was waiting for it any more."""
+
+import asyncio
+from collections import Counter
+
+STOPPED = "stopped"  # cancel() message for work stopped on purpose (e.g. a video early stop)
+
+
+def abandoned(exc: BaseException) -> bool:
+    """Whether ``exc``, seen while cleaning up, means the caller was cancelled.
+
+    A ``STOPPED`` cancellation is a deliberate stop; a GeneratorExit is a deliberate
+    ``aclose()`` unless the closing task is itself being cancelled.
+    """
+    if isinstance(exc, asyncio.CancelledError):
+        return exc.args[:1] != (STOPPED,)
+    task = asyncio.current_task()
+    return task is not None and task.cancelling() > 0
+
+
+class CancellationCounter:
+    """Per-kind counts: endpoint names for requests whose client disconnected,
+    ``ffmpeg`` for tool processes killed because their caller was cancelled
+    (not for deliberate early stops)."""
+
+    def __init__(self) -> None:
+        self._counts: Counter[str] = Counter()
+
+    def record(self, kind: str) -> None:
+        self._counts[kind] += 1
+
+    def stats(self) -> dict[str, int]:
+        return dict(sorted(self._counts.items()))
+
+    def reset(self) -> None:
+        self._counts.clear()
+
+
+cancellations = CancellationCounter()
@@ -0,0 +1,160 @@
+"""Per-provider circuit breakers shared by every request in the process."""
+
+import logging
+import time
+from collections import deque
+
+from core.config import settings
+from core.enums import CircuitState
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Rolling-window breaker: CLOSED → OPEN on too many failures, OPEN → HALF_OPEN
+    after ``open_s``, HALF_OPEN → CLOSED on a successful probe (or back to OPEN).
+
+    Every ``allow()`` that returns True must be followed by exactly one of
+    ``record_success()``, ``record_failure()`` or ``release()``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_s: float = 60.0,
+        min_calls: int = 5,
+        failure_ratio: float = 0.5,
+        open_s: float = 30.0,
+        half_open_probes: int = 1,
+    ) -> None:
+        self.name = name
+        self.window_s = window_s
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.open_s = open_s
+        self.half_open_probes = half_open_probes
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._calls: deque[tuple[float, bool]] = deque()  # (timestamp, failed)
+        self.rejected = 0
+
+    @classmethod
+    def from_settings(cls, name: str) -> "CircuitBreaker":
+        return cls(
+            name,
+            window_s=settings.breaker_window_s,
+            min_calls=settings.breaker_min_calls,
+            failure_ratio=settings.breaker_failure_ratio,
+            open_s=settings.breaker_open_s,
+            half_open_probes=settings.breaker_half_open_probes,
+        )
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.open_s:
+            self._state = CircuitState.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def available(self) -> bool:
+        """Would a call be let through right now? (Doesn't take a probe slot.)"""
+        state = self.state
+        return state == CircuitState.CLOSED or (
+            state == CircuitState.HALF_OPEN and self._probes < self.half_open_probes
+        )
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN and self._probes < self.half_open_probes:
+            self._probes += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        if self._state == CircuitState.HALF_OPEN:
+            logger.info("Circuit %s closed after a successful probe", self.name)
+            self._state = CircuitState.CLOSED
+            self._calls.clear()
+            return
+        self._add(failed=False)
+
+    def record_failure(self) -> None:
+        if self._state == CircuitState.HALF_OPEN:
+            self._open("probe failed")
+            return
+        self._add(failed=True)
+        failures = sum(failed for _, failed in self._calls)
+        if (
+            self._state == CircuitState.CLOSED
+            and len(self._calls) >= self.min_calls
+            and failures / len(self._calls) >= self.failure_ratio
+        ):
+            self._open(f"{failures}/{len(self._calls)} calls failed in {self.window_s:.0f}s")
+
+    def release(self) -> None:
+        """The call ended without telling us anything about the provider (e.g. cancelled)."""
+        if self._state == CircuitState.HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def stats(self) -> dict:
+        self._trim(time.monotonic())
+        return {
+            "state": self.state.value,
+            "calls": len(self._calls),
+            "failures": sum(failed for _, failed in self._calls),
+            "rejected": self.rejected,
+            "retry_in_s": (
+                round(max(0.0, self._opened_at + self.open_s - time.monotonic()), 1)
+                if self._state == CircuitState.OPEN else 0.0
+            ),
+        }
+
+    def _add(self, failed: bool) -> None:
+        now = time.monotonic()
+        self._calls.append((now, failed))
+        self._trim(now)
+
+    def _trim(self, now: float) -> None:
+        while self._calls and self._calls[0][0] < now - self.window_s:
+            self._calls.popleft()
+
+    def _open(self, reason: str) -> None:
+        logger.warning("Circuit %s opened: %s", self.name, reason)
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._probes = 0
+        self._calls.clear()
+
+
+class _DisabledBreaker(CircuitBreaker):
+    def allow(self) -> bool:
+        return True
+
+    def available(self) -> bool:
+        return True
+
+
+class BreakerRegistry:
+    def __init__(self) -> None:
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            factory = CircuitBreaker.from_settings if settings.breaker_enabled else _DisabledBreaker
+            breaker = factory(name)
+            self._breakers[name] = breaker
+        return breaker
+
+    def stats(self) -> dict[str, dict]:
+        return {name: breaker.stats() for name, breaker in sorted(self._breakers.items())}
+
+    def reset(self) -> None:
+        self._breakers.clear()
+
+
+breakers = BreakerRegistry()
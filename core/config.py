@@ -27,6 +27,178 @@ class Settings(BaseSettings):
     # FFmpeg / video
     max_video_duration_seconds: int = 60
     video_frame_sample_rate: int = 1
+    video_sampling_mode: str = "fps"  # fps | keyframes | scene | budget
+    video_scene_threshold: float = 0.3  # scene mode: 0..1 change score to emit a frame
+    video_frame_budget: int = 16  # budget mode: frames spread over the whole duration
+    video_dedup_enabled: bool = True  # score one frame per run of near-identical frames
+    video_dedup_max_distance: int = 4  # pHash Hamming bits
+    video_early_stop: bool = True  # stop scoring frames once the verdict is settled
+    video_early_stop_min_frames: int = 8
+    video_early_stop_z: float = 2.58  # ~99% interval
+    ffmpeg_max_concurrency: int = 4  # ffmpeg/ffprobe processes per worker
+    ffmpeg_timeout_s: float = 120.0
+
+    # Downscaling before upload (per provider; HF image model works at ~224 px)
+    image_preprocess_enabled: bool = True
+    sightengine_max_side: int = 1024
+    sightengine_jpeg_quality: int = 85
+    hf_image_max_side: int = 256
+    hf_image_jpeg_quality: int = 90
+
+    # Outbound HTTP connection pool (shared by all adapters)
+    http2_enabled: bool = False
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry_s: float = 30.0
+
+    # Scheduler in front of MediaRouter.route: weighted fair queuing across users,
+    # weighted by priority class; video costs more scheduler time than a photo.
+    scheduler_enabled: bool = True
+    scheduler_max_concurrency: int = 16  # route() calls running at once
+    scheduler_max_inflight_per_user: int = 2
+    scheduler_weight_premium: float = 4.0
+    scheduler_weight_free: float = 2.0
+    scheduler_weight_batch: float = 1.0
+    scheduler_video_cost: float = 4.0  # photos, audio and text cost 1
+    premium_user_ids: list[int] = []
+
+    # Bulkheads: "<media type>" pools bound whole analyses, "<provider>:<media type>"
+    # pools bound provider calls made for them (video frames → "sightengine:video").
+    bulkhead_enabled: bool = True
+    bulkhead_default_concurrency: int = 8
+    bulkhead_default_queue: int = 32
+    bulkhead_concurrency: dict[str, int] = {
+        "image": 16,
+        "audio": 8,
+        "video": 4,
+        "text": 16,
+        "sightengine:image": 8,
+        "sightengine:video": 16,  # frame calls are paced by the adaptive limiter
+        "hf_image:video": 16,
+        "g4f": 4,
+    }
+    bulkhead_queue: dict[str, int] = {
+        "video": 8,
+        "sightengine:video": 128,  # frames of the videos admitted above
+        "hf_image:video": 128,
+    }
+
+    # Circuit breakers per provider (and per g4f model): open once enough calls in
+    # the window failed (5xx, 429, timeouts), then let half-open probes through.
+    breaker_enabled: bool = True
+    breaker_window_s: float = 60.0
+    breaker_min_calls: int = 5
+    breaker_failure_ratio: float = 0.5
+    breaker_open_s: float = 30.0
+    breaker_half_open_probes: int = 1
+
+    # Hedging: once the primary (Sightengine / Resemble) has run past its observed
+    # p-quantile latency, start the HF fallback too and take the first decisive answer.
+    hedge_enabled: bool = True
+    hedge_quantile: float = 0.9
+    hedge_min_samples: int = 20  # until then the primary gets hedge_default_delay_s
+    hedge_default_delay_s: float = 4.0
+    hedge_min_delay_s: float = 0.5
+    hedge_max_inflight: int = 2  # concurrent hedges per fallback provider
+
+    # Audio ensemble: Resemble and HF Audio run concurrently on one decoded WAV and
+    # their synthetic-speech scores are fused; a decisive Resemble score wins alone.
+    audio_ensemble_enabled: bool = True
+    audio_ensemble_weight_resemble: float = 0.6
+    audio_ensemble_weight_hf: float = 0.4
+    audio_ensemble_decisive_fake: float = 0.9  # Resemble score at or above → FAKE without HF
+    audio_ensemble_decisive_real: float = 0.1  # Resemble score at or below → REAL without HF
+
+    # Adaptive (AIMD) concurrency for per-frame provider calls, shared by all videos:
+    # +1 per saturated round of healthy calls, ×backoff on 429/5xx, ×latency_backoff
+    # when recent latency exceeds latency_tolerance × its long-run baseline.
+    adaptive_limit_enabled: bool = True
+    adaptive_limit_initial: float = 5
+    adaptive_limit_min: float = 1
+    adaptive_limit_max: float = 16
+    adaptive_limit_backoff: float = 0.5
+    adaptive_limit_latency_backoff: float = 0.9
+    adaptive_limit_latency_tolerance: float = 2.0
+
+    # Provider state shared across requests: a 429 that outlived the retries marks the
+    # quota exhausted (for Retry-After or this cooldown); a run of 5xx marks it failing.
+    provider_quota_cooldown_s: float = 60.0
+    provider_server_error_threshold: int = 3
+    provider_server_error_cooldown_s: float = 30.0
+
+    # Provider 429 retries: honour Retry-After, otherwise decorrelated jitter between
+    # base and max delay, never waiting more than retry_max_wait_s per call in total.
+    retry_max_attempts: int = 3  # including the first; 1 disables retries
+    retry_base_delay_s: float = 0.2
+    retry_max_delay_s: float = 2.0
+    retry_max_wait_s: float = 4.0
+    retry_budget_ratio: float = 0.2  # retries earned per first attempt
+    retry_budget_min_per_s: float = 0.5  # plus this many per second regardless of traffic
+    retry_budget_max_tokens: float = 10.0
+
+    # Request deadlines (x-deadline-ms): stages that would start with less than
+    # deadline_min_stage_s left are skipped; the bot budgets its own timeout minus margin.
+    deadline_min_stage_s: float = 0.5
+    deadline_max_s: float = 300.0
+    deadline_margin_s: float = 5.0
+
+    # Admission control in front of /analyze, /analyze/text/hybrid and /bigcheck. Load is
+    # the highest of in-flight/max, upload bytes/max and scheduler queue wait/max. A request
+    # is shed (503 + Retry-After) when load would pass its kind's threshold: video first.
+    admission_enabled: bool = True
+    admission_max_inflight: int = 64
+    admission_max_bytes: int = 512 * 1024 * 1024  # Content-Length of admitted uploads
+    admission_max_queue_wait_s: float = 10.0
+    admission_shed_video_at: float = 0.6
+    admission_shed_batch_at: float = 0.75
+    admission_shed_audio_at: float = 0.85
+    admission_retry_after_s: float = 5.0  # minimum hint; grows with the queue wait
+    bot_overload_max_wait_s: float = 20.0  # the bot retries once if the hint is this short
+
+    # Memory budget: bytes of uploads (by Content-Length), decoded audio and retained video
+    # frames held at once across requests. A charge waits up to memory_budget_max_wait_s
+    # for room, then the request gets 503 + Retry-After. Disabled → accounting only.
+    memory_budget_enabled: bool = True
+    memory_budget_bytes: int = 1024 * 1024 * 1024
+    memory_budget_reserve_bytes: int = 256 * 1024 * 1024  # uploads can't use it: decode/frames only
+    memory_budget_max_wait_s: float = 10.0
+
+    # Big Check: items analysed concurrently per request / across all requests
+    bigcheck_item_concurrency: int = 4
+    bigcheck_global_concurrency: int = 16
+
+    # Result cache (keyed by payload hash + the settings in result_cache._RESULT_SETTINGS;
+    # bump version when thresholds/models change outside those)
+    result_cache_enabled: bool = True
+    result_cache_max_entries: int = 2048
+    result_cache_ttl_s: int = 86400
+    result_cache_path: str = ""  # SQLite file for the persistent tier, empty → memory only
+    result_cache_version: str = "1"
+
+    # Perceptual-hash near-duplicate index for images
+    image_phash_enabled: bool = True
+    image_phash_max_distance: int = 6  # Hamming bits out of 64
+    image_phash_max_entries: int = 50_000
+
+    # Asynchronous jobs (POST /jobs)
+    job_executor: str = "local"  # local (in the API process) | queue (worker/main.py)
+    job_store_backend: str = "memory"  # memory | sqlite | redis (memory: local executor only)
+    job_store_path: str = "jobs.sqlite3"  # sqlite backend only
+    job_ttl_s: int = 86400  # finished jobs are forgotten after this
+    job_max_entries: int = 10_000  # memory backend only
+    job_max_concurrency: int = 4
+    job_webhook_timeout_s: float = 10.0
+    job_webhook_retries: int = 3
+    job_webhook_backoff_s: float = 1.0
+
+    # Worker tier (job_executor=queue)
+    task_queue_backend: str = "sqlite"  # sqlite | redis
+    task_queue_path: str = "tasks.sqlite3"
+    redis_url: str = ""  # empty → in-process stand-in, only usable when API and worker share a process
+    task_lease_s: float = 60.0  # heartbeats extend it; a crashed worker's task reappears after this
+    task_max_attempts: int = 3
+    worker_concurrency: int = 2
+    worker_poll_interval_s: float = 0.5
 
     model_config = {
         "env_file": ".env",
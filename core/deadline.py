@@ -0,0 +1,83 @@
+"""End-to-end request deadline carried through the analysis stack in a contextvar.
+
+Callers send ``x-deadline-ms``: the time they will still wait for an answer,
+relative so client and server clocks need not agree. The API runs the request
+inside ``deadline_scope()``; adapters, retries, ffmpeg steps and the g4f
+cascade clamp their own timeouts to ``remaining()`` and raise
+``DeadlineExceeded`` rather than start work that cannot finish. Tasks copy
+the context they are created in, so fan-out work inherits the deadline.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from core.config import settings
+from core.exceptions import DeadlineExceeded
+
+DEADLINE_HEADER = "x-deadline-ms"
+
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)  # time.monotonic()
+
+
+def parse_deadline_ms(value: str | None) -> float | None:
+    """Budget in seconds from an ``x-deadline-ms`` header, capped at ``deadline_max_s``."""
+    if not value:
+        return None
+    try:
+        budget = float(value) / 1000
+    except ValueError:
+        return None
+    return min(max(budget, 0.0), settings.deadline_max_s)
+
+
+def deadline_header(timeout_s: float) -> dict[str, str]:
+    """Header for a caller that gives up after ``timeout_s``, leaving ``deadline_margin_s``
+    for the upload and the response."""
+    budget = max(timeout_s - settings.deadline_margin_s, 0.0)
+    return {DEADLINE_HEADER: str(int(budget * 1000))}
+
+
+@contextmanager
+def deadline_scope(budget_s: float | None) -> Iterator[None]:
+    """Run the block with a deadline ``budget_s`` from now; an outer deadline is never extended."""
+    if budget_s is None:
+        yield
+        return
+    at = time.monotonic() + budget_s
+    outer = _deadline.get()
+    token = _deadline.set(at if outer is None else min(outer, at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left before the current deadline, or None when there is none."""
+    at = _deadline.get()
+    return None if at is None else max(at - time.monotonic(), 0.0)
+
+
+def allows(seconds: float) -> bool:
+    """True when ``seconds`` more work (plus ``deadline_min_stage_s``) still fits."""
+    left = remaining()
+    return left is None or left >= seconds + settings.deadline_min_stage_s
+
+
+def clamp(timeout: float) -> float:
+    """``timeout`` shortened to what is left of the deadline."""
+    left = remaining()
+    return timeout if left is None else min(timeout, left)
+
+
+def expired() -> bool:
+    """True when less than ``deadline_min_stage_s`` is left: too late to start anything."""
+    return not allows(0.0)
+
+
+def check(stage: str) -> None:
+    """Raise DeadlineExceeded when too little time is left to start ``stage``."""
+    if expired():
+        raise DeadlineExceeded(stage)
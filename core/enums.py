@@ -24,5 +24,25 @@ class ModelUsed(str, Enum):
     SAPLING = "sapling"
     HF_IMAGE = "hf_image_inference"
     HF_AUDIO = "hf_audio_inference"
+    AUDIO_ENSEMBLE = "audio_ensemble"
     FALLBACK_UNCERTAIN = "fallback_uncertain"
     HYBRID_G4F = "g4f_hybrid"
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Priority(str, Enum):
+    PREMIUM = "premium"
+    FREE = "free"
+    BATCH = "batch"
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
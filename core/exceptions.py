@@ -26,3 +26,37 @@ class FileTooLarge(Exception):
 
 class VideoTooLong(Exception):
     """Raised when the uploaded video exceeds the duration limit."""
+
+
+class JobFailed(Exception):
+    """Raised by background job work to record a user-facing failure reason."""
+
+
+class Overloaded(Exception):
+    """Raised when admission control sheds a request; retry after ``retry_after`` seconds."""
+
+    def __init__(self, kind: str, retry_after: int) -> None:
+        self.kind = kind
+        self.retry_after = retry_after
+        super().__init__(f"{kind}: overloaded")
+
+
+class BulkheadFull(ExternalAPIError):
+    """Raised when a bulkhead's concurrency pool and wait queue are both full."""
+
+    def __init__(self, pool: str) -> None:
+        super().__init__(pool, "bulkhead_full")
+
+
+class CircuitOpen(ExternalAPIError):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+    def __init__(self, provider: str) -> None:
+        super().__init__(provider, "circuit_open")
+
+
+class DeadlineExceeded(ExternalAPIError):
+    """Raised instead of starting work the caller's deadline leaves no time for."""
+
+    def __init__(self, stage: str) -> None:
+        super().__init__(stage, "deadline_exceeded")
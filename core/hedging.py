@@ -0,0 +1,187 @@
+"""Hedged primary/fallback provider calls driven by observed per-provider latency."""
+
+import asyncio
+import logging
+from collections import Counter, deque
+from collections.abc import Awaitable, Callable
+
+from api.schemas import AnalysisResult
+from core.config import settings
+from core.enums import Verdict
+from core.exceptions import ExternalAPIError
+
+logger = logging.getLogger(__name__)
+
+LATENCY_WINDOW = 200  # most recent successful calls per provider
+
+Call = Callable[[], Awaitable[AnalysisResult]]
+Merge = Callable[[AnalysisResult, AnalysisResult], AnalysisResult]
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per provider."""
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        self.window = window
+        self._samples: dict[str, deque[float]] = {}
+
+    def record(self, provider: str, seconds: float) -> None:
+        samples = self._samples.get(provider)
+        if samples is None:
+            samples = self._samples[provider] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def quantile(self, provider: str, q: float, min_samples: int = 1) -> float | None:
+        samples = self._samples.get(provider)
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stats(self) -> dict[str, dict]:
+        return {
+            provider: {"samples": len(samples), "p50_ms": round(self.quantile(provider, 0.5) * 1000)}
+            for provider, samples in sorted(self._samples.items())
+            if samples
+        }
+
+    def clear(self) -> None:
+        self._samples.clear()
+
+
+latencies = LatencyTracker()
+
+
+async def cancel_and_wait(task: asyncio.Task, msg: str | None = None) -> None:
+    """Cancel ``task`` (with ``msg``) and wait for it, so its provider slot is released before we return."""
+    task.cancel(msg)
+    await asyncio.wait({task})
+    if not task.cancelled():
+        task.exception()  # retrieved: the outcome is deliberately ignored
+
+
+def _decisive(task: asyncio.Task) -> bool:
+    return not task.cancelled() and task.exception() is None and task.result().verdict != Verdict.UNCERTAIN
+
+
+async def sequential_fallback(primary: Call, fallback: Call, merge: Merge | None = None) -> AnalysisResult:
+    """The un-hedged policy: fallback on ExternalAPIError, and (with ``merge``) on UNCERTAIN."""
+    try:
+        result = await primary()
+    except ExternalAPIError:
+        return await fallback()
+    if merge is not None and result.verdict == Verdict.UNCERTAIN:
+        return merge(result, await fallback())
+    return result
+
+
+class HedgePolicy:
+    """Start the fallback once the primary has run longer than its observed p-``quantile``
+    latency; the first decisive (non-UNCERTAIN) answer wins and the other call is cancelled.
+
+    ``max_inflight`` caps concurrent hedges per fallback provider, and hedges only
+    fire on the slowest ``1 - quantile`` of calls, so extra provider spend stays small.
+    """
+
+    def __init__(
+        self,
+        tracker: LatencyTracker,
+        quantile: float = 0.9,
+        min_samples: int = 20,
+        default_delay_s: float = 4.0,
+        min_delay_s: float = 0.5,
+        max_inflight: int = 2,
+    ) -> None:
+        self.tracker = tracker
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.default_delay_s = default_delay_s
+        self.min_delay_s = min_delay_s
+        self.max_inflight = max_inflight
+        self._inflight: Counter[str] = Counter()
+        self.hedged: Counter[str] = Counter()
+        self.hedge_wins: Counter[str] = Counter()
+
+    @classmethod
+    def from_settings(cls) -> "HedgePolicy":
+        return cls(
+            latencies,
+            quantile=settings.hedge_quantile,
+            min_samples=settings.hedge_min_samples,
+            default_delay_s=settings.hedge_default_delay_s,
+            min_delay_s=settings.hedge_min_delay_s,
+            max_inflight=settings.hedge_max_inflight,
+        )
+
+    def delay_for(self, provider: str) -> float:
+        observed = self.tracker.quantile(provider, self.quantile, self.min_samples)
+        return max(self.min_delay_s, observed if observed is not None else self.default_delay_s)
+
+    async def call(
+        self,
+        primary_provider: str,
+        primary: Call,
+        fallback_provider: str,
+        fallback: Call,
+        merge: Merge | None = None,
+    ) -> AnalysisResult:
+        """Same outcome rules as ``sequential_fallback``, plus a hedge for slow primaries."""
+        primary_task = asyncio.ensure_future(primary())
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=self.delay_for(primary_provider))
+            if done or self._inflight[fallback_provider] >= self.max_inflight:
+                return await self._finish_unhedged(primary_task, fallback, merge)
+
+            self._inflight[fallback_provider] += 1
+            self.hedged[fallback_provider] += 1
+            logger.info("%s slower than p%d, hedging with %s", primary_provider, self.quantile * 100, fallback_provider)
+            fallback_task = asyncio.ensure_future(fallback())
+            try:
+                return await self._race(primary_task, fallback_task, fallback_provider, merge)
+            finally:
+                self._inflight[fallback_provider] -= 1
+                await cancel_and_wait(fallback_task)
+        finally:
+            await cancel_and_wait(primary_task)
+
+    async def _finish_unhedged(self, primary_task: asyncio.Task, fallback: Call, merge: Merge | None) -> AnalysisResult:
+        async def _primary() -> AnalysisResult:
+            return await primary_task
+
+        return await sequential_fallback(_primary, fallback, merge)
+
+    async def _race(
+        self,
+        primary_task: asyncio.Task,
+        fallback_task: asyncio.Task,
+        fallback_provider: str,
+        merge: Merge | None,
+    ) -> AnalysisResult:
+        pending = {primary_task, fallback_task}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if primary_task in done and _decisive(primary_task):
+                return primary_task.result()
+            if fallback_task in done and _decisive(fallback_task):
+                self.hedge_wins[fallback_provider] += 1
+                return fallback_task.result()
+
+        # Neither was decisive: fall back to the sequential rules with both outcomes in hand.
+        primary_error = primary_task.exception()
+        if primary_error is not None:
+            if not isinstance(primary_error, ExternalAPIError):
+                raise primary_error
+            return fallback_task.result()  # raises the fallback's error if it failed too
+        if fallback_task.exception() is not None or merge is None:
+            return primary_task.result()
+        return merge(primary_task.result(), fallback_task.result())
+
+    def stats(self) -> dict:
+        return {
+            "hedged": dict(self.hedged),
+            "hedge_wins": dict(self.hedge_wins),
+            "latency": self.tracker.stats(),
+        }
+
+
+hedge_policy: HedgePolicy | None = HedgePolicy.from_settings() if settings.hedge_enabled else None
@@ -0,0 +1,306 @@
+"""Background analysis jobs: pluggable job store, runner and webhook delivery."""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import httpx
+from pydantic import BaseModel
+
+from adapters.http_client import http_clients
+from api.schemas import JobInfo
+from core.config import settings
+from core.enums import JobStatus
+from core.exceptions import JobFailed
+from core.task_queue import TaskQueue, create_task_queue, redis_client
+
+logger = logging.getLogger(__name__)
+
+FINISHED = (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+
+class JobStore(ABC):
+    """Where job records live; the runner only talks to this interface."""
+
+    @abstractmethod
+    async def create(self, job: JobInfo) -> None: ...
+
+    @abstractmethod
+    async def get(self, job_id: str) -> JobInfo | None: ...
+
+    @abstractmethod
+    async def save(self, job: JobInfo) -> None: ...
+
+
+class MemoryJobStore(JobStore):
+    """Process-local store; finished jobs expire after ``ttl_s`` and the oldest are evicted past ``max_entries``."""
+
+    def __init__(self, ttl_s: float = 86400, max_entries: int = 10_000) -> None:
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._jobs: OrderedDict[str, JobInfo] = OrderedDict()
+
+    async def create(self, job: JobInfo) -> None:
+        self._prune()
+        self._jobs[job.job_id] = job
+
+    async def get(self, job_id: str) -> JobInfo | None:
+        job = self._jobs.get(job_id)
+        if job is not None and self._expired(job, time.time()):
+            del self._jobs[job_id]
+            return None
+        return job
+
+    async def save(self, job: JobInfo) -> None:
+        self._jobs[job.job_id] = job
+
+    def _expired(self, job: JobInfo, now: float) -> bool:
+        return job.status in FINISHED and (job.finished_at or 0) + self.ttl_s < now
+
+    def _prune(self) -> None:
+        now = time.time()
+        for job_id in [j.job_id for j in self._jobs.values() if self._expired(j, now)]:
+            del self._jobs[job_id]
+        # Unfinished jobs are never evicted — someone is still going to ask for them.
+        for job_id in [j.job_id for j in self._jobs.values() if j.status in FINISHED]:
+            if len(self._jobs) < self.max_entries:
+                break
+            del self._jobs[job_id]
+
+
+class SQLiteJobStore(JobStore):
+    """Job records in a SQLite file, so results survive an API restart.
+
+    With ``fail_interrupted`` (the local executor), jobs that were queued or
+    running when the process died can't be resumed (their payload was only held
+    in memory); they are marked failed on open. With the worker tier the payload
+    is still in the task queue, so their status is left to the workers.
+    """
+
+    def __init__(self, path: str, ttl_s: float = 86400, fail_interrupted: bool = True) -> None:
+        self.path = path
+        self.ttl_s = ttl_s
+        self.fail_interrupted = fail_interrupted
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+
+    async def create(self, job: JobInfo) -> None:
+        await asyncio.to_thread(self._write, job)
+
+    async def get(self, job_id: str) -> JobInfo | None:
+        return await asyncio.to_thread(self._read, job_id)
+
+    async def save(self, job: JobInfo) -> None:
+        await asyncio.to_thread(self._write, job)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs "
+                "(job_id TEXT PRIMARY KEY, status TEXT NOT NULL, expires_at REAL, job TEXT NOT NULL)"
+            )
+            db.execute("DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+            if self.fail_interrupted:
+                stale = db.execute(
+                    "SELECT job FROM jobs WHERE status IN (?, ?)", (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+                ).fetchall()
+                for (raw,) in stale:
+                    job = JobInfo.model_validate_json(raw)
+                    self._write_row(db, _finish(job, JobStatus.FAILED, error="interrupted by restart"))
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _read(self, job_id: str) -> JobInfo | None:
+        with self._db_lock:
+            row = self._connect().execute(
+                "SELECT expires_at, job FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None or (row[0] is not None and row[0] < time.time()):
+            return None
+        return JobInfo.model_validate_json(row[1])
+
+    def _write(self, job: JobInfo) -> None:
+        with self._db_lock:
+            db = self._connect()
+            self._write_row(db, job)
+            db.commit()
+
+    def _write_row(self, db: sqlite3.Connection, job: JobInfo) -> None:
+        expires_at = (job.finished_at or time.time()) + self.ttl_s if job.status in FINISHED else None
+        db.execute(
+            "INSERT OR REPLACE INTO jobs (job_id, status, expires_at, job) VALUES (?, ?, ?, ?)",
+            (job.job_id, job.status.value, expires_at, job.model_dump_json()),
+        )
+
+
+def _finish(job: JobInfo, status: JobStatus, result: dict | None = None, error: str | None = None) -> JobInfo:
+    return job.model_copy(update={"status": status, "finished_at": time.time(), "result": result, "error": error})
+
+
+class RedisJobStore(JobStore):
+    """Job records as JSON strings in Redis (or ``LocalRedis``); shared by API and worker hosts."""
+
+    def __init__(self, client: Any, ttl_s: float = 86400) -> None:
+        self.client = client
+        self.ttl_s = ttl_s
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"mv:job:{job_id}"
+
+    async def create(self, job: JobInfo) -> None:
+        await self.save(job)
+
+    async def get(self, job_id: str) -> JobInfo | None:
+        raw = await self.client.get(self._key(job_id))
+        return JobInfo.model_validate_json(raw) if raw is not None else None
+
+    async def save(self, job: JobInfo) -> None:
+        ttl = int(self.ttl_s) if job.status in FINISHED else None
+        await self.client.set(self._key(job.job_id), job.model_dump_json(), ex=ttl)
+
+
+def create_job_store() -> JobStore:
+    if settings.job_store_backend == "redis":
+        return RedisJobStore(redis_client(), ttl_s=settings.job_ttl_s)
+    if settings.job_store_backend == "sqlite":
+        return SQLiteJobStore(
+            settings.job_store_path,
+            ttl_s=settings.job_ttl_s,
+            fail_interrupted=settings.job_executor == "local",
+        )
+    return MemoryJobStore(ttl_s=settings.job_ttl_s, max_entries=settings.job_max_entries)
+
+
+def sign_payload(body: bytes) -> str:
+    """HMAC-SHA256 of a webhook body with the API secret, sent as ``x-signature``."""
+    return hmac.new(settings.api_secret_key.encode(), body, hashlib.sha256).hexdigest()
+
+
+async def execute_job(store: JobStore, job: JobInfo, work: Callable[[], Awaitable[BaseModel]]) -> JobInfo:
+    """Run ``work`` for ``job``, record the outcome in ``store`` and fire the webhook."""
+    job = job.model_copy(update={"status": JobStatus.RUNNING, "started_at": time.time()})
+    await store.save(job)
+    try:
+        result = await work()
+        job = _finish(job, JobStatus.SUCCEEDED, result=result.model_dump(mode="json"))
+    except JobFailed as exc:
+        job = _finish(job, JobStatus.FAILED, error=str(exc))
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Job %s failed: %s", job.job_id, exc)
+        job = _finish(job, JobStatus.FAILED, error="Внутренняя ошибка при анализе")
+    await store.save(job)
+    if job.callback_url:
+        await notify_webhook(job)
+    return job
+
+
+async def notify_webhook(job: JobInfo) -> None:
+    body = job.model_dump_json().encode()
+    headers = {"content-type": "application/json", "x-signature": sign_payload(body)}
+    for attempt in range(settings.job_webhook_retries + 1):
+        try:
+            async with http_clients.session("webhook", settings.job_webhook_timeout_s) as client:
+                response = await client.post(job.callback_url, content=body, headers=headers)
+            if response.status_code < 500:
+                if response.status_code >= 400:
+                    logger.warning("Webhook for job %s rejected: HTTP %s", job.job_id, response.status_code)
+                return
+            logger.warning("Webhook for job %s: HTTP %s", job.job_id, response.status_code)
+        except httpx.HTTPError as exc:
+            logger.warning("Webhook for job %s failed: %s", job.job_id, exc)
+        if attempt < settings.job_webhook_retries:
+            await asyncio.sleep(settings.job_webhook_backoff_s * 2**attempt)
+    logger.error("Giving up on webhook for job %s", job.job_id)
+
+
+class JobRunner:
+    """Starts jobs: on this event loop (bounded by ``max_concurrency``) or, given a
+    ``queue``, by handing a serialized payload to the worker tier."""
+
+    def __init__(self, store: JobStore, max_concurrency: int = 4, queue: TaskQueue | None = None) -> None:
+        self.store = store
+        self.queue = queue
+        self._limit = asyncio.Semaphore(max_concurrency)
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(
+        self,
+        kind: str,
+        work: Callable[[], Awaitable[BaseModel]],
+        callback_url: str | None = None,
+        on_done: Callable[[], None] | None = None,
+    ) -> JobInfo:
+        """Start ``work`` as a job; ``on_done`` runs once it is over, however it ended."""
+        try:
+            job = await self._create(kind, callback_url)
+        except BaseException:
+            if on_done is not None:
+                on_done()
+            raise
+        task = asyncio.create_task(self._run(job, work), name=f"job-{job.job_id}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        if on_done is not None:
+            task.add_done_callback(lambda _task: on_done())
+        return job
+
+    async def enqueue(self, kind: str, payload: bytes, callback_url: str | None = None) -> JobInfo:
+        if self.queue is None:
+            raise RuntimeError("JobRunner has no task queue configured")
+        job = await self._create(kind, callback_url)
+        await self.queue.enqueue(job.job_id, payload)
+        return job
+
+    async def aclose(self) -> None:
+        """Cancel jobs still running at shutdown (they are recorded as failed)."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _create(self, kind: str, callback_url: str | None) -> JobInfo:
+        job = JobInfo(
+            job_id=uuid.uuid4().hex,
+            kind=kind,
+            status=JobStatus.QUEUED,
+            created_at=time.time(),
+            callback_url=callback_url or None,
+        )
+        await self.store.create(job)
+        return job
+
+    async def _run(self, job: JobInfo, work: Callable[[], Awaitable[BaseModel]]) -> None:
+        try:
+            async with self._limit:
+                await execute_job(self.store, job, work)
+        except asyncio.CancelledError:
+            current = await self.store.get(job.job_id)
+            if current is None or current.status not in FINISHED:
+                await self.store.save(_finish(job, JobStatus.FAILED, error="cancelled"))
+            raise
+
+
+def create_job_runner() -> JobRunner:
+    if settings.job_executor == "queue" and settings.job_store_backend == "memory":
+        # Workers would never find the API's job records: every job would stay queued.
+        raise RuntimeError("job_executor=queue needs a shared job store (job_store_backend=sqlite or redis)")
+    return JobRunner(
+        create_job_store(),
+        max_concurrency=settings.job_max_concurrency,
+        queue=create_task_queue() if settings.job_executor == "queue" else None,
+    )
+
+
+job_runner = create_job_runner()
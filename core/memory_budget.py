@@ -0,0 +1,149 @@
+"""Process-wide byte budget for media held in memory by in-flight requests.
+
+Three things are charged against it: request uploads (by Content-Length, at
+the door), decoded audio (OGG → WAV) and the video frames a pipeline keeps
+for scoring. A charge that doesn't fit waits in FIFO order for up to
+``memory_budget_max_wait_s`` (or the request deadline, if shorter) and is
+then rejected with Overloaded, so a burst of large uploads queues or gets a
+503 instead of running the worker out of memory.
+
+A request's first charge (its upload, ``admit=True``) may only use capacity
+minus ``memory_budget_reserve_bytes`` and waits behind every other charge, so
+requests already holding memory can always get their decode buffers and frames
+instead of waiting on uploads that in turn wait on them.
+"""
+
+import asyncio
+import logging
+import math
+from collections import Counter, deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from core import deadline
+from core.config import settings
+from core.exceptions import Overloaded
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBudget:
+    """Byte-denominated semaphore; ``capacity=None`` only keeps the books.
+
+    Waiters are plain futures, so one instance can serve several event loops.
+    """
+
+    def __init__(self, capacity: int | None, max_wait_s: float = 10.0, reserve: int = 0) -> None:
+        self.capacity = capacity
+        self.max_wait_s = max_wait_s
+        self.reserve = reserve  # kept free of admissions, for requests already running
+        self.used = 0
+        self.peak = 0
+        self.rejected = 0
+        self.by_purpose: Counter[str] = Counter()
+        self._waiters: deque[tuple[int, asyncio.Future]] = deque()
+        self._admit_waiters: deque[tuple[int, asyncio.Future]] = deque()
+
+    @classmethod
+    def from_settings(cls) -> "MemoryBudget":
+        return cls(
+            settings.memory_budget_bytes if settings.memory_budget_enabled else None,
+            settings.memory_budget_max_wait_s,
+            settings.memory_budget_reserve_bytes,
+        )
+
+    async def acquire(self, nbytes: int, purpose: str, admit: bool = False) -> None:
+        """Charge ``nbytes`` for ``purpose``, waiting for room; raises Overloaded.
+
+        ``admit`` marks a request's first charge, which leaves the reserve alone.
+        """
+        if nbytes <= 0:
+            return
+        if self.capacity is not None and nbytes > self._limit(admit):
+            self._reject(nbytes, purpose)
+        queue = self._admit_waiters if admit else self._waiters
+        if not self._waiters and not queue and self._fits(nbytes, admit):
+            self._take(nbytes)
+        else:
+            waiter = (nbytes, asyncio.get_running_loop().create_future())
+            queue.append(waiter)
+            try:
+                await asyncio.wait_for(waiter[1], deadline.clamp(self.max_wait_s))
+            except asyncio.TimeoutError:
+                if not waiter[1].done() or waiter[1].cancelled():
+                    self._forget(queue, waiter)
+                    self._reject(nbytes, purpose)
+            except asyncio.CancelledError:
+                if waiter[1].done() and not waiter[1].cancelled():
+                    self._give_back(nbytes)  # granted just as we were cancelled
+                else:
+                    self._forget(queue, waiter)
+                raise
+        self.by_purpose[purpose] += nbytes
+
+    def release(self, nbytes: int, purpose: str) -> None:
+        if nbytes <= 0:
+            return
+        self.by_purpose[purpose] -= nbytes
+        self._give_back(nbytes)
+
+    @asynccontextmanager
+    async def hold(self, nbytes: int, purpose: str, admit: bool = False) -> AsyncIterator[None]:
+        await self.acquire(nbytes, purpose, admit)
+        try:
+            yield
+        finally:
+            self.release(nbytes, purpose)
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "reserve": self.reserve,
+            "used": self.used,
+            "peak": self.peak,
+            "waiting": len(self._waiters) + len(self._admit_waiters),
+            "waiting_bytes": sum(n for n, _ in (*self._waiters, *self._admit_waiters)),
+            "rejected": self.rejected,
+            "by_purpose": {name: used for name, used in sorted(self.by_purpose.items()) if used},
+        }
+
+    def _limit(self, admit: bool) -> int:
+        return self.capacity - self.reserve if admit else self.capacity
+
+    def _fits(self, nbytes: int, admit: bool = False) -> bool:
+        return self.capacity is None or self.used + nbytes <= self._limit(admit)
+
+    def _take(self, nbytes: int) -> None:
+        self.used += nbytes
+        self.peak = max(self.peak, self.used)
+
+    def _give_back(self, nbytes: int) -> None:
+        self.used -= nbytes
+        self._wake()
+
+    def _forget(self, queue: deque, waiter: tuple[int, asyncio.Future]) -> None:
+        if waiter in queue:
+            queue.remove(waiter)
+        self._wake()  # a large head-of-line waiter may have been blocking smaller ones
+
+    def _wake(self) -> None:
+        # Running requests first; admissions only once none of them is waiting.
+        for queue, admit in ((self._waiters, False), (self._admit_waiters, True)):
+            while queue:
+                nbytes, future = queue[0]
+                if future.done():
+                    queue.popleft()
+                    continue
+                if not self._fits(nbytes, admit):
+                    return
+                queue.popleft()
+                self._take(nbytes)
+                future.set_result(None)
+
+    def _reject(self, nbytes: int, purpose: str) -> None:
+        self.rejected += 1
+        logger.warning("Memory budget full: %d bytes for %s rejected (%d used)", nbytes, purpose, self.used)
+        raise Overloaded("memory", math.ceil(settings.admission_retry_after_s))
+
+
+memory_budget = MemoryBudget.from_settings()
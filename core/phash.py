@@ -0,0 +1,155 @@
+"""Perceptual image hashing and a BK-tree index for near-duplicate lookups."""
+
+import io
+import logging
+import time
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image, UnidentifiedImageError
+
+from api.schemas import AnalysisResult
+from core.config import settings
+from core.enums import Verdict
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8  # 8x8 low-frequency DCT block → 64-bit hash
+SAMPLE_SIZE = 32  # image is reduced to 32x32 grayscale before the DCT
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """Orthonormal DCT-II basis, so a 2-D DCT is just ``D @ X @ D.T``."""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    mat = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    mat[0, :] = np.sqrt(1.0 / n)
+    return mat
+
+
+_DCT = _dct_matrix(SAMPLE_SIZE)
+_DCT_LOW = _DCT[:HASH_SIZE]  # only the rows needed for the 8x8 low-frequency block
+
+
+def phash(data: bytes) -> int | None:
+    """64-bit DCT perceptual hash of an encoded image, or None if it can't be decoded."""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            # JPEG draft mode lets libjpeg decode at 1/2..1/8 scale — most of the speedup.
+            img.draft("L", (SAMPLE_SIZE * 2, SAMPLE_SIZE * 2))
+            small = img.convert("L").resize((SAMPLE_SIZE, SAMPLE_SIZE), Image.Resampling.BILINEAR)
+    except (UnidentifiedImageError, OSError, ValueError) as exc:
+        logger.debug("phash: cannot decode image: %s", exc)
+        return None
+
+    pixels = np.asarray(small, dtype=np.float32)
+    low = _DCT_LOW @ pixels @ _DCT_LOW.T
+    coeffs = low.ravel()
+    median = np.median(coeffs[1:])  # skip DC so overall brightness doesn't dominate
+    bits = np.packbits(coeffs > median)
+    return int.from_bytes(bits.tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """Burkhard-Keller tree over Hamming distance (insert + radius search)."""
+
+    def __init__(self) -> None:
+        self._root: tuple[int, dict[int, tuple]] | None = None
+        self.size = 0
+
+    def add(self, value: int) -> None:
+        if self._root is None:
+            self._root = (value, {})
+            self.size = 1
+            return
+        node = self._root
+        while True:
+            dist = hamming(value, node[0])
+            if dist == 0:
+                return
+            child = node[1].get(dist)
+            if child is None:
+                node[1][dist] = (value, {})
+                self.size += 1
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> list[tuple[int, int]]:
+        """Return ``(distance, hash)`` pairs within ``max_distance``, nearest first."""
+        if self._root is None:
+            return []
+        found: list[tuple[int, int]] = []
+        stack = [self._root]
+        while stack:
+            node_value, children = stack.pop()
+            dist = hamming(value, node_value)
+            if dist <= max_distance:
+                found.append((dist, node_value))
+            lo, hi = dist - max_distance, dist + max_distance
+            stack.extend(child for d, child in children.items() if lo <= d <= hi)
+        found.sort()
+        return found
+
+
+class PerceptualIndex:
+    """Near-duplicate verdict store for images, bounded by entry count and TTL."""
+
+    def __init__(self, max_distance: int = 6, max_entries: int = 50_000, ttl_s: float = 86400) -> None:
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._tree = BKTree()
+        self._entries: OrderedDict[int, tuple[float, AnalysisResult]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls) -> "PerceptualIndex":
+        return cls(
+            max_distance=settings.image_phash_max_distance,
+            max_entries=settings.image_phash_max_entries,
+            ttl_s=settings.result_cache_ttl_s,
+        )
+
+    def lookup(self, image_hash: int) -> AnalysisResult | None:
+        now = time.time()
+        for _, candidate in self._tree.search(image_hash, self.max_distance):
+            entry = self._entries.get(candidate)
+            if entry is None or entry[0] < now:
+                continue
+            self.hits += 1
+            return entry[1].model_copy(update={"cached": True, "processing_ms": 0})
+        self.misses += 1
+        return None
+
+    def add(self, image_hash: int, result: AnalysisResult) -> None:
+        if result.verdict == Verdict.UNCERTAIN:
+            return
+        if image_hash not in self._entries:
+            self._tree.add(image_hash)
+        self._entries[image_hash] = (time.time() + self.ttl_s, result.model_copy(update={"cached": False}))
+        self._entries.move_to_end(image_hash)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        # BK-trees don't support deletion; rebuild once evicted hashes dominate.
+        if self._tree.size > 2 * self.max_entries:
+            self._rebuild()
+
+    def clear(self) -> None:
+        self._tree = BKTree()
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _rebuild(self) -> None:
+        tree = BKTree()
+        for image_hash in self._entries:
+            tree.add(image_hash)
+        self._tree = tree
+
+
+image_index: PerceptualIndex | None = PerceptualIndex.from_settings() if settings.image_phash_enabled else None
@@ -0,0 +1,91 @@
+"""Process-wide provider health facts learned from every adapter response.
+
+Two facts per provider: "quota exhausted until T" (a 429 that survived the
+retry policy, for its ``Retry-After`` or ``provider_quota_cooldown_s``) and
+"server errors since T" (an unbroken run of 5xx / transport errors). Any
+successful response clears both. Callers that can pick a provider up front,
+like the video frame path, ask ``usable()`` instead of spending a probe call.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+
+from core.circuit_breaker import breakers
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProviderState:
+    quota_exhausted_until: float = 0.0  # wall clock
+    server_errors: int = 0  # consecutive
+    failing_since: float | None = None  # wall clock of the first error in the run
+    last_error_at: float = 0.0
+
+    def quota_exhausted(self, now: float) -> bool:
+        return now < self.quota_exhausted_until
+
+    def failing(self, now: float) -> bool:
+        return (
+            self.server_errors >= settings.provider_server_error_threshold
+            and now - self.last_error_at < settings.provider_server_error_cooldown_s
+        )
+
+
+class ProviderStateRegistry:
+    def __init__(self) -> None:
+        self._states: dict[str, ProviderState] = {}
+
+    def get(self, provider: str) -> ProviderState:
+        state = self._states.get(provider)
+        if state is None:
+            state = self._states[provider] = ProviderState()
+        return state
+
+    def record_success(self, provider: str) -> None:
+        state = self.get(provider)
+        if state.quota_exhausted_until or state.server_errors:
+            logger.info("Provider %s answering normally again", provider)
+        state.quota_exhausted_until = 0.0
+        state.server_errors = 0
+        state.failing_since = None
+
+    def record_quota_exhausted(self, provider: str, retry_after: float | None) -> None:
+        cooldown = retry_after if retry_after is not None else settings.provider_quota_cooldown_s
+        state = self.get(provider)
+        state.quota_exhausted_until = max(state.quota_exhausted_until, time.time() + cooldown)
+        logger.warning("Provider %s quota exhausted for %.0fs", provider, cooldown)
+
+    def record_server_error(self, provider: str) -> None:
+        state = self.get(provider)
+        now = time.time()
+        if state.failing_since is None:
+            state.failing_since = now
+        state.server_errors += 1
+        state.last_error_at = now
+
+    def usable(self, provider: str) -> bool:
+        """Worth sending work to right now: quota left, not failing, circuit not open."""
+        now = time.time()
+        state = self.get(provider)
+        return not state.quota_exhausted(now) and not state.failing(now) and breakers.get(provider).available()
+
+    def stats(self) -> dict[str, dict]:
+        now = time.time()
+        return {
+            name: {
+                "usable": self.usable(name),
+                "quota_exhausted_for_s": round(max(0.0, state.quota_exhausted_until - now), 1),
+                "server_errors": state.server_errors,
+                "failing_for_s": round(now - state.failing_since, 1) if state.failing_since else 0.0,
+            }
+            for name, state in sorted(self._states.items())
+        }
+
+    def reset(self) -> None:
+        self._states.clear()
+
+
+provider_states = ProviderStateRegistry()
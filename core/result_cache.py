@@ -0,0 +1,184 @@
+"""Content-addressed cache of analysis results (in-memory LRU + optional SQLite tier)."""
+
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from api.schemas import AnalysisResult
+from core.config import settings
+from core.enums import MediaType, Verdict
+
+logger = logging.getLogger(__name__)
+
+
+# Settings that change what a given payload is scored as; a cached verdict from
+# a different combination must not be served. Add new result-affecting settings here.
+_RESULT_SETTINGS = (
+    "max_video_duration_seconds",
+    "video_frame_sample_rate",
+    "video_sampling_mode",
+    "video_scene_threshold",
+    "video_frame_budget",
+    "video_dedup_enabled",
+    "video_dedup_max_distance",
+    "video_early_stop",
+    "video_early_stop_min_frames",
+    "video_early_stop_z",
+    "image_preprocess_enabled",
+    "sightengine_max_side",
+    "sightengine_jpeg_quality",
+    "hf_image_max_side",
+    "hf_image_jpeg_quality",
+    "audio_ensemble_enabled",
+    "audio_ensemble_weight_resemble",
+    "audio_ensemble_weight_hf",
+    "audio_ensemble_decisive_fake",
+    "audio_ensemble_decisive_real",
+    "hedge_enabled",
+)
+
+
+def _settings_version() -> str:
+    parts = [settings.result_cache_version]
+    parts.extend(f"{name}={getattr(settings, name)}" for name in _RESULT_SETTINGS)
+    return ":".join(parts)
+
+
+class ResultCache:
+    """Maps sha256(version | media type | payload) to a finished AnalysisResult.
+
+    UNCERTAIN results are never stored: timeouts and provider outages surface
+    as UNCERTAIN, and caching them would pin a transient failure to the payload.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl_s: float = 86400,
+        disk_path: str = "",
+        version: str = "1",
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.disk_path = disk_path
+        self.version = version
+        self._memory: OrderedDict[str, tuple[float, AnalysisResult]] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls) -> "ResultCache":
+        return cls(
+            max_entries=settings.result_cache_max_entries,
+            ttl_s=settings.result_cache_ttl_s,
+            disk_path=settings.result_cache_path,
+            version=_settings_version(),
+        )
+
+    def key(self, media_type: MediaType, payload: bytes) -> str:
+        digest = hashlib.sha256()
+        digest.update(self.version.encode())
+        digest.update(b"\x00")
+        digest.update(media_type.value.encode())
+        digest.update(b"\x00")
+        digest.update(payload)
+        return digest.hexdigest()
+
+    async def get(self, key: str) -> AnalysisResult | None:
+        started = time.perf_counter()
+        result = self._get_memory(key)
+        if result is None and self.disk_path:
+            result = await asyncio.to_thread(self._get_disk, key)
+            if result is not None:
+                self._put_memory(key, result)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result.model_copy(
+            update={"cached": True, "processing_ms": int((time.perf_counter() - started) * 1000)}
+        )
+
+    async def put(self, key: str, result: AnalysisResult) -> None:
+        if result.verdict == Verdict.UNCERTAIN:
+            return
+        stored = result.model_copy(update={"cached": False})
+        self._put_memory(key, stored)
+        if self.disk_path:
+            await asyncio.to_thread(self._put_disk, key, stored)
+
+    def clear(self) -> None:
+        self._memory.clear()
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # In-memory LRU tier
+    # ------------------------------------------------------------------
+
+    def _get_memory(self, key: str) -> AnalysisResult | None:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.time():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return result
+
+    def _put_memory(self, key: str, result: AnalysisResult) -> None:
+        self._memory[key] = (time.time() + self.ttl_s, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # On-disk tier (SQLite, survives restarts)
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.disk_path, check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, result TEXT NOT NULL)"
+            )
+            db.execute("DELETE FROM results WHERE expires_at < ?", (time.time(),))
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _get_disk(self, key: str) -> AnalysisResult | None:
+        try:
+            with self._db_lock:
+                row = self._connect().execute(
+                    "SELECT expires_at, result FROM results WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as exc:
+            logger.warning("Result cache read failed: %s", exc)
+            return None
+        if row is None or row[0] < time.time():
+            return None
+        return AnalysisResult.model_validate_json(row[1])
+
+    def _put_disk(self, key: str, result: AnalysisResult) -> None:
+        try:
+            with self._db_lock:
+                db = self._connect()
+                db.execute(
+                    "INSERT OR REPLACE INTO results (key, expires_at, result) VALUES (?, ?, ?)",
+                    (key, time.time() + self.ttl_s, result.model_dump_json()),
+                )
+                db.commit()
+        except sqlite3.Error as exc:
+            logger.warning("Result cache write failed: %s", exc)
+
+
+result_cache: ResultCache | None = ResultCache.from_settings() if settings.result_cache_enabled else None
@@ -0,0 +1,92 @@
+"""Retry policy for provider 429s: Retry-After, decorrelated jitter, per-provider retry budget.
+
+The budget is a token bucket per provider: every first attempt deposits
+``retry_budget_ratio`` tokens (plus a small ``retry_budget_min_per_s`` trickle),
+every retry spends one. During an outage nearly every call fails, the bucket
+drains, and retries stop instead of multiplying the load on the provider.
+"""
+
+import email.utils
+import random
+import time
+
+from core.config import settings
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def next_delay(previous: float, base: float, cap: float) -> float:
+    """Decorrelated jitter: uniform between ``base`` and three times the previous delay."""
+    return min(cap, random.uniform(base, max(base, previous * 3)))
+
+
+class RetryBudget:
+    def __init__(self, ratio: float, min_per_s: float, max_tokens: float) -> None:
+        self.ratio = ratio
+        self.min_per_s = min_per_s
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.retries = 0
+        self.denied = 0
+        self._refilled_at = time.monotonic()
+
+    def deposit(self) -> None:
+        """Called once per first attempt."""
+        self._refill()
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Take one retry from the budget; False when it is spent."""
+        self._refill()
+        if self.tokens < 1:
+            self.denied += 1
+            return False
+        self.tokens -= 1
+        self.retries += 1
+        return True
+
+    def stats(self) -> dict:
+        return {"tokens": round(self.tokens, 2), "retries": self.retries, "denied": self.denied}
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self._refilled_at) * self.min_per_s)
+        self._refilled_at = now
+
+
+class RetryBudgetRegistry:
+    def __init__(self) -> None:
+        self._budgets: dict[str, RetryBudget] = {}
+
+    def get(self, provider: str) -> RetryBudget:
+        budget = self._budgets.get(provider)
+        if budget is None:
+            budget = self._budgets[provider] = RetryBudget(
+                settings.retry_budget_ratio, settings.retry_budget_min_per_s, settings.retry_budget_max_tokens
+            )
+        return budget
+
+    def stats(self) -> dict[str, dict]:
+        return {name: budget.stats() for name, budget in sorted(self._budgets.items())}
+
+    def reset(self) -> None:
+        self._budgets.clear()
+
+
+retry_budgets = RetryBudgetRegistry()
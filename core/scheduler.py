@@ -0,0 +1,251 @@
+"""Priority lanes and weighted fair queuing for analysis work.
+
+Every ``(priority class, user id)`` pair is its own flow. Flows are served in
+weighted fair queuing order: a request starts where its flow left off (or at
+the current virtual time, if the flow was idle), finishes ``cost / class
+weight`` later, and the smallest finish tag runs next. A user with ten queued
+videos therefore pushes only their own flow back, a single photo from someone
+else is served next, and between otherwise equal requests premium beats free
+beats batch. A per-flow in-flight cap stops one user from holding every slot
+with long-running videos; ``flow_turn()`` applies the same cap ahead of any
+other queue (the bulkheads), so requests held back by it wait there alone.
+Batches that already bound their own concurrency raise the cap for their
+items with ``flow_cap()``.
+"""
+
+import asyncio
+import itertools
+import logging
+import statistics
+import time
+from collections import Counter, deque
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from core.config import settings
+from core.enums import MediaType, Priority
+
+logger = logging.getLogger(__name__)
+
+WAIT_WINDOW = 1000  # wait-time samples kept per class for percentiles
+
+Flow = tuple[Priority, int | None]
+
+_flow_cap: ContextVar[int | None] = ContextVar("flow_cap", default=None)
+
+
+@contextmanager
+def flow_cap(limit: int) -> Iterator[None]:
+    """Let requests started inside run up to ``limit`` at once in their flow.
+
+    For batches that already bound themselves (Big Check items), so the per-user
+    cap doesn't serialise them further.
+    """
+    token = _flow_cap.set(limit)
+    try:
+        yield
+    finally:
+        _flow_cap.reset(token)
+
+
+def priority_for(user_id: int | None, default: Priority = Priority.FREE) -> Priority:
+    """Premium users (``premium_user_ids``) always get the premium lane."""
+    if user_id is not None and user_id in settings.premium_user_ids:
+        return Priority.PREMIUM
+    return default
+
+
+@dataclass(order=True)
+class _Waiter:
+    finish_tag: float
+    seq: int
+    start_tag: float = field(compare=False)
+    flow: Flow = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    cap: int = field(compare=False)
+
+
+class FairScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        max_inflight_per_flow: int = 2,
+        weights: dict[Priority, float] | None = None,
+        costs: dict[MediaType, float] | None = None,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_inflight_per_flow = max_inflight_per_flow
+        self.weights = weights or {Priority.PREMIUM: 4.0, Priority.FREE: 2.0, Priority.BATCH: 1.0}
+        self.costs = costs or {}
+        self._waiting: list[_Waiter] = []
+        self._finish_tags: dict[Flow, float] = {}
+        self._inflight: Counter[Flow] = Counter()
+        self._running = 0
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+        self._waits: dict[Priority, deque[float]] = {p: deque(maxlen=WAIT_WINDOW) for p in Priority}
+        self._served: Counter[Priority] = Counter()
+        self._turns: Counter[Flow] = Counter()  # requests of a flow past flow_turn()
+        self._turn_waiters: dict[Flow, deque[asyncio.Future]] = {}
+
+    @classmethod
+    def from_settings(cls) -> "FairScheduler":
+        return cls(
+            max_concurrency=settings.scheduler_max_concurrency,
+            max_inflight_per_flow=settings.scheduler_max_inflight_per_user,
+            weights={
+                Priority.PREMIUM: settings.scheduler_weight_premium,
+                Priority.FREE: settings.scheduler_weight_free,
+                Priority.BATCH: settings.scheduler_weight_batch,
+            },
+            costs={MediaType.VIDEO: settings.scheduler_video_cost},
+        )
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: Priority = Priority.FREE,
+        user_id: int | None = None,
+        media_type: MediaType | None = None,
+    ) -> AsyncIterator[None]:
+        """Wait for this request's turn, hold one slot while the body runs."""
+        flow: Flow = (priority, user_id)
+        waiter = self._enqueue(flow, self.costs.get(media_type, 1.0) / self.weights[priority])
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release(flow)  # granted just as we were cancelled
+            else:
+                self._waiting.remove(waiter)
+            self._dispatch()
+            raise
+        self._waits[priority].append(time.monotonic() - waiter.enqueued_at)
+        self._served[priority] += 1
+        try:
+            yield
+        finally:
+            self._release(flow)
+            self._dispatch()
+
+    @asynccontextmanager
+    async def flow_turn(self, priority: Priority = Priority.FREE, user_id: int | None = None) -> AsyncIterator[None]:
+        """Wait until the flow has fewer than ``max_inflight_per_flow`` requests past this point.
+
+        Taken before queues shared by all users (bulkheads), so one user's batch can't
+        fill them with requests that then only wait for that user's own cap in ``slot()``.
+        """
+        flow: Flow = (priority, user_id)
+        if self._turns[flow] < self._cap() and not self._turn_waiters.get(flow):
+            self._turns[flow] += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._turn_waiters.setdefault(flow, deque()).append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._end_turn(flow)  # handed over just as we were cancelled
+                else:
+                    waiters = self._turn_waiters.get(flow)
+                    if waiters is not None and future in waiters:
+                        waiters.remove(future)
+                        if not waiters:
+                            del self._turn_waiters[flow]
+                raise
+        try:
+            yield
+        finally:
+            self._end_turn(flow)
+
+    def queue_wait(self) -> float:
+        """How long the oldest request that is waiting only for a free slot has waited.
+
+        Requests held back by their own flow's in-flight cap are not counted: they
+        say nothing about overall load.
+        """
+        eligible = [w.enqueued_at for w in self._waiting if self._inflight[w.flow] < w.cap]
+        return time.monotonic() - min(eligible) if eligible else 0.0
+
+    def stats(self) -> dict:
+        queued = Counter(w.flow[0] for w in self._waiting)
+        wait_ms = {}
+        for priority, samples in self._waits.items():
+            ordered = sorted(samples)
+            wait_ms[priority.value] = {
+                "served": self._served[priority],
+                "p50": round(statistics.median(ordered) * 1000, 1) if ordered else 0.0,
+                "p95": round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 1) if ordered else 0.0,
+                "max": round(ordered[-1] * 1000, 1) if ordered else 0.0,
+            }
+        return {
+            "running": self._running,
+            "max_concurrency": self.max_concurrency,
+            "queued": {p.value: queued[p] for p in Priority},
+            "held_by_user_cap": sum(len(waiters) for waiters in self._turn_waiters.values()),
+            "wait_ms": wait_ms,
+        }
+
+    def _enqueue(self, flow: Flow, cost: float) -> _Waiter:
+        start = max(self._virtual_time, self._finish_tags.get(flow, 0.0))
+        self._finish_tags[flow] = start + cost
+        waiter = _Waiter(
+            finish_tag=start + cost,
+            seq=next(self._seq),
+            start_tag=start,
+            flow=flow,
+            future=asyncio.get_running_loop().create_future(),
+            enqueued_at=time.monotonic(),
+            cap=self._cap(),
+        )
+        self._waiting.append(waiter)
+        return waiter
+
+    def _dispatch(self) -> None:
+        while self._running < self.max_concurrency:
+            eligible = [w for w in self._waiting if self._inflight[w.flow] < w.cap]
+            if not eligible:
+                return
+            waiter = min(eligible)
+            self._waiting.remove(waiter)
+            self._running += 1
+            self._inflight[waiter.flow] += 1
+            self._virtual_time = max(self._virtual_time, waiter.start_tag)
+            waiter.future.set_result(None)
+
+    def _cap(self) -> int:
+        return max(self.max_inflight_per_flow, _flow_cap.get() or 0)
+
+    def _end_turn(self, flow: Flow) -> None:
+        waiters = self._turn_waiters.get(flow)
+        while waiters:
+            future = waiters.popleft()
+            if not future.done():
+                future.set_result(None)  # the turn passes on; the count stays
+                break
+        else:
+            self._turns[flow] -= 1
+            if self._turns[flow] <= 0:
+                del self._turns[flow]
+        if waiters is not None and not waiters:
+            del self._turn_waiters[flow]
+
+    def _release(self, flow: Flow) -> None:
+        self._running -= 1
+        self._inflight[flow] -= 1
+        if self._inflight[flow] <= 0:
+            del self._inflight[flow]
+        # Idle flows whose tag the clock has passed carry no state worth keeping.
+        if len(self._finish_tags) > 4 * WAIT_WINDOW:
+            waiting = {w.flow for w in self._waiting}
+            self._finish_tags = {
+                f: tag for f, tag in self._finish_tags.items()
+                if tag > self._virtual_time or f in self._inflight or f in waiting
+            }
+
+
+scheduler: FairScheduler | None = FairScheduler.from_settings() if settings.scheduler_enabled else None
@@ -0,0 +1,376 @@
+"""Durable work queue with leases, for handing analysis tasks to worker processes.
+
+A worker ``lease()``s a task for ``lease_s`` seconds and must ``heartbeat()``
+before it runs out. If the worker dies, the lease expires and the task becomes
+visible to the next ``lease()`` again with ``attempt`` incremented. ``complete()``
+only succeeds for the current lease holder, so a worker that lost its lease
+can't acknowledge someone else's retry.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Lease:
+    task_id: str
+    token: str
+    payload: bytes
+    attempt: int  # 1 on first delivery, >1 when a previous lease expired
+
+
+class TaskQueue(ABC):
+    @abstractmethod
+    async def enqueue(self, task_id: str, payload: bytes) -> None: ...
+
+    @abstractmethod
+    async def lease(self, lease_s: float) -> Lease | None:
+        """Claim the oldest visible task, or return None if there is nothing to do."""
+
+    @abstractmethod
+    async def heartbeat(self, lease: Lease, lease_s: float) -> bool:
+        """Extend ``lease``; False means it was lost and the task may run elsewhere."""
+
+    @abstractmethod
+    async def complete(self, lease: Lease) -> bool:
+        """Remove the task for good; False if ``lease`` is no longer the current one."""
+
+    @abstractmethod
+    async def release(self, lease: Lease) -> None:
+        """Hand the task back immediately (e.g. on graceful shutdown) without waiting for expiry."""
+
+    @abstractmethod
+    async def depth(self) -> int: ...
+
+
+class SQLiteTaskQueue(TaskQueue):
+    """Queue in a SQLite file; safe for several worker processes on one host (or a shared volume)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+
+    async def enqueue(self, task_id: str, payload: bytes) -> None:
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO tasks (task_id, payload, enqueued_at, lease_until, attempts) VALUES (?, ?, ?, 0, 0)",
+            (task_id, payload, time.time()),
+        )
+
+    async def lease(self, lease_s: float) -> Lease | None:
+        return await asyncio.to_thread(self._lease, lease_s)
+
+    async def heartbeat(self, lease: Lease, lease_s: float) -> bool:
+        return await asyncio.to_thread(
+            self._execute,
+            "UPDATE tasks SET lease_until = ? WHERE task_id = ? AND lease_token = ?",
+            (time.time() + lease_s, lease.task_id, lease.token),
+        )
+
+    async def complete(self, lease: Lease) -> bool:
+        return await asyncio.to_thread(
+            self._execute, "DELETE FROM tasks WHERE task_id = ? AND lease_token = ?", (lease.task_id, lease.token)
+        )
+
+    async def release(self, lease: Lease) -> None:
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE tasks SET lease_until = 0, lease_token = NULL WHERE task_id = ? AND lease_token = ?",
+            (lease.task_id, lease.token),
+        )
+
+    async def depth(self) -> int:
+        return await asyncio.to_thread(self._depth)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            # autocommit mode; _lease opens its own IMMEDIATE transaction
+            db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS tasks (task_id TEXT PRIMARY KEY, payload BLOB NOT NULL, "
+                "enqueued_at REAL NOT NULL, lease_until REAL NOT NULL, lease_token TEXT, attempts INTEGER NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS tasks_visible ON tasks (lease_until, enqueued_at)")
+            self._db = db
+        return self._db
+
+    def _execute(self, sql: str, params: tuple) -> bool:
+        with self._db_lock:
+            return self._connect().execute(sql, params).rowcount > 0
+
+    def _depth(self) -> int:
+        with self._db_lock:
+            return self._connect().execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def _lease(self, lease_s: float) -> Lease | None:
+        now = time.time()
+        token = uuid.uuid4().hex
+        with self._db_lock:
+            db = self._connect()
+            # IMMEDIATE takes the write lock up front, so two processes can't claim the same row.
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(
+                    "SELECT task_id, payload, attempts FROM tasks WHERE lease_until <= ? "
+                    "ORDER BY enqueued_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is not None:
+                    db.execute(
+                        "UPDATE tasks SET lease_until = ?, lease_token = ?, attempts = attempts + 1 WHERE task_id = ?",
+                        (now + lease_s, token, row[0]),
+                    )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return Lease(task_id=row[0], token=token, payload=bytes(row[1]), attempt=row[2] + 1)
+
+
+class RedisTaskQueue(TaskQueue):
+    """Queue on Redis primitives: a pending list, a processing list, a lease sorted set
+    (score = expiry) and a hash per task.
+
+    ``lease()`` moves a task from pending to processing with one ``LMOVE``, so a
+    worker dying at any point leaves it somewhere a later sweep finds it: a task
+    in processing with no lease (its claimer died before recording one) gets an
+    already expired lease once it has been seen that way for ``lease_s``.
+
+    Only needs ``rpush/lpush/lmove/lrange/lrem/llen/zadd/zrem/zscore/zrangebyscore/
+    hset/hget/hincrby/delete`` (plus ``get/set`` for the job store) — redis-py's
+    asyncio client (Redis 6.2+) or ``LocalRedis``.
+    """
+
+    PENDING = "mv:tasks:pending"
+    PROCESSING = "mv:tasks:processing"
+    LEASED = "mv:tasks:leased"
+
+    def __init__(self, client: Any) -> None:
+        self.client = client
+        self._unleased: dict[bytes, float] = {}  # processing entries without a lease → first seen
+
+    @staticmethod
+    def _key(task_id: str) -> str:
+        return f"mv:task:{task_id}"
+
+    async def enqueue(self, task_id: str, payload: bytes) -> None:
+        await self.client.hset(self._key(task_id), mapping={"payload": payload, "attempts": 0, "token": ""})
+        await self.client.rpush(self.PENDING, task_id)
+
+    async def lease(self, lease_s: float) -> Lease | None:
+        await self._requeue_expired(lease_s)
+        raw_id = await self.client.lmove(self.PENDING, self.PROCESSING, "LEFT", "RIGHT")
+        if raw_id is None:
+            return None
+        task_id = raw_id.decode() if isinstance(raw_id, bytes) else raw_id
+        token = uuid.uuid4().hex
+        key = self._key(task_id)
+        await self.client.zadd(self.LEASED, {task_id: time.time() + lease_s})
+        await self.client.hset(key, mapping={"token": token})
+        attempt = await self.client.hincrby(key, "attempts", 1)
+        payload = await self.client.hget(key, "payload")
+        if payload is None:  # completed by a stale holder in the meantime
+            await self.client.zrem(self.LEASED, task_id)
+            await self.client.lrem(self.PROCESSING, 1, task_id)
+            await self.client.delete(key)
+            return None
+        return Lease(task_id=task_id, token=token, payload=payload, attempt=int(attempt))
+
+    async def heartbeat(self, lease: Lease, lease_s: float) -> bool:
+        if not await self._holds(lease):
+            return False
+        await self.client.zadd(self.LEASED, {lease.task_id: time.time() + lease_s}, xx=True)
+        return True
+
+    async def complete(self, lease: Lease) -> bool:
+        if not await self._holds(lease):
+            return False
+        await self.client.delete(self._key(lease.task_id))
+        await self.client.zrem(self.LEASED, lease.task_id)
+        await self.client.lrem(self.PROCESSING, 1, lease.task_id)
+        return True
+
+    async def release(self, lease: Lease) -> None:
+        if await self._holds(lease) and await self.client.zrem(self.LEASED, lease.task_id):
+            await self.client.hset(self._key(lease.task_id), mapping={"token": ""})
+            await self._requeue(lease.task_id)
+
+    async def depth(self) -> int:
+        return int(await self.client.llen(self.PENDING)) + int(await self.client.llen(self.PROCESSING))
+
+    async def _holds(self, lease: Lease) -> bool:
+        token = await self.client.hget(self._key(lease.task_id), "token")
+        if isinstance(token, bytes):
+            token = token.decode()
+        return token == lease.token
+
+    async def _requeue(self, task_id: Any) -> None:
+        # Push before removing: a crash in between leaves a duplicate, which lease() drops
+        # once the task is complete, rather than losing the task.
+        await self.client.lpush(self.PENDING, task_id)
+        await self.client.lrem(self.PROCESSING, 1, task_id)
+
+    async def _requeue_expired(self, grace_s: float) -> None:
+        now = time.time()
+        unleased: dict[bytes, float] = {}
+        for raw_id in await self.client.lrange(self.PROCESSING, 0, -1):
+            if await self.client.zscore(self.LEASED, raw_id) is None:
+                unleased[raw_id] = self._unleased.get(raw_id, now)
+        self._unleased = unleased
+        for raw_id, first_seen in unleased.items():
+            if now - first_seen >= grace_s:
+                # nx: a claimer that was only slow still wins with its real expiry
+                await self.client.zadd(self.LEASED, {raw_id: 0}, nx=True)
+        for raw_id in await self.client.zrangebyscore(self.LEASED, "-inf", now):
+            # whoever removes it from the lease set owns the requeue
+            if await self.client.zrem(self.LEASED, raw_id):
+                task_id = raw_id.decode() if isinstance(raw_id, bytes) else raw_id
+                logger.warning("Lease on task %s expired, requeueing", task_id)
+                await self._requeue(task_id)
+
+
+class LocalRedis:
+    """In-process stand-in for the handful of Redis commands used here (tests, single-process dev)."""
+
+    def __init__(self) -> None:
+        self._data: dict[str, Any] = {}
+        self._expires: dict[str, float] = {}
+
+    def _get(self, key: str, factory: type) -> Any:
+        if key in self._expires and self._expires[key] < time.time():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return self._data.setdefault(key, factory()) if factory else self._data.get(key)
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        return value if isinstance(value, bytes) else str(value).encode()
+
+    async def get(self, key: str) -> bytes | None:
+        return self._get(key, None)
+
+    async def set(self, key: str, value: Any, ex: float | None = None) -> bool:
+        self._data[key] = self._encode(value)
+        if ex is not None:
+            self._expires[key] = time.time() + ex
+        else:
+            self._expires.pop(key, None)
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self._data.pop(key, None) is not None for key in keys)
+
+    async def rpush(self, key: str, *values: Any) -> int:
+        items = self._get(key, list)
+        items.extend(self._encode(v) for v in values)
+        return len(items)
+
+    async def lpush(self, key: str, *values: Any) -> int:
+        items = self._get(key, list)
+        for value in values:
+            items.insert(0, self._encode(value))
+        return len(items)
+
+    async def lmove(self, source: str, destination: str, src: str = "LEFT", dest: str = "RIGHT") -> bytes | None:
+        items = self._get(source, list)
+        if not items:
+            return None
+        value = items.pop(0 if src == "LEFT" else -1)
+        target = self._get(destination, list)
+        target.insert(0 if dest == "LEFT" else len(target), value)
+        return value
+
+    async def lrange(self, key: str, start: int, end: int) -> list[bytes]:
+        items = self._get(key, list)
+        return items[start : None if end == -1 else end + 1]
+
+    async def lrem(self, key: str, count: int, value: Any) -> int:
+        items = self._get(key, list)
+        value = self._encode(value)
+        removed = 0
+        while value in items and (count == 0 or removed < count):
+            items.remove(value)
+            removed += 1
+        return removed
+
+    async def llen(self, key: str) -> int:
+        return len(self._get(key, list))
+
+    async def zadd(self, key: str, mapping: dict, nx: bool = False, xx: bool = False) -> int:
+        zset = self._get(key, dict)
+        added = 0
+        for member, score in mapping.items():
+            member = self._encode(member)
+            if (xx and member not in zset) or (nx and member in zset):
+                continue
+            added += member not in zset
+            zset[member] = float(score)
+        return added
+
+    async def zrem(self, key: str, *members: Any) -> int:
+        zset = self._get(key, dict)
+        return sum(zset.pop(self._encode(m), None) is not None for m in members)
+
+    async def zscore(self, key: str, member: Any) -> float | None:
+        return self._get(key, dict).get(self._encode(member))
+
+    async def zrangebyscore(self, key: str, min: Any, max: Any) -> list[bytes]:
+        lo, hi = float(min), float(max)
+        return [m for m, s in sorted(self._get(key, dict).items(), key=lambda kv: kv[1]) if lo <= s <= hi]
+
+    async def hset(self, key: str, mapping: dict) -> int:
+        fields = self._get(key, dict)
+        added = sum(self._encode(f) not in fields for f in mapping)
+        fields.update({self._encode(f): self._encode(v) for f, v in mapping.items()})
+        return added
+
+    async def hget(self, key: str, field: str) -> bytes | None:
+        fields = self._get(key, None)
+        return fields.get(self._encode(field)) if fields else None
+
+    async def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        fields = self._get(key, dict)
+        value = int(fields.get(self._encode(field), b"0")) + amount
+        fields[self._encode(field)] = self._encode(value)
+        return value
+
+
+_redis: Any = None
+
+
+def redis_client() -> Any:
+    """Shared Redis client for ``settings.redis_url``, or a ``LocalRedis`` when no URL is set."""
+    global _redis
+    if _redis is None:
+        if not settings.redis_url:
+            logger.warning("redis_url is empty: using the in-process LocalRedis stand-in (single process only)")
+            _redis = LocalRedis()
+        elif importlib.util.find_spec("redis") is None:
+            raise RuntimeError("redis_url is set but the 'redis' package is not installed (pip install .[redis])")
+        else:
+            import redis.asyncio
+
+            _redis = redis.asyncio.from_url(settings.redis_url)
+    return _redis
+
+
+def create_task_queue() -> TaskQueue:
+    if settings.task_queue_backend == "redis":
+        return RedisTaskQueue(redis_client())
+    return SQLiteTaskQueue(settings.task_queue_path)
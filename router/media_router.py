@@ -1,8 +1,11 @@
 """Media router — detect file type and dispatch to the right adapter."""
 
+import asyncio
 import logging
 import os
 
+from adapters.audio_ensemble import AudioEnsemble
+from adapters.base import BaseAdapter
 from adapters.hf_audio import HFAudioAdapter
 from adapters.hf_image import HFImageAdapter
 from adapters.resemble import ResembleAdapter
@@ -10,8 +13,15 @@ from adapters.sapling import SaplingAdapter
 from adapters.sightengine import SightengineAdapter
 from adapters.video_pipeline import VideoPipeline
 from api.schemas import AnalysisResult
-from core.enums import MediaType, Verdict
-from core.exceptions import ExternalAPIError, UnsupportedMediaType
+from core import deadline
+from core.bulkhead import bulkheads
+from core.config import settings
+from core.enums import MediaType, ModelUsed, Priority, Verdict
+from core.exceptions import DeadlineExceeded, UnsupportedMediaType
+from core.hedging import HedgePolicy, Merge, sequential_fallback
+from core.phash import PerceptualIndex, phash
+from core.result_cache import ResultCache
+from core.scheduler import FairScheduler
 
 # Cleaner API design
 # Improved type safety
@@ -69,7 +79,29 @@ def _merge_results(primary: AnalysisResult, fallback: AnalysisResult) -> Analysi
     )
 
 
+def _out_of_time(media_type: MediaType) -> AnalysisResult:
+    return AnalysisResult(
+        verdict=Verdict.UNCERTAIN,
+        confidence=0.5,
+        model_used=ModelUsed.FALLBACK_UNCERTAIN,
+        explanation="Анализ не успел завершиться за отведённое время, результат неопределён.",
+        media_type=media_type,
+    )
+
+
 class MediaRouter:
+    def __init__(
+        self,
+        cache: ResultCache | None = None,
+        image_index: PerceptualIndex | None = None,
+        scheduler: FairScheduler | None = None,
+        hedge: HedgePolicy | None = None,
+    ) -> None:
+        self.cache = cache
+        self.image_index = image_index
+        self.scheduler = scheduler
+        self.hedge = hedge
+
     def detect_type(
         self,
         content_type: str | None,
@@ -95,24 +127,67 @@ class MediaRouter:
 
         raise UnsupportedMediaType()
 
-    async def route(self, media_type: MediaType, file_bytes: bytes, text_content: str = "") -> AnalysisResult:
+    async def route(
+        self,
+        media_type: MediaType,
+        file_bytes: bytes,
+        text_content: str = "",
+        priority: Priority = Priority.FREE,
+        user_id: int | None = None,
+    ) -> AnalysisResult:
+        """Route to the appropriate adapter, serving repeated payloads from the cache.
+
+        Cache misses wait for their turn in the scheduler (if any) by ``priority``/``user_id``.
+        """
+        if self.cache is None:
+            return await self._scheduled(media_type, file_bytes, text_content, priority, user_id)
+
+        payload = text_content.encode("utf-8") if media_type == MediaType.TEXT and text_content else file_bytes
+        key = self.cache.key(media_type, payload)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = await self._scheduled(media_type, file_bytes, text_content, priority, user_id)
+        await self.cache.put(key, result)
+        return result
+
+    async def _scheduled(
+        self,
+        media_type: MediaType,
+        file_bytes: bytes,
+        text_content: str,
+        priority: Priority,
+        user_id: int | None,
+    ) -> AnalysisResult:
+        # The user's own in-flight cap first, so one user's batch can't fill a bulkhead with
+        # items that only wait for each other; then the bulkhead, so work queued behind a
+        # full video pool doesn't hold scheduler slots.
+        try:
+            if self.scheduler is None:
+                async with bulkheads.workload(media_type):
+                    return await self._dispatch(media_type, file_bytes, text_content)
+            async with self.scheduler.flow_turn(priority, user_id), bulkheads.workload(media_type), \
+                    self.scheduler.slot(priority, user_id, media_type):
+                return await self._dispatch(media_type, file_bytes, text_content)
+        except DeadlineExceeded as exc:
+            # UNCERTAIN results are never cached, so a later call with more time retries.
+            logger.warning("%s analysis out of time at %s", media_type.value, exc.service)
+            return _out_of_time(media_type)
+
+    async def _dispatch(self, media_type: MediaType, file_bytes: bytes, text_content: str) -> AnalysisResult:
         """Route to the appropriate adapter based on media type."""
+        deadline.check("queue")  # the caller may have given up while we waited for a slot
         match media_type:
             case MediaType.IMAGE:
-                try:
-                    return await SightengineAdapter().analyze(file_bytes)
-                except ExternalAPIError:
-                    return await HFImageAdapter().analyze(file_bytes)
+                return await self._route_image(file_bytes)
 
             case MediaType.AUDIO:
-                try:
-                    result = await ResembleAdapter().analyze(file_bytes)
-                    if result.verdict == Verdict.UNCERTAIN:
-                        fallback = await HFAudioAdapter().analyze(file_bytes)
-                        return _merge_results(result, fallback)
-                    return result
-                except ExternalAPIError:
-                    return await HFAudioAdapter().analyze(file_bytes)
+                if settings.audio_ensemble_enabled:
+                    return await AudioEnsemble().analyze(file_bytes)
+                return await self._with_fallback(
+                    ResembleAdapter(), HFAudioAdapter(), file_bytes, merge=_merge_results
+                )
 
             case MediaType.VIDEO:
                 return await VideoPipeline().analyze(file_bytes)
@@ -123,3 +198,36 @@ class MediaRouter:
 
             case _:
                 raise UnsupportedMediaType()
+
+    async def _route_image(self, file_bytes: bytes) -> AnalysisResult:
+        """SightEngine with HF fallback, short-circuited by the near-duplicate index."""
+        image_hash = await asyncio.to_thread(phash, file_bytes) if self.image_index is not None else None
+        if image_hash is not None:
+            duplicate = self.image_index.lookup(image_hash)
+            if duplicate is not None:
+                return duplicate
+
+        result = await self._with_fallback(SightengineAdapter(), HFImageAdapter(), file_bytes)
+
+        if image_hash is not None:
+            self.image_index.add(image_hash, result)
+        return result
+
+    async def _with_fallback(
+        self,
+        primary: BaseAdapter,
+        fallback: BaseAdapter,
+        file_bytes: bytes,
+        merge: Merge | None = None,
+    ) -> AnalysisResult:
+        """Primary adapter with fallback on errors (and on UNCERTAIN when ``merge`` is given),
+        hedged by the fallback when the primary is slower than usual."""
+        def run_primary():
+            return primary.analyze(file_bytes)
+
+        def run_fallback():
+            return fallback.analyze(file_bytes)
+
+        if self.hedge is None:
+            return await sequential_fallback(run_primary, run_fallback, merge)
+        return await self.hedge.call(primary.PROVIDER, run_primary, fallback.PROVIDER, run_fallback, merge)
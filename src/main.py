@@ -17,15 +17,17 @@ import threading
 from pathlib import Path
 from typing import Any
 
-import httpx
-
 # Ensure project root imports work when entrypoint is src/main.py
 ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from adapters.http_client import http_clients  # noqa: E402
 from core.enums import MediaType  # noqa: E402
 from core.analyzer import HybridTextAnalyzer  # noqa: E402
+from core.hedging import hedge_policy  # noqa: E402
+from core.phash import image_index  # noqa: E402
+from core.result_cache import result_cache  # noqa: E402
 from router.media_router import MediaRouter  # noqa: E402
 
 
@@ -94,7 +96,7 @@ async def _download_file_bytes(file_id: str, bucket_id: str) -> bytes:
         "X-Appwrite-Key": api_key,
     }
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
+    async with http_clients.session("appwrite_storage", timeout=60.0) as client:
         response = await client.get(url, headers=headers)
         if response.status_code >= 400:
             raise RuntimeError(
@@ -109,7 +111,14 @@ hybrid_analyzer = HybridTextAnalyzer()
 
 
 async def _analyze(payload: dict[str, Any]) -> dict[str, Any]:
-    router = MediaRouter()
+    # Each invocation runs in its own event loop, so pooled connections live
+    # for one call — enough to reuse them across all frames of a video.
+    async with http_clients.lifespan():
+        return await _analyze_payload(payload)
+
+
+async def _analyze_payload(payload: dict[str, Any]) -> dict[str, Any]:
+    router = MediaRouter(cache=result_cache, image_index=image_index, hedge=hedge_policy)
     started = time.perf_counter()
 
     text = str(payload.get("text") or "").strip()
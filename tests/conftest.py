@@ -20,3 +20,69 @@ _MOCK_ENV: dict[str, str] = {
 
 for _key, _val in _MOCK_ENV.items():
     os.environ.setdefault(_key, _val)
+
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _reset_provider_health():
+    """Breakers, provider state, latency windows, adaptive limits and retry budgets are
+    process-wide; don't leak them between tests."""
+    from core.adaptive_limit import limiters
+    from core.circuit_breaker import breakers
+    from core.hedging import latencies
+    from core.provider_state import provider_states
+    from core.retry import retry_budgets
+
+    def _reset() -> None:
+        breakers.reset()
+        latencies.clear()
+        provider_states.reset()
+        limiters.reset()
+        retry_budgets.reset()
+
+    _reset()
+    yield
+    _reset()
+
+
+@pytest.fixture
+def http_response():
+    """Factory for a canned httpx response: ``http_response(status_code, body, headers)``."""
+    from unittest.mock import MagicMock
+
+    def _make(status_code: int = 200, body: object = None, headers: dict | None = None) -> MagicMock:
+        response = MagicMock(status_code=status_code, headers=headers or {})
+        response.json.return_value = body or {}
+        return response
+
+    return _make
+
+
+@pytest.fixture
+def mock_http():
+    """Factory for an ``httpx.AsyncClient`` stand-in (also usable as ``async with``).
+
+    ``mock_http(*responses)``: each ``post`` returns the next response (or raises it,
+    if it is an exception); the last one repeats.
+    """
+    from unittest.mock import AsyncMock
+
+    def _make(*responses: object) -> AsyncMock:
+        queue = list(responses)
+
+        async def _post(*_args, **_kwargs):
+            assert queue, "unexpected HTTP call"
+            item = queue.pop(0) if len(queue) > 1 else queue[0]
+            if isinstance(item, BaseException):
+                raise item
+            return item
+
+        client = AsyncMock()
+        client.post = AsyncMock(side_effect=_post)
+        client.__aenter__ = AsyncMock(return_value=client)
+        client.__aexit__ = AsyncMock(return_value=False)
+        return client
+
+    return _make
@@ -16,6 +16,7 @@ def _mock_client(response_body: object, status_code: int = 200) -> AsyncMock:
     """Build a fully async-context-manager-compatible mock for httpx.AsyncClient."""
     mock_response = MagicMock()
     mock_response.status_code = status_code
+    mock_response.headers = {}
     mock_response.json.return_value = response_body
 
     mock_instance = AsyncMock()
@@ -81,11 +82,14 @@ class TestSightengineAdapter:
     async def test_rate_limit_raises_external_api_error(self):
         from adapters.sightengine import SightengineAdapter
 
-        with patch("httpx.AsyncClient", return_value=_mock_client({}, status_code=429)):
+        client = _mock_client({}, status_code=429)
+        with patch("httpx.AsyncClient", return_value=client), \
+             patch("adapters.base.asyncio.sleep", AsyncMock()):
             with pytest.raises(ExternalAPIError) as exc_info:
                 await SightengineAdapter().analyze(b"image_bytes")
         assert exc_info.value.service == "sightengine"
         assert exc_info.value.detail == "rate_limit"
+        assert client.post.await_count == 3  # retried before giving up
 
     @pytest.mark.asyncio
     async def test_server_error_raises_external_api_error(self):
@@ -150,22 +154,21 @@ class TestResembleAdapter:
 
     @pytest.mark.asyncio
     async def test_ogg_conversion_invoked(self):
-        """OGG magic bytes trigger subprocess ffmpeg conversion before upload."""
+        """OGG magic bytes trigger async ffmpeg conversion before upload."""
+        from adapters.media_tools import MediaToolResult
         from adapters.resemble import ResembleAdapter
 
         ogg_data = b"OggS" + b"\x00" * 100
 
-        mock_proc = MagicMock()
-        mock_proc.returncode = 0
-        mock_proc.stdout = b"RIFF" + b"\x00" * 44  # minimal WAV stub
+        mock_proc = MediaToolResult(returncode=0, stdout=b"RIFF" + b"\x00" * 44, stderr=b"")
 
-        with patch("subprocess.run", return_value=mock_proc) as mock_run, \
+        with patch("adapters.resemble.run_media_tool", AsyncMock(return_value=mock_proc)) as mock_run, \
              patch("httpx.AsyncClient", return_value=_mock_client(
                  {"success": True, "score": 0.80, "tampered": True}
              )):
             result = await ResembleAdapter().analyze(ogg_data)
 
-        mock_run.assert_called_once()
+        mock_run.assert_awaited_once()
         call_cmd = mock_run.call_args[0][0]
         assert "ffmpeg" in call_cmd
         assert result.verdict == Verdict.FAKE
@@ -382,20 +385,19 @@ class TestHFAudioAdapter:
 
     @pytest.mark.asyncio
     async def test_ogg_input_triggers_ffmpeg_conversion(self):
-        """OGG header (OggS) must trigger subprocess ffmpeg conversion."""
+        """OGG header (OggS) must trigger async ffmpeg conversion."""
         from adapters.hf_audio import HFAudioAdapter
+        from adapters.media_tools import MediaToolResult
 
         ogg_data = b"OggS" + b"\x00" * 50
 
-        mock_proc = MagicMock()
-        mock_proc.returncode = 0
-        mock_proc.stdout = b"RIFF" + b"\x00" * 44
+        mock_proc = MediaToolResult(returncode=0, stdout=b"RIFF" + b"\x00" * 44, stderr=b"")
 
         body = [{"label": "bonafide", "score": 0.85}, {"label": "spoof", "score": 0.15}]
 
-        with patch("subprocess.run", return_value=mock_proc) as mock_run, \
+        with patch("adapters.hf_audio.run_media_tool", AsyncMock(return_value=mock_proc)) as mock_run, \
              patch("httpx.AsyncClient", return_value=_mock_client(body)):
             result = await HFAudioAdapter().analyze(ogg_data)
 
-        mock_run.assert_called_once()
+        mock_run.assert_awaited_once()
         assert result.verdict == Verdict.REAL
@@ -0,0 +1,112 @@
+"""Unit tests for the adaptive per-provider concurrency limiter."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from adapters.sightengine import SightengineAdapter
+from core.adaptive_limit import AdaptiveLimiter, limiters
+
+
+async def _call(limiter: AdaptiveLimiter, outcome: str = "ok", delay: float = 0.0) -> None:
+    async with limiter.acquire() as permit:
+        await asyncio.sleep(delay)
+        if outcome == "ok":
+            permit.succeeded()
+        elif outcome == "overloaded":
+            permit.overloaded()
+
+
+class TestAdaptiveLimiter:
+    async def test_grows_while_saturated_and_healthy(self) -> None:
+        limiter = AdaptiveLimiter("sightengine", initial=2, max_limit=8, latency_tolerance=100)
+        for _ in range(10):
+            await asyncio.gather(*(_call(limiter, delay=0.001) for _ in range(limiter.capacity)))
+        assert limiter.limit > 4
+        assert limiter.limit <= 8
+
+    async def test_does_not_grow_when_idle(self) -> None:
+        limiter = AdaptiveLimiter("sightengine", initial=4, latency_tolerance=100)
+        for _ in range(20):
+            await _call(limiter)
+        assert limiter.limit == 4
+
+    async def test_overload_burst_backs_off_once(self) -> None:
+        limiter = AdaptiveLimiter("sightengine", initial=8, backoff=0.5)
+        await asyncio.gather(*(_call(limiter, "overloaded", delay=0.01) for _ in range(8)))
+        assert limiter.limit == 4
+        assert limiter.decreases == 1
+
+    async def test_repeated_overload_reaches_min(self) -> None:
+        limiter = AdaptiveLimiter("sightengine", initial=8, min_limit=1, backoff=0.5)
+        for _ in range(6):
+            await _call(limiter, "overloaded")
+        assert limiter.limit == 1
+
+    async def test_rising_latency_backs_off(self) -> None:
+        limiter = AdaptiveLimiter("sightengine", initial=8, latency_backoff=0.9, latency_tolerance=2.0)
+        for _ in range(5):
+            await _call(limiter, delay=0.001)
+        for _ in range(3):
+            await _call(limiter, delay=0.05)
+        assert limiter.limit < 8
+        assert limiter.decreases >= 1
+
+    async def test_inflight_never_exceeds_capacity(self) -> None:
+        limiter = AdaptiveLimiter("sightengine", initial=3, max_limit=3)
+        peak = 0
+
+        async def _observed() -> None:
+            nonlocal peak
+            async with limiter.acquire() as permit:
+                peak = max(peak, limiter.inflight)
+                await asyncio.sleep(0.005)
+                permit.succeeded()
+
+        await asyncio.gather(*(_observed() for _ in range(20)))
+        assert peak == 3
+        assert limiter.inflight == 0
+
+    async def test_cancelled_waiter_leaves_queue(self) -> None:
+        limiter = AdaptiveLimiter("sightengine", initial=1)
+        holder = asyncio.ensure_future(_call(limiter, delay=0.1))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(_call(limiter))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await holder
+        assert limiter.stats()["queued"] == 0
+        assert limiter.inflight == 0
+
+    def test_disabled_pins_limit(self) -> None:
+        with patch("core.adaptive_limit.settings.adaptive_limit_enabled", False):
+            limiter = AdaptiveLimiter.from_settings("sightengine")
+        assert limiter.min_limit == limiter.max_limit == limiter.limit
+
+
+
+class TestPacedAdapterCalls:
+    async def test_permit_is_per_attempt_and_not_held_while_waiting(self, mock_http, http_response) -> None:
+        limiter = limiters.get("sightengine")
+        client = mock_http(
+            http_response(429, headers={"retry-after": "1"}),
+            http_response(200, {"status": "success", "type": {"ai_generated": 0.9}}),
+        )
+        inflight_while_waiting: list[int] = []
+
+        async def _sleep(_delay: float) -> None:
+            inflight_while_waiting.append(limiter.inflight)
+
+        with patch("httpx.AsyncClient", return_value=client), patch("adapters.base.asyncio.sleep", _sleep), \
+             limiters.pacing():
+            await SightengineAdapter().analyze(b"frame")
+        assert inflight_while_waiting == [0]
+        assert limiter.decreases == 1
+        assert limiter.short_rtt is not None and limiter.short_rtt < 1  # the wait isn't latency
+
+    async def test_unpaced_calls_take_no_permit(self) -> None:
+        async with limiters.paced("sightengine") as permit:
+            assert permit is None
@@ -0,0 +1,160 @@
+"""Unit tests for admission control and load shedding."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.schemas import AnalysisResult
+from bot.utils.backoff import overloaded_text, post_with_backoff
+from core.admission import AdmissionController
+from core.config import settings
+from core.enums import MediaType, ModelUsed, Verdict
+from core.exceptions import Overloaded
+
+HEADERS = {"x-api-secret": settings.api_secret_key}
+SHED_AT = {"video": 0.5, "audio": 0.75}
+
+
+def _controller(**kwargs) -> AdmissionController:
+    return AdmissionController(**{"max_inflight": 4, "max_bytes": 1000, "shed_at": SHED_AT, **kwargs})
+
+
+class TestAdmissionController:
+    def test_admits_until_full(self) -> None:
+        controller = _controller()
+        for _ in range(4):
+            controller.admit("image")
+        with pytest.raises(Overloaded):
+            controller.admit("image")
+        controller.release()
+        controller.admit("image")
+        assert controller.stats()["shed"] == {"image": 1}
+
+    def test_video_is_shed_before_cheap_media(self) -> None:
+        controller = _controller()
+        controller.admit("image")
+        controller.admit("image")
+        with pytest.raises(Overloaded):
+            controller.admit("video")
+        controller.admit("audio")
+        controller.admit("text")
+
+    def test_byte_budget(self) -> None:
+        controller = _controller()
+        controller.admit("media", size=600)
+        with pytest.raises(Overloaded):
+            controller.admit("media", size=600)
+        controller.release(size=600)
+        assert controller.bytes == 0
+        controller.admit("media", size=600)
+
+    def test_queue_wait_sheds_and_sets_retry_after(self) -> None:
+        controller = _controller(max_queue_wait_s=10.0, retry_after_s=5.0, queue_wait=lambda: 12.3)
+        with pytest.raises(Overloaded) as exc_info:
+            controller.admit("image")
+        assert exc_info.value.retry_after == 13
+
+    def test_check_uses_current_load(self) -> None:
+        controller = _controller()
+        for _ in range(3):
+            controller.admit("media")
+        controller.check("image")
+        with pytest.raises(Overloaded):
+            controller.check("video")
+        assert controller.inflight == 3  # checking takes no place of its own
+
+
+class TestAdmissionMiddleware:
+    def test_shed_request_gets_503_with_retry_after(self) -> None:
+        controller = _controller(max_inflight=1, retry_after_s=7.0)
+        controller.admit("image")
+        route = AsyncMock()
+        with patch("api.admission.admission", controller), \
+             patch("api.routers.analyze.media_router.route", route), TestClient(app) as client:
+            response = client.post(
+                "/analyze", headers=HEADERS, data={"user_id": "1"},
+                files={"file": ("photo.jpg", b"jpeg", "image/jpeg")},
+            )
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "7"
+        route.assert_not_awaited()
+
+    def test_admitted_request_is_released(self) -> None:
+        controller = _controller()
+        result = AnalysisResult(
+            verdict=Verdict.REAL, confidence=0.9, model_used=ModelUsed.SIGHTENGINE,
+            explanation="test", media_type=MediaType.IMAGE,
+        )
+        with patch("api.admission.admission", controller), \
+             patch("api.routers.analyze.admission", controller), \
+             patch("api.routers.analyze.media_router.route", AsyncMock(return_value=result)), \
+             TestClient(app) as client:
+            response = client.post(
+                "/analyze", headers=HEADERS, data={"user_id": "1"},
+                files={"file": ("photo.jpg", b"jpeg", "image/jpeg")},
+            )
+        assert response.status_code == 200
+        assert controller.inflight == 0
+        assert controller.bytes == 0
+
+    def test_video_shed_inside_endpoint(self) -> None:
+        controller = _controller(max_inflight=2)
+        controller.admit("image")  # with this request: 2/2 in flight, above the video threshold
+        route = AsyncMock()
+        with patch("api.admission.admission", controller), \
+             patch("api.routers.analyze.admission", controller), \
+             patch("api.routers.analyze.media_router.route", route), TestClient(app) as client:
+            response = client.post(
+                "/analyze", headers=HEADERS, data={"user_id": "1"},
+                files={"file": ("clip.mp4", b"video", "video/mp4")},
+            )
+        assert response.status_code == 503
+        assert "retry-after" in response.headers
+        route.assert_not_awaited()
+        assert controller.stats()["shed"] == {"video": 1}
+
+    def test_chunked_upload_without_length_is_refused(self) -> None:
+        route = AsyncMock()
+
+        def _chunks():
+            yield b"--x\r\n"
+            yield b"payload"
+
+        with patch("api.routers.analyze.media_router.route", route), TestClient(app) as client:
+            response = client.post(
+                "/analyze", headers={**HEADERS, "content-type": "multipart/form-data; boundary=x"},
+                content=_chunks(),
+            )
+        assert response.status_code == 411
+        route.assert_not_awaited()
+
+    def test_unguarded_paths_pass(self) -> None:
+        controller = _controller(max_inflight=1)
+        controller.admit("image")
+        with patch("api.admission.admission", controller), TestClient(app) as client:
+            assert client.get("/health").status_code == 200
+
+
+class TestBotBackoff:
+    @staticmethod
+    def _response(status_code: int, headers: dict | None = None) -> MagicMock:
+        return MagicMock(status_code=status_code, headers=httpx.Headers(headers or {}))
+
+    async def test_retries_once_after_hint(self) -> None:
+        client = AsyncMock()
+        client.post = AsyncMock(side_effect=[self._response(503, {"retry-after": "3"}), self._response(200)])
+        sleep = AsyncMock()
+        with patch("bot.utils.backoff.asyncio.sleep", sleep):
+            response = await post_with_backoff(client, "http://api/analyze")
+        assert response.status_code == 200
+        assert 3 <= sleep.await_args.args[0] <= 4.5
+
+    async def test_long_hint_is_reported_not_waited(self) -> None:
+        client = AsyncMock()
+        client.post = AsyncMock(return_value=self._response(503, {"retry-after": "600"}))
+        response = await post_with_backoff(client, "http://api/analyze")
+        assert client.post.await_count == 1
+        assert "600" in overloaded_text(response)
@@ -0,0 +1,126 @@
+"""Unit tests for the concurrent Resemble + HF Audio ensemble."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from adapters.audio_ensemble import AudioEnsemble, fuse
+from adapters.media_tools import MediaToolResult
+from api.schemas import AnalysisResult
+from core.enums import MediaType, ModelUsed, Verdict
+from core.exceptions import ExternalAPIError
+
+
+def _audio(model: ModelUsed, fake_score: float | None, verdict: Verdict = Verdict.UNCERTAIN) -> AnalysisResult:
+    return AnalysisResult(
+        verdict=verdict,
+        confidence=fake_score if fake_score is not None else 0.5,
+        model_used=model,
+        explanation=model.value,
+        media_type=MediaType.AUDIO,
+        fake_score=fake_score,
+    )
+
+
+def _slow(result: AnalysisResult, delay: float, cancelled: list | None = None) -> AsyncMock:
+    async def analyze(_data: bytes) -> AnalysisResult:
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.append(True)
+            raise
+        return result
+
+    return AsyncMock(side_effect=analyze)
+
+
+def _patched(resemble: AsyncMock, hf: AsyncMock):
+    return (
+        patch("adapters.audio_ensemble.ResembleAdapter.analyze", resemble),
+        patch("adapters.audio_ensemble.HFAudioAdapter.analyze", hf),
+    )
+
+
+class TestFuse:
+    def test_weighted_mean_decides_verdict(self) -> None:
+        result = fuse(_audio(ModelUsed.RESEMBLE, 0.7), _audio(ModelUsed.HF_AUDIO, 0.9))
+        assert result.model_used == ModelUsed.AUDIO_ENSEMBLE
+        assert result.fake_score == pytest.approx(0.78)
+        assert result.verdict == Verdict.FAKE
+
+    def test_real_confidence_is_probability_of_real(self) -> None:
+        result = fuse(_audio(ModelUsed.RESEMBLE, 0.2), _audio(ModelUsed.HF_AUDIO, 0.1))
+        assert result.verdict == Verdict.REAL
+        assert result.confidence == pytest.approx(0.84)
+
+    def test_detector_without_score_is_left_out(self) -> None:
+        result = fuse(_audio(ModelUsed.RESEMBLE, None), _audio(ModelUsed.HF_AUDIO, 0.8))
+        assert result.fake_score == pytest.approx(0.8)
+        assert result.verdict == Verdict.FAKE
+
+    def test_no_scores_stays_uncertain(self) -> None:
+        result = fuse(_audio(ModelUsed.RESEMBLE, None), _audio(ModelUsed.HF_AUDIO, None))
+        assert result.verdict == Verdict.UNCERTAIN
+        assert result.fake_score is None
+
+
+class TestAudioEnsemble:
+    async def test_decisive_primary_returns_early_and_cancels_hf(self) -> None:
+        cancelled: list = []
+        resemble = AsyncMock(return_value=_audio(ModelUsed.RESEMBLE, 0.97, Verdict.FAKE))
+        hf = _slow(_audio(ModelUsed.HF_AUDIO, 0.2), 5, cancelled)
+        se_patch, hf_patch = _patched(resemble, hf)
+        with se_patch, hf_patch:
+            result = await AudioEnsemble().analyze(b"RIFF....WAVE")
+        assert result.model_used == ModelUsed.RESEMBLE
+        assert cancelled == [True]
+
+    async def test_ambiguous_primary_is_fused_with_hf(self) -> None:
+        resemble = AsyncMock(return_value=_audio(ModelUsed.RESEMBLE, 0.65))
+        hf = _slow(_audio(ModelUsed.HF_AUDIO, 0.95), 0.01)
+        se_patch, hf_patch = _patched(resemble, hf)
+        with se_patch, hf_patch:
+            result = await AudioEnsemble().analyze(b"RIFF....WAVE")
+        assert result.model_used == ModelUsed.AUDIO_ENSEMBLE
+        assert result.verdict == Verdict.FAKE
+
+    async def test_both_run_concurrently(self) -> None:
+        resemble = _slow(_audio(ModelUsed.RESEMBLE, 0.5), 0.2)
+        hf = _slow(_audio(ModelUsed.HF_AUDIO, 0.5), 0.2)
+        se_patch, hf_patch = _patched(resemble, hf)
+        loop = asyncio.get_running_loop()
+        with se_patch, hf_patch:
+            started = loop.time()
+            await AudioEnsemble().analyze(b"RIFF....WAVE")
+        assert loop.time() - started < 0.35
+
+    async def test_primary_error_uses_hf(self) -> None:
+        resemble = AsyncMock(side_effect=ExternalAPIError("resemble", "rate_limit"))
+        hf_result = _audio(ModelUsed.HF_AUDIO, 0.9, Verdict.FAKE)
+        se_patch, hf_patch = _patched(resemble, AsyncMock(return_value=hf_result))
+        with se_patch, hf_patch:
+            result = await AudioEnsemble().analyze(b"RIFF....WAVE")
+        assert result is hf_result
+
+    async def test_hf_error_keeps_primary(self) -> None:
+        primary = _audio(ModelUsed.RESEMBLE, 0.5)
+        se_patch, hf_patch = _patched(
+            AsyncMock(return_value=primary), AsyncMock(side_effect=ExternalAPIError("hf_audio", "down"))
+        )
+        with se_patch, hf_patch:
+            result = await AudioEnsemble().analyze(b"RIFF....WAVE")
+        assert result is primary
+
+    async def test_ogg_is_decoded_once_for_both(self) -> None:
+        wav = b"RIFF" + b"\x00" * 44
+        proc = MediaToolResult(returncode=0, stdout=wav, stderr=b"")
+        resemble = AsyncMock(return_value=_audio(ModelUsed.RESEMBLE, 0.5))
+        hf = AsyncMock(return_value=_audio(ModelUsed.HF_AUDIO, 0.5))
+        se_patch, hf_patch = _patched(resemble, hf)
+        with patch("adapters.resemble.run_media_tool", AsyncMock(return_value=proc)) as run, se_patch, hf_patch:
+            await AudioEnsemble().analyze(b"OggS" + b"\x00" * 100)
+        run.assert_awaited_once()
+        assert resemble.call_args[0][-1] == wav
+        assert hf.call_args[0][-1] == wav
@@ -0,0 +1,108 @@
+"""Unit tests for the Big Check endpoint — MediaRouter.route is mocked."""
+
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.schemas import AnalysisResult
+from core.config import settings
+from core.enums import MediaType, ModelUsed, Verdict
+
+HEADERS = {"x-api-secret": settings.api_secret_key}
+
+
+def _result(media_type: MediaType, verdict: Verdict = Verdict.FAKE) -> AnalysisResult:
+    return AnalysisResult(
+        verdict=verdict,
+        confidence=0.9,
+        model_used=ModelUsed.SIGHTENGINE,
+        explanation="test",
+        media_type=media_type,
+    )
+
+
+async def _slow_route(media_type, file_bytes, text_content="", *_scheduling):
+    await asyncio.sleep(0.4 if file_bytes != b"fast" else 0.05)
+    if file_bytes == b"boom":
+        raise RuntimeError("provider exploded")
+    return _result(media_type)
+
+
+class TestBigCheckConcurrency:
+    def test_items_run_concurrently_and_keep_order(self):
+        files = [
+            ("files", ("a.jpg", b"slow-a", "image/jpeg")),
+            ("files", ("b.jpg", b"fast", "image/jpeg")),
+            ("files", ("c.mp4", b"slow-c", "video/mp4")),
+        ]
+        with patch("api.routers.bigcheck.media_router.route", side_effect=_slow_route), \
+             TestClient(app) as client:
+            started = time.monotonic()
+            response = client.post("/bigcheck", headers=HEADERS, data={"user_id": "1"}, files=files)
+            elapsed = time.monotonic() - started
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [r["filename"] for r in body["results"]] == ["a.jpg", "b.jpg", "c.mp4"]
+        assert elapsed < 0.7  # ~slowest item (0.4 s), not the 0.85 s sum
+
+    def test_failing_item_is_isolated(self):
+        files = [
+            ("files", ("ok.jpg", b"fast", "image/jpeg")),
+            ("files", ("bad.jpg", b"boom", "image/jpeg")),
+        ]
+        with patch("api.routers.bigcheck.media_router.route", side_effect=_slow_route), \
+             TestClient(app) as client:
+            response = client.post("/bigcheck", headers=HEADERS, data={"user_id": "1"}, files=files)
+
+        results = response.json()["results"]
+        assert results[0]["verdict"] == "FAKE"
+        assert results[1]["verdict"] == "UNCERTAIN"
+        assert "provider exploded" in results[1]["explanation"]
+
+
+class TestBigCheckStream:
+    def test_ndjson_items_arrive_in_completion_order_then_summary(self):
+        files = [
+            ("files", ("slow.jpg", b"slow-a", "image/jpeg")),
+            ("files", ("fast.jpg", b"fast", "image/jpeg")),
+        ]
+        with patch("api.routers.bigcheck.media_router.route", side_effect=_slow_route), \
+             TestClient(app) as client:
+            response = client.post("/bigcheck/stream", headers=HEADERS, data={"user_id": "1"}, files=files)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        frames = [json.loads(line) for line in response.text.splitlines()]
+        assert [f["type"] for f in frames] == ["item", "item", "summary"]
+        assert [f["index"] for f in frames[:2]] == [1, 0]  # fast item first
+        assert frames[0]["result"]["filename"] == "fast.jpg"
+        summary = frames[-1]["result"]
+        assert [r["filename"] for r in summary["results"]] == ["slow.jpg", "fast.jpg"]
+        assert summary["overall_verdict"] == "FAKE"
+
+    def test_sse_when_requested(self):
+        files = [("files", ("a.jpg", b"fast", "image/jpeg"))]
+        headers = {**HEADERS, "accept": "text/event-stream"}
+        with patch("api.routers.bigcheck.media_router.route", side_effect=_slow_route), \
+             TestClient(app) as client:
+            response = client.post("/bigcheck/stream", headers=headers, data={"user_id": "1"}, files=files)
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [block for block in response.text.split("\n\n") if block]
+        assert events[0].startswith("event: item\ndata: ")
+        assert events[-1].startswith("event: summary\ndata: ")
+
+    def test_validation_errors_are_plain_http_errors(self):
+        with TestClient(app) as client:
+            response = client.post(
+                "/bigcheck/stream",
+                headers={"x-api-secret": "wrong"},
+                data={"user_id": "1"},
+                files=[("files", ("a.jpg", b"fast", "image/jpeg"))],
+            )
+        assert response.status_code == 403
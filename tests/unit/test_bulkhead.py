@@ -0,0 +1,141 @@
+"""Unit tests for per-media-type and per-provider bulkheads."""
+
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from adapters.sightengine import SightengineAdapter
+from core.bulkhead import Bulkhead, BulkheadRegistry, current_workload
+from core.enums import MediaType
+from core.exceptions import BulkheadFull, ExternalAPIError
+
+
+async def _hold(pool: Bulkhead, release: asyncio.Event, order: list | None = None, name: str = "") -> None:
+    async with pool.acquire():
+        if order is not None:
+            order.append(name)
+        await release.wait()
+
+
+class TestBulkhead:
+    async def test_bounds_concurrency_and_rejects_when_queue_full(self):
+        pool = Bulkhead("video", max_concurrent=1, max_queue=1)
+        release = asyncio.Event()
+        running = asyncio.create_task(_hold(pool, release))
+        queued = asyncio.create_task(_hold(pool, release))
+        await asyncio.sleep(0)
+        assert pool.stats()["active"] == 1
+        assert pool.stats()["queued"] == 1
+
+        with pytest.raises(BulkheadFull) as exc_info:
+            async with pool.acquire():
+                pass
+        assert isinstance(exc_info.value, ExternalAPIError)
+        assert pool.rejected == 1
+
+        release.set()
+        await asyncio.gather(running, queued)
+        assert pool.stats()["active"] == 0
+
+    async def test_waiters_are_served_in_order(self):
+        pool = Bulkhead("p", max_concurrent=1, max_queue=5)
+        release = asyncio.Event()
+        order: list[str] = []
+        tasks = [asyncio.create_task(_hold(pool, release, order, str(i))) for i in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(*tasks)
+        assert order == ["0", "1", "2"]
+
+    async def test_cancelled_waiter_frees_its_queue_place(self):
+        pool = Bulkhead("p", max_concurrent=1, max_queue=1)
+        release = asyncio.Event()
+        running = asyncio.create_task(_hold(pool, release))
+        waiting = asyncio.create_task(_hold(pool, release))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert pool.stats()["queued"] == 0
+        release.set()
+        await running
+        assert pool.stats()["active"] == 0
+
+    async def test_thread_keeps_its_slot_after_the_caller_is_cancelled(self):
+        pool = Bulkhead("p", max_concurrent=1, max_queue=1)
+        started, finish = threading.Event(), threading.Event()
+
+        def _blocking():
+            started.set()
+            finish.wait(5)
+            return "done"
+
+        call = asyncio.create_task(pool.run_in_thread(_blocking))
+        await asyncio.to_thread(started.wait, 5)
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+        assert pool.stats()["active"] == 1  # the thread is still running
+        finish.set()
+        for _ in range(100):
+            if pool.stats()["active"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert pool.stats()["active"] == 0
+        assert await pool.run_in_thread(lambda: "next") == "next"
+
+
+class TestBulkheadRegistry:
+    async def test_provider_calls_are_pooled_per_workload(self):
+        registry = BulkheadRegistry()
+        async with registry.workload(MediaType.VIDEO):
+            assert current_workload.get() == "video"
+            async with registry.provider("sightengine"):
+                pass
+        async with registry.provider("sightengine"):
+            pass
+        assert current_workload.get() is None
+        assert {"video", "sightengine:video", "sightengine"} <= set(registry.stats())
+
+    async def test_saturated_video_pool_does_not_block_photos(self):
+        registry = BulkheadRegistry()
+        release = asyncio.Event()
+
+        async def _video_frame():
+            async with registry.workload(MediaType.VIDEO), registry.provider("sightengine"):
+                await release.wait()
+
+        async def _photo():
+            async with registry.workload(MediaType.IMAGE), registry.provider("sightengine"):
+                return "done"
+
+        with patch("core.bulkhead.settings.bulkhead_concurrency", {"sightengine:video": 2}):
+            frames = [asyncio.create_task(_video_frame()) for _ in range(5)]
+            await asyncio.sleep(0)
+            assert await asyncio.wait_for(_photo(), 0.1) == "done"
+        assert registry.stats()["sightengine:video"]["queued"] == 3
+        release.set()
+        await asyncio.gather(*frames)
+
+    async def test_adapter_http_call_runs_in_provider_pool(self):
+        registry = BulkheadRegistry()
+        seen: list[dict] = []
+        mock_client = MagicMock()
+
+        async def _post(*_args, **_kwargs):
+            seen.append(registry.stats())
+            response = MagicMock(status_code=200)
+            response.json.return_value = {"status": "success", "type": {"ai_generated": 0.9}}
+            return response
+
+        mock_client.post = AsyncMock(side_effect=_post)
+        session = MagicMock()
+        session.return_value.__aenter__ = AsyncMock(return_value=mock_client)
+        session.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        with patch("adapters.base.bulkheads", registry), patch("adapters.base.http_clients.session", session):
+            async with registry.workload(MediaType.VIDEO):
+                await SightengineAdapter().analyze(b"not-an-image")
+
+        assert seen[0]["sightengine:video"]["active"] == 1
+        assert registry.stats()["sightengine:video"]["active"] == 0
@@ -0,0 +1,173 @@
+"""Unit tests for per-provider circuit breakers."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.schemas import AnalysisResult
+from core.circuit_breaker import CircuitBreaker, breakers
+from core.enums import CircuitState, MediaType, ModelUsed, Verdict
+from core.exceptions import CircuitOpen
+from router.media_router import MediaRouter
+
+
+def _trip(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.min_calls):
+        assert breaker.allow()
+        breaker.record_failure()
+
+
+HF_RESULT = AnalysisResult(
+    verdict=Verdict.REAL,
+    confidence=0.9,
+    model_used=ModelUsed.HF_IMAGE,
+    explanation="hf",
+    media_type=MediaType.IMAGE,
+)
+
+
+class TestCircuitBreaker:
+    def test_opens_only_after_min_calls_and_ratio(self):
+        breaker = CircuitBreaker("p", min_calls=4, failure_ratio=0.5)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED
+        breaker.record_failure()  # 3/4 failed
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.allow() is False
+        assert breaker.rejected == 1
+
+    def test_old_failures_leave_the_window(self):
+        breaker = CircuitBreaker("p", window_s=0.05, min_calls=2)
+        breaker.record_failure()
+        time.sleep(0.06)
+        breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_half_open_probe_closes_or_reopens(self):
+        breaker = CircuitBreaker("p", min_calls=2, open_s=0.01, half_open_probes=1)
+        _trip(breaker)
+        time.sleep(0.02)
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow() is True
+        assert breaker.allow() is False  # only one probe at a time
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+
+        time.sleep(0.02)
+        assert breaker.allow() is True
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_released_probe_can_be_retried(self):
+        breaker = CircuitBreaker("p", min_calls=2, open_s=0.0)
+        _trip(breaker)
+        assert breaker.allow() is True
+        breaker.release()
+        assert breaker.allow() is True
+
+
+class TestBreakerIntegration:
+    async def test_adapter_failures_open_circuit_and_skip_network(self, mock_http, http_response):
+        from adapters.sightengine import SightengineAdapter
+
+        with patch("httpx.AsyncClient", return_value=mock_http(http_response(500))):
+            for _ in range(5):
+                with pytest.raises(Exception):
+                    await SightengineAdapter().analyze(b"img")
+        assert breakers.get("sightengine").state == CircuitState.OPEN
+
+        with patch("httpx.AsyncClient") as mock_cls:
+            with pytest.raises(CircuitOpen):
+                await SightengineAdapter().analyze(b"img")
+        mock_cls.assert_not_called()
+
+    async def test_client_errors_do_not_count(self, mock_http, http_response):
+        from adapters.sightengine import SightengineAdapter
+
+        with patch("httpx.AsyncClient", return_value=mock_http(http_response(200, {"status": "failure"}))):
+            for _ in range(6):
+                with pytest.raises(Exception):
+                    await SightengineAdapter().analyze(b"img")
+        assert breakers.get("sightengine").state == CircuitState.CLOSED
+
+    async def test_router_goes_straight_to_fallback_when_open(self):
+        _trip(breakers.get("sightengine"))
+        with patch("httpx.AsyncClient") as mock_cls, \
+             patch("router.media_router.HFImageAdapter.analyze", AsyncMock(return_value=HF_RESULT)):
+            result = await MediaRouter().route(MediaType.IMAGE, b"img")
+        assert result.model_used == ModelUsed.HF_IMAGE
+        mock_cls.assert_not_called()
+
+    async def test_video_skips_sightengine_when_open(self):
+        from adapters.video_pipeline import VideoPipeline
+
+        _trip(breakers.get("sightengine"))
+        frames = [b"\xff\xd8" + f"frame-{i}".encode() + b"\xff\xd9" for i in range(4)]
+
+        async def _frames(_data, _duration=0.0):
+            for frame in frames:
+                yield frame
+
+        se_analyze = AsyncMock()
+        with patch("adapters.video_pipeline._get_duration", AsyncMock(return_value=4.0)), \
+             patch("adapters.video_pipeline._iter_frames", _frames), \
+             patch("adapters.sightengine.SightengineAdapter.analyze", se_analyze), \
+             patch("adapters.hf_image.HFImageAdapter.analyze", AsyncMock(return_value=HF_RESULT)):
+            result = await VideoPipeline().analyze(b"video")
+        se_analyze.assert_not_awaited()
+        assert result.model_used == ModelUsed.HF_IMAGE
+
+    async def test_g4f_cascade_skips_open_model(self):
+        from core.analyzer import HybridTextAnalyzer
+
+        analyzer = HybridTextAnalyzer()
+        primary = analyzer.MODEL_CASCADE[0]
+        _trip(breakers.get(f"g4f:{primary}"))
+        call = AsyncMock(return_value={"fact_checks": []})
+        with patch.object(analyzer, "_call_g4f", call):
+            _, model = await analyzer.fact_check("text")
+        assert model == analyzer.MODEL_CASCADE[1]
+        assert call.await_args.args[0] == analyzer.MODEL_CASCADE[1]
+
+    async def test_hung_g4f_model_counts_as_failure(self):
+        from core.analyzer import HybridTextAnalyzer
+
+        analyzer = HybridTextAnalyzer()
+        primary, fallback = analyzer.MODEL_CASCADE[:2]
+
+        async def _call(model, _text, _timeout=None):
+            if model == primary:
+                await asyncio.sleep(10)
+            return {"fact_checks": []}
+
+        with patch.object(analyzer, "_call_g4f", _call), \
+             patch.object(analyzer, "FACTCHECK_MODEL_TIMEOUT_S", 0.01):
+            _, model = await analyzer.fact_check("text")
+        assert model == fallback
+        assert breakers.get(f"g4f:{primary}").stats()["failures"] == 1
+
+    async def test_g4f_cascade_out_of_time_is_a_timeout(self):
+        from core.analyzer import HybridTextAnalyzer
+
+        analyzer = HybridTextAnalyzer()
+
+        async def _hang(_model, _text, _timeout=None):
+            await asyncio.sleep(10)
+
+        with patch.object(analyzer, "_call_g4f", _hang), \
+             patch.object(analyzer, "FACTCHECK_TIMEOUT_S", 0.03), \
+             patch.object(analyzer, "FACTCHECK_MODEL_TIMEOUT_S", 0.02):
+            with pytest.raises(asyncio.TimeoutError):
+                await analyzer.fact_check("text")
+
+    def test_state_endpoint(self):
+        _trip(breakers.get("resemble"))
+        with TestClient(app) as client:
+            body = client.get("/health/providers").json()
+        assert body["resemble"]["state"] == "open"
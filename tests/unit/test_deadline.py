@@ -0,0 +1,143 @@
+"""Unit tests for end-to-end request deadline propagation."""
+
+import asyncio
+import sys
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from adapters.media_tools import run_media_tool
+from adapters.sightengine import SightengineAdapter
+from api.main import app
+from core import deadline
+from core.analyzer import HybridTextAnalyzer
+from core.config import settings
+from core.deadline import deadline_header, deadline_scope, parse_deadline_ms
+from core.enums import MediaType, ModelUsed, Verdict
+from core.exceptions import DeadlineExceeded, ExternalAPIError
+from core.provider_state import provider_states
+from router.media_router import MediaRouter
+
+SLEEP = [sys.executable, "-c", "import time; time.sleep(30)"]
+SUCCESS = {"status": "success", "type": {"ai_generated": 0.95}}
+
+
+class TestDeadlineScope:
+    def test_parse_header(self) -> None:
+        assert parse_deadline_ms("2500") == 2.5
+        assert parse_deadline_ms("-5") == 0.0
+        assert parse_deadline_ms("10000000") == settings.deadline_max_s
+        assert parse_deadline_ms(None) is None
+        assert parse_deadline_ms("soon") is None
+
+    def test_header_leaves_margin(self) -> None:
+        with patch("core.deadline.settings.deadline_margin_s", 5.0):
+            assert deadline_header(90.0) == {"x-deadline-ms": "85000"}
+
+    def test_no_deadline_by_default(self) -> None:
+        assert deadline.remaining() is None
+        assert deadline.clamp(15.0) == 15.0
+        deadline.check("anything")
+
+    def test_inner_scope_never_extends_outer(self) -> None:
+        with deadline_scope(1.0):
+            with deadline_scope(60.0):
+                assert deadline.remaining() <= 1.0
+            with deadline_scope(0.2):
+                assert deadline.remaining() <= 0.2
+        assert deadline.remaining() is None
+
+    async def test_tasks_inherit_deadline(self) -> None:
+        async def _remaining() -> float | None:
+            return deadline.remaining()
+
+        with deadline_scope(2.0):
+            task = asyncio.create_task(_remaining())
+        assert 0 < await task <= 2.0
+
+
+class TestAdapterDeadline:
+    async def test_post_timeout_clamped_to_deadline(self, mock_http, http_response) -> None:
+        client = mock_http(http_response(200, SUCCESS))
+        with patch("httpx.AsyncClient", return_value=client), deadline_scope(3.0):
+            await SightengineAdapter().analyze(b"image")
+        assert client.post.await_args.kwargs["timeout"] <= 3.0
+
+    async def test_no_attempt_without_budget(self, mock_http, http_response) -> None:
+        client = mock_http(http_response(200, SUCCESS))
+        with patch("httpx.AsyncClient", return_value=client), deadline_scope(0.1):
+            with pytest.raises(DeadlineExceeded):
+                await SightengineAdapter().analyze(b"image")
+        client.post.assert_not_awaited()
+
+    async def test_retry_wait_must_fit_deadline(self, mock_http, http_response) -> None:
+        client = mock_http(http_response(429, headers={"retry-after": "2"}), http_response(200, SUCCESS))
+        sleep = AsyncMock()
+        with patch("httpx.AsyncClient", return_value=client), \
+             patch("adapters.base.asyncio.sleep", sleep), deadline_scope(1.5):
+            with pytest.raises(ExternalAPIError, match="rate_limit"):
+                await SightengineAdapter().analyze(b"image")
+        sleep.assert_not_awaited()
+
+    async def test_hf_cold_start_wait_must_fit_deadline(self, mock_http, http_response) -> None:
+        from adapters.hf_image import HFImageAdapter
+
+        client = mock_http(http_response(503, {"error": "Model is currently loading"}))
+        sleep = AsyncMock()
+        with patch("httpx.AsyncClient", return_value=client), \
+             patch("adapters.hf_image.asyncio.sleep", sleep), deadline_scope(5):
+            result = await HFImageAdapter().analyze(b"image")
+        assert result.verdict == Verdict.UNCERTAIN
+        assert client.post.await_count == 1
+        sleep.assert_not_awaited()
+
+    async def test_deadline_timeout_is_not_a_provider_failure(self, mock_http) -> None:
+        async def _slow_post(*_args, **_kwargs):
+            await asyncio.sleep(0.7)  # past the deadline
+            raise httpx.ReadTimeout("timeout")
+
+        client = mock_http()
+        client.post = AsyncMock(side_effect=_slow_post)
+        with patch("httpx.AsyncClient", return_value=client), deadline_scope(0.6):
+            result = await SightengineAdapter().analyze(b"image")
+        assert result.verdict == Verdict.UNCERTAIN
+        assert provider_states.get("sightengine").server_errors == 0
+
+
+class TestStagesDeadline:
+    async def test_ffmpeg_killed_at_deadline(self) -> None:
+        with deadline_scope(0.8):
+            with pytest.raises(DeadlineExceeded):
+                await asyncio.wait_for(run_media_tool(SLEEP), 5)
+
+    async def test_router_returns_uncertain_when_out_of_time(self) -> None:
+        analyze = AsyncMock()
+        with patch("adapters.sightengine.SightengineAdapter.analyze", analyze), deadline_scope(0.0):
+            result = await MediaRouter().route(MediaType.IMAGE, b"image")
+        analyze.assert_not_awaited()
+        assert result.verdict == Verdict.UNCERTAIN
+        assert result.model_used == ModelUsed.FALLBACK_UNCERTAIN
+
+    async def test_g4f_cascade_stops_at_deadline(self) -> None:
+        analyzer = HybridTextAnalyzer()
+        call = AsyncMock(side_effect=ValueError("Invalid JSON from g4f"))
+        with patch.object(analyzer, "_call_g4f", call), deadline_scope(0.0):
+            with pytest.raises(RuntimeError, match="deadline"):
+                await analyzer.fact_check("text")
+        call.assert_not_awaited()
+
+    def test_endpoint_reads_deadline_header(self) -> None:
+        analyze = AsyncMock()
+        headers = {"x-api-secret": settings.api_secret_key, "x-deadline-ms": "0"}
+        with patch("adapters.sightengine.SightengineAdapter.analyze", analyze), TestClient(app) as client:
+            response = client.post(
+                "/analyze",
+                headers=headers,
+                data={"user_id": "1"},
+                files={"file": ("photo.jpg", b"not-really-a-jpeg", "image/jpeg")},
+            )
+        assert response.status_code == 200
+        assert response.json()["verdict"] == "UNCERTAIN"
+        analyze.assert_not_awaited()
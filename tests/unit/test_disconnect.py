@@ -0,0 +1,156 @@
+"""Unit tests for cancelling abandoned work when the client disconnects."""
+
+import asyncio
+import sys
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from adapters.media_tools import run_media_tool, stream_media_tool
+from api.disconnect import cancel_on_disconnect
+from api.main import app
+from api.schemas import AnalysisResult
+from core.analyzer import HybridTextAnalyzer
+from core.cancellation import STOPPED, cancellations
+from core.config import settings
+from core.enums import MediaType, ModelUsed, Verdict
+from core.hedging import cancel_and_wait
+
+SLEEP = [sys.executable, "-c", "import time; time.sleep(30)"]
+TALK_THEN_SLEEP = [sys.executable, "-c", "import sys, time; sys.stdout.write('x'); sys.stdout.flush(); time.sleep(30)"]
+
+
+class _Request:
+    """Stands in for Starlette's Request: ``receive()`` reports a disconnect after ``after`` s."""
+
+    def __init__(self, after: float | None) -> None:
+        self.after = after
+
+    async def receive(self) -> dict:
+        if self.after is None:
+            await asyncio.Event().wait()  # client never leaves
+        await asyncio.sleep(self.after)
+        return {"type": "http.disconnect"}
+
+
+@pytest.fixture(autouse=True)
+def _reset_cancellations():
+    cancellations.reset()
+    yield
+    cancellations.reset()
+
+
+class TestCancelOnDisconnect:
+    async def test_result_when_client_stays(self) -> None:
+        async def _work() -> str:
+            await asyncio.sleep(0.01)
+            return "done"
+
+        assert await cancel_on_disconnect(_Request(None), _work(), "analyze") == "done"
+        assert cancellations.stats() == {}
+
+    async def test_disconnect_cancels_task_tree(self) -> None:
+        child_cancelled = asyncio.Event()
+
+        async def _child() -> None:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                child_cancelled.set()
+                raise
+
+        async def _work() -> None:
+            await asyncio.gather(_child(), _child())
+
+        with pytest.raises(HTTPException) as exc_info:
+            await asyncio.wait_for(cancel_on_disconnect(_Request(0.05), _work(), "analyze"), 2)
+        assert exc_info.value.status_code == 499
+        assert child_cancelled.is_set()
+        assert cancellations.stats() == {"analyze": 1}
+
+    async def test_errors_propagate(self) -> None:
+        async def _work() -> None:
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await cancel_on_disconnect(_Request(None), _work(), "bigcheck")
+
+
+class TestCancelledWork:
+    async def test_cancelled_ffmpeg_is_killed_and_counted(self) -> None:
+        task = asyncio.create_task(run_media_tool(SLEEP))
+        await asyncio.sleep(0.3)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(task, 5)
+        assert cancellations.stats() == {"ffmpeg": 1}
+
+    async def test_abandoned_stream_is_counted(self) -> None:
+        stream = stream_media_tool(SLEEP)
+        reader = asyncio.create_task(anext(stream, None))
+        await asyncio.sleep(0.3)
+        reader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(reader, 5)
+        await stream.aclose()
+        assert cancellations.stats() == {"ffmpeg": 1}
+
+    async def test_deliberate_close_is_not_counted(self) -> None:
+        stream = stream_media_tool(TALK_THEN_SLEEP)
+        assert await asyncio.wait_for(anext(stream), 5) == b"x"
+        await stream.aclose()  # e.g. the consumer has all the frames it needs
+        assert cancellations.stats() == {}
+
+    async def test_early_stop_cancellation_is_not_counted(self) -> None:
+        stream = stream_media_tool(SLEEP)
+        reader = asyncio.create_task(anext(stream, None))
+        await asyncio.sleep(0.3)
+        await cancel_and_wait(reader, STOPPED)
+        await stream.aclose()
+        assert cancellations.stats() == {}
+
+    async def test_hybrid_analyze_cancels_sapling(self) -> None:
+        analyzer = HybridTextAnalyzer()
+        sapling_cancelled = asyncio.Event()
+
+        async def _slow_sapling(_data: bytes):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                sapling_cancelled.set()
+                raise
+
+        async def _slow_fact_check(_text: str):
+            await asyncio.sleep(10)
+
+        with patch.object(analyzer.sapling, "analyze", _slow_sapling), \
+             patch.object(analyzer, "fact_check", _slow_fact_check):
+            task = asyncio.create_task(analyzer.analyze("text"))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            await asyncio.sleep(0)
+        assert sapling_cancelled.is_set()
+
+    def test_metrics_report_cancellations(self) -> None:
+        cancellations.record("bigcheck")
+        with patch("api.routers.metrics.job_runner.queue", None), TestClient(app) as client:
+            body = client.get("/metrics").json()
+        assert body["cancellations"] == {"bigcheck": 1}
+
+    def test_connected_client_gets_its_result(self) -> None:
+        result = AnalysisResult(
+            verdict=Verdict.REAL, confidence=0.9, model_used=ModelUsed.SIGHTENGINE,
+            explanation="test", media_type=MediaType.IMAGE,
+        )
+        route = AsyncMock(return_value=result)
+        with patch("api.routers.bigcheck.media_router.route", route), TestClient(app) as client:
+            response = client.post(
+                "/bigcheck", headers={"x-api-secret": settings.api_secret_key}, data={"user_id": "1"},
+                files=[("files", ("a.jpg", b"fast", "image/jpeg"))],
+            )
+        assert response.status_code == 200
+        assert cancellations.stats() == {}
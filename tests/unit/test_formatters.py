@@ -128,3 +128,18 @@ class TestFormatResult:
     def test_all_verdicts_have_correct_emoji(self, verdict: Verdict, expected_emoji: str):
         text = format_result(_make_result(verdict=verdict))
         assert expected_emoji in text
+
+
+class TestBigCheckMessages:
+    def test_filenames_are_html_escaped(self):
+        from bot.handlers.bigcheck import (
+            _format_bigcheck_progress,
+            _format_bigcheck_result,
+        )
+
+        item = {"filename": "<b>a&b</b>.jpg", "verdict": "FAKE", "media_type": "image", "confidence": 0.9}
+        progress = _format_bigcheck_progress([item], 2)
+        result = _format_bigcheck_result({"overall_verdict": "FAKE", "results": [item]})
+        for text in (progress, result):
+            assert "&lt;b&gt;a&amp;b&lt;/b&gt;.jpg" in text
+            assert "<b>a&b" not in text
@@ -0,0 +1,201 @@
+"""Unit tests for latency-driven hedging of primary/fallback provider calls."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from api.schemas import AnalysisResult
+from core.enums import MediaType, ModelUsed, Verdict
+from core.exceptions import ExternalAPIError
+from core.hedging import HedgePolicy, LatencyTracker
+from router.media_router import MediaRouter
+
+
+def _result(verdict: Verdict, model: ModelUsed, explanation: str = "") -> AnalysisResult:
+    return AnalysisResult(
+        verdict=verdict,
+        confidence=0.9 if verdict != Verdict.UNCERTAIN else 0.5,
+        model_used=model,
+        explanation=explanation or model.value,
+        media_type=MediaType.IMAGE,
+    )
+
+
+PRIMARY = _result(Verdict.REAL, ModelUsed.SIGHTENGINE)
+FALLBACK = _result(Verdict.FAKE, ModelUsed.HF_IMAGE)
+
+
+def _delayed(result: AnalysisResult | Exception, delay: float, started: list | None = None, cancelled: list | None = None):
+    async def call(*_args) -> AnalysisResult:
+        if started is not None:
+            started.append(True)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.append(True)
+            raise
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return call
+
+
+def _policy(**kwargs) -> HedgePolicy:
+    params = {"min_samples": 1, "default_delay_s": 0.05, "min_delay_s": 0.0, "max_inflight": 2}
+    params.update(kwargs)
+    return HedgePolicy(LatencyTracker(), **params)
+
+
+class TestLatencyTracker:
+    def test_quantile_needs_min_samples(self) -> None:
+        tracker = LatencyTracker()
+        for ms in range(1, 11):
+            tracker.record("sightengine", ms / 1000)
+        assert tracker.quantile("sightengine", 0.9, min_samples=20) is None
+        assert tracker.quantile("sightengine", 0.9) == pytest.approx(0.010)
+
+    def test_window_drops_old_samples(self) -> None:
+        tracker = LatencyTracker(window=3)
+        for seconds in (10.0, 0.1, 0.1, 0.1):
+            tracker.record("resemble", seconds)
+        assert tracker.quantile("resemble", 0.99) == pytest.approx(0.1)
+
+    def test_delay_uses_observed_p90_then_default(self) -> None:
+        policy = _policy(min_samples=5, default_delay_s=3.0, min_delay_s=0.2)
+        assert policy.delay_for("sightengine") == 3.0
+        for _ in range(5):
+            policy.tracker.record("sightengine", 0.05)
+        assert policy.delay_for("sightengine") == 0.2  # clamped to min_delay_s
+
+
+class TestHedgePolicy:
+    async def test_fast_primary_is_not_hedged(self) -> None:
+        policy = _policy(default_delay_s=1.0)
+        started: list = []
+        result = await policy.call(
+            "sightengine", _delayed(PRIMARY, 0), "hf_image", _delayed(FALLBACK, 0, started=started)
+        )
+        assert result is PRIMARY
+        assert not started
+        assert policy.stats()["hedged"] == {}
+
+    async def test_slow_primary_loses_to_hedge_and_is_cancelled(self) -> None:
+        policy = _policy()
+        cancelled: list = []
+        result = await policy.call(
+            "sightengine", _delayed(PRIMARY, 5, cancelled=cancelled), "hf_image", _delayed(FALLBACK, 0.01)
+        )
+        assert result is FALLBACK
+        assert cancelled == [True]
+        assert policy.hedged["hf_image"] == 1
+        assert policy.hedge_wins["hf_image"] == 1
+
+    async def test_primary_wins_race_and_hedge_is_cancelled(self) -> None:
+        policy = _policy()
+        cancelled: list = []
+        result = await policy.call(
+            "sightengine", _delayed(PRIMARY, 0.1), "hf_image", _delayed(FALLBACK, 5, cancelled=cancelled)
+        )
+        assert result is PRIMARY
+        assert cancelled == [True]
+        assert policy.hedge_wins["hf_image"] == 0
+
+    async def test_uncertain_primary_waits_for_decisive_hedge(self) -> None:
+        policy = _policy()
+        uncertain = _result(Verdict.UNCERTAIN, ModelUsed.SIGHTENGINE)
+        result = await policy.call("sightengine", _delayed(uncertain, 0.08), "hf_image", _delayed(FALLBACK, 0.2))
+        assert result is FALLBACK
+
+    async def test_primary_error_during_race_uses_hedge(self) -> None:
+        policy = _policy()
+        result = await policy.call(
+            "sightengine", _delayed(ExternalAPIError("sightengine", "boom"), 0.08), "hf_image", _delayed(FALLBACK, 0.2)
+        )
+        assert result is FALLBACK
+
+    async def test_both_fail_raises_fallback_error(self) -> None:
+        policy = _policy()
+        with pytest.raises(ExternalAPIError, match="hf_image"):
+            await policy.call(
+                "sightengine",
+                _delayed(ExternalAPIError("sightengine", "boom"), 0.08),
+                "hf_image",
+                _delayed(ExternalAPIError("hf_image", "down"), 0.1),
+            )
+
+    async def test_both_uncertain_are_merged(self) -> None:
+        policy = _policy()
+        first = _result(Verdict.UNCERTAIN, ModelUsed.RESEMBLE, "a")
+        second = _result(Verdict.UNCERTAIN, ModelUsed.HF_AUDIO, "b")
+        merge = lambda p, f: _result(Verdict.UNCERTAIN, p.model_used, p.explanation + f.explanation)  # noqa: E731
+        result = await policy.call("resemble", _delayed(first, 0.08), "hf_audio", _delayed(second, 0.1), merge)
+        assert result.explanation == "ab"
+
+    async def test_error_before_hedge_delay_falls_back_sequentially(self) -> None:
+        policy = _policy(default_delay_s=1.0)
+        result = await policy.call(
+            "sightengine", _delayed(ExternalAPIError("sightengine", "boom"), 0), "hf_image", _delayed(FALLBACK, 0)
+        )
+        assert result is FALLBACK
+        assert policy.hedged["hf_image"] == 0
+
+    async def test_inflight_cap_bounds_extra_load(self) -> None:
+        policy = _policy(max_inflight=1)
+        started: list = []
+        results = await asyncio.gather(
+            *(
+                policy.call("sightengine", _delayed(PRIMARY, 0.2), "hf_image", _delayed(FALLBACK, 1, started=started))
+                for _ in range(3)
+            )
+        )
+        assert results == [PRIMARY] * 3
+        assert len(started) == 1
+        assert policy.hedged["hf_image"] == 1
+        assert policy._inflight["hf_image"] == 0
+
+    async def test_cancelling_caller_cancels_both_calls(self) -> None:
+        policy = _policy()
+        cancelled: list = []
+        task = asyncio.ensure_future(
+            policy.call(
+                "sightengine",
+                _delayed(PRIMARY, 5, cancelled=cancelled),
+                "hf_image",
+                _delayed(FALLBACK, 5, cancelled=cancelled),
+            )
+        )
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+        assert cancelled == [True, True]
+        assert policy._inflight["hf_image"] == 0
+
+
+class TestRouterHedging:
+    @patch("router.media_router.HFImageAdapter")
+    @patch("router.media_router.SightengineAdapter")
+    async def test_image_route_hedges_slow_sightengine(self, mock_se: AsyncMock, mock_hf: AsyncMock) -> None:
+        mock_se.return_value.PROVIDER = "sightengine"
+        mock_se.return_value.analyze = _delayed(PRIMARY, 5)
+        mock_hf.return_value.PROVIDER = "hf_image"
+        mock_hf.return_value.analyze = AsyncMock(return_value=FALLBACK)
+
+        router = MediaRouter(hedge=_policy())
+        result = await router.route(MediaType.IMAGE, b"image")
+
+        assert result is FALLBACK
+
+    @patch("router.media_router.HFImageAdapter")
+    @patch("router.media_router.SightengineAdapter")
+    async def test_without_policy_router_falls_back_sequentially(self, mock_se: AsyncMock, mock_hf: AsyncMock) -> None:
+        mock_se.return_value.analyze = AsyncMock(side_effect=ExternalAPIError("sightengine", "429"))
+        mock_hf.return_value.analyze = AsyncMock(return_value=FALLBACK)
+
+        result = await MediaRouter().route(MediaType.IMAGE, b"image")
+
+        assert result is FALLBACK
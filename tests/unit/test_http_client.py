@@ -0,0 +1,57 @@
+"""Unit tests for the shared pooled HTTP client registry."""
+
+from unittest.mock import patch
+
+import pytest
+
+from adapters.http_client import HTTPClientRegistry
+
+
+class TestHTTPClientRegistry:
+    @pytest.mark.asyncio
+    async def test_one_shot_client_when_not_started(self, mock_http):
+        registry = HTTPClientRegistry()
+        with patch("httpx.AsyncClient", side_effect=lambda **_: mock_http()) as mock_cls:
+            async with registry.session("sightengine", 15.0):
+                pass
+            async with registry.session("sightengine", 15.0):
+                pass
+        assert mock_cls.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_pooled_client_reused_within_lifespan(self, mock_http):
+        registry = HTTPClientRegistry()
+        with patch("httpx.AsyncClient", side_effect=lambda **_: mock_http()) as mock_cls:
+            async with registry.lifespan():
+                async with registry.session("sightengine", 15.0, max_connections=10) as first:
+                    pass
+                async with registry.session("sightengine", 15.0) as second:
+                    pass
+                async with registry.session("sapling", 15.0) as other:
+                    pass
+        assert first is second
+        assert other is not first
+        assert mock_cls.call_count == 2
+        assert mock_cls.call_args_list[0].kwargs["limits"].max_connections == 10
+
+    @pytest.mark.asyncio
+    async def test_lifespan_closes_clients(self, mock_http):
+        registry = HTTPClientRegistry()
+        client = mock_http()
+        with patch("httpx.AsyncClient", return_value=client):
+            async with registry.lifespan():
+                async with registry.session("resemble", 15.0):
+                    pass
+        client.aclose.assert_awaited_once()
+        assert not registry.started
+
+    @pytest.mark.asyncio
+    async def test_http2_falls_back_without_h2(self, mock_http):
+        registry = HTTPClientRegistry()
+        with patch("adapters.http_client.settings.http2_enabled", True), \
+             patch("adapters.http_client._http2_available", return_value=False), \
+             patch("httpx.AsyncClient", side_effect=lambda **_: mock_http()) as mock_cls:
+            async with registry.lifespan():
+                async with registry.session("hf_image", 15.0):
+                    pass
+        assert mock_cls.call_args.kwargs["http2"] is False
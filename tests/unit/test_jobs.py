@@ -0,0 +1,224 @@
+"""Unit tests for the background job store, runner and /jobs endpoints."""
+
+import asyncio
+import hashlib
+import hmac
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.routers.jobs import TaskPayload
+from api.schemas import AnalysisResult, JobInfo
+from core.config import settings
+from core.enums import JobStatus, MediaType, ModelUsed, Verdict
+from core.exceptions import JobFailed
+from core.jobs import JobRunner, MemoryJobStore, SQLiteJobStore, create_job_runner
+from core.memory_budget import MemoryBudget
+from core.task_queue import LocalRedis, RedisTaskQueue
+
+HEADERS = {"x-api-secret": settings.api_secret_key}
+
+FAKE_RESULT = AnalysisResult(
+    verdict=Verdict.FAKE,
+    confidence=0.9,
+    model_used=ModelUsed.SIGHTENGINE,
+    explanation="test",
+    media_type=MediaType.IMAGE,
+)
+
+
+def _job(job_id: str, status: JobStatus = JobStatus.QUEUED, finished_at: float | None = None) -> JobInfo:
+    return JobInfo(job_id=job_id, kind="analyze", status=status, created_at=time.time(), finished_at=finished_at)
+
+
+async def _wait_finished(runner: JobRunner, job_id: str) -> JobInfo:
+    for _ in range(100):
+        job = await runner.store.get(job_id)
+        if job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+class TestJobStores:
+    async def test_memory_store_expires_and_evicts_only_finished(self):
+        store = MemoryJobStore(ttl_s=60, max_entries=2)
+        await store.create(_job("old", JobStatus.SUCCEEDED, finished_at=time.time() - 120))
+        assert await store.get("old") is None
+
+        await store.create(_job("running", JobStatus.RUNNING))
+        await store.create(_job("done", JobStatus.SUCCEEDED, finished_at=time.time()))
+        await store.create(_job("new"))
+        assert await store.get("running") is not None
+        assert await store.get("done") is None
+        assert await store.get("new") is not None
+
+    async def test_sqlite_store_survives_restart_and_fails_interrupted(self, tmp_path):
+        path = str(tmp_path / "jobs.sqlite3")
+        store = SQLiteJobStore(path)
+        await store.create(_job("finished", JobStatus.SUCCEEDED, finished_at=time.time()))
+        await store.create(_job("inflight", JobStatus.RUNNING))
+
+        reopened = SQLiteJobStore(path)
+        assert (await reopened.get("finished")).status == JobStatus.SUCCEEDED
+        interrupted = await reopened.get("inflight")
+        assert interrupted.status == JobStatus.FAILED
+        assert interrupted.error == "interrupted by restart"
+        assert await reopened.get("missing") is None
+
+    async def test_sqlite_store_leaves_queued_jobs_to_workers(self, tmp_path):
+        path = str(tmp_path / "jobs.sqlite3")
+        await SQLiteJobStore(path).create(_job("inflight", JobStatus.RUNNING))
+
+        reopened = SQLiteJobStore(path, fail_interrupted=False)
+        assert (await reopened.get("inflight")).status == JobStatus.RUNNING
+
+
+class TestJobRunner:
+    def test_queue_executor_rejects_memory_store(self):
+        with patch("core.jobs.settings.job_executor", "queue"), \
+             patch("core.jobs.settings.job_store_backend", "memory"), pytest.raises(RuntimeError):
+            create_job_runner()
+
+    async def test_success_records_result(self):
+        runner = JobRunner(MemoryJobStore())
+        job = await runner.submit("analyze", AsyncMock(return_value=FAKE_RESULT))
+        assert job.status == JobStatus.QUEUED
+        done = await _wait_finished(runner, job.job_id)
+        assert done.status == JobStatus.SUCCEEDED
+        assert done.result["verdict"] == "FAKE"
+        assert done.started_at is not None
+
+    async def test_failure_reason_is_recorded(self):
+        runner = JobRunner(MemoryJobStore())
+        job = await runner.submit("analyze", AsyncMock(side_effect=JobFailed("Видео слишком длинное")))
+        done = await _wait_finished(runner, job.job_id)
+        assert done.status == JobStatus.FAILED
+        assert done.error == "Видео слишком длинное"
+
+    async def test_shutdown_marks_running_jobs_failed(self):
+        runner = JobRunner(MemoryJobStore())
+
+        async def _forever():
+            await asyncio.sleep(10)
+
+        job = await runner.submit("analyze", _forever)
+        await asyncio.sleep(0.01)
+        await runner.aclose()
+        assert (await runner.store.get(job.job_id)).error == "cancelled"
+
+    async def test_webhook_is_signed_and_retried(self):
+        runner = JobRunner(MemoryJobStore())
+        client = MagicMock()
+        client.post = AsyncMock(side_effect=[MagicMock(status_code=502), MagicMock(status_code=200)])
+        session = MagicMock()
+        session.return_value.__aenter__ = AsyncMock(return_value=client)
+        session.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        with patch("core.jobs.http_clients.session", session), \
+             patch("core.jobs.settings.job_webhook_backoff_s", 0):
+            job = await runner.submit("analyze", AsyncMock(return_value=FAKE_RESULT), "https://example.com/hook")
+            await _wait_finished(runner, job.job_id)
+            await asyncio.gather(*runner._tasks)
+
+        assert client.post.await_count == 2
+        kwargs = client.post.await_args.kwargs
+        expected = hmac.new(settings.api_secret_key.encode(), kwargs["content"], hashlib.sha256).hexdigest()
+        assert kwargs["headers"]["x-signature"] == expected
+        assert JobInfo.model_validate_json(kwargs["content"]).status == JobStatus.SUCCEEDED
+
+
+class TestJobsAPI:
+    def test_submit_then_poll(self):
+        with patch("api.routers.analyze.media_router.route", AsyncMock(return_value=FAKE_RESULT)), \
+             TestClient(app) as client:
+            response = client.post(
+                "/jobs",
+                headers=HEADERS,
+                data={"user_id": "1"},
+                files=[("files", ("a.jpg", b"img", "image/jpeg"))],
+            )
+            assert response.status_code == 202
+            job_id = response.json()["job_id"]
+
+            for _ in range(100):
+                job = client.get(f"/jobs/{job_id}", headers=HEADERS).json()
+                if job["status"] == "succeeded":
+                    break
+                time.sleep(0.01)
+
+        assert job["status"] == "succeeded"
+        assert job["result"]["verdict"] == "FAKE"
+
+    def test_local_job_keeps_its_upload_charged_until_it_ends(self):
+        budget = MemoryBudget(10 * 1024 * 1024)
+        finish = False
+
+        async def _route(*_args, **_kwargs):
+            while not finish:
+                await asyncio.sleep(0.005)
+            return FAKE_RESULT
+
+        with patch("api.admission.memory_budget", budget), \
+             patch("api.routers.jobs.memory_budget", budget), \
+             patch("api.routers.analyze.media_router.route", AsyncMock(side_effect=_route)), \
+             TestClient(app) as client:
+            response = client.post(
+                "/jobs",
+                headers=HEADERS,
+                data={"user_id": "1"},
+                files=[("files", ("a.jpg", b"img", "image/jpeg"))],
+            )
+            assert response.status_code == 202
+            assert budget.used > 0  # the request is over, the queued payload is not
+            finish = True
+            job_id = response.json()["job_id"]
+            for _ in range(100):
+                if client.get(f"/jobs/{job_id}", headers=HEADERS).json()["status"] == "succeeded":
+                    break
+                time.sleep(0.01)
+        assert budget.used == 0
+
+    def test_jobs_are_admitted_at_the_door(self):
+        budget = MemoryBudget(10, max_wait_s=0.01)
+        with patch("api.admission.memory_budget", budget), TestClient(app) as client:
+            response = client.post(
+                "/jobs",
+                headers=HEADERS,
+                data={"user_id": "1"},
+                files=[("files", ("a.jpg", b"img", "image/jpeg"))],
+            )
+        assert response.status_code == 503
+
+    def test_queue_mode_enqueues_for_workers(self):
+        queue = RedisTaskQueue(LocalRedis())
+        route = AsyncMock(return_value=FAKE_RESULT)
+        with patch("api.routers.jobs.job_runner.queue", queue), \
+             patch("api.routers.analyze.media_router.route", route), \
+             TestClient(app) as client:
+            response = client.post(
+                "/jobs",
+                headers=HEADERS,
+                data={"user_id": "1"},
+                files=[("files", ("a.jpg", b"img", "image/jpeg"))],
+            )
+            job = client.get(f"/jobs/{response.json()['job_id']}", headers=HEADERS).json()
+
+        assert job["status"] == "queued"
+        route.assert_not_awaited()
+        lease = asyncio.run(queue.lease(30))
+        assert TaskPayload.from_bytes(lease.payload).uploads == [("a.jpg", "image/jpeg", b"img")]
+
+    def test_unknown_job_and_bad_input(self):
+        with TestClient(app) as client:
+            assert client.get("/jobs/nope", headers=HEADERS).status_code == 404
+            response = client.post(
+                "/jobs",
+                headers=HEADERS,
+                data={"user_id": "1", "kind": "analyze"},
+                files=[("files", ("a.exe", b"x", "application/x-msdownload"))],
+            )
+            assert response.status_code == 400
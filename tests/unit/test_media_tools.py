@@ -0,0 +1,56 @@
+"""Unit tests for the async ffmpeg/ffprobe runner (uses the Python interpreter as a stand-in tool)."""
+
+import asyncio
+import sys
+
+import pytest
+
+from adapters.media_tools import run_media_tool, stream_media_tool
+from core.exceptions import ExternalAPIError
+
+ECHO = [sys.executable, "-c", "import sys; sys.stdout.buffer.write(sys.stdin.buffer.read())"]
+SLEEP = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+class TestRunMediaTool:
+    @pytest.mark.asyncio
+    async def test_pipes_stdin_to_stdout(self):
+        result = await run_media_tool(ECHO, input=b"payload")
+        assert result.returncode == 0
+        assert result.stdout == b"payload"
+
+    @pytest.mark.asyncio
+    async def test_missing_binary_raises_external_api_error(self):
+        with pytest.raises(ExternalAPIError) as exc_info:
+            await run_media_tool(["definitely-not-ffmpeg-binary"], input=b"")
+        assert exc_info.value.service == "ffmpeg"
+
+    @pytest.mark.asyncio
+    async def test_timeout_raises(self):
+        with pytest.raises(ExternalAPIError) as exc_info:
+            await run_media_tool(SLEEP, timeout=0.2)
+        assert exc_info.value.detail == "timeout"
+
+    @pytest.mark.asyncio
+    async def test_cancel_does_not_hang(self):
+        task = asyncio.create_task(run_media_tool(SLEEP))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(task, 5)
+
+
+class TestStreamMediaTool:
+    @pytest.mark.asyncio
+    async def test_streams_large_output(self):
+        payload = b"x" * (1024 * 1024)
+        chunks = [chunk async for chunk in stream_media_tool(ECHO, input=payload)]
+        assert len(chunks) > 1
+        assert b"".join(chunks) == payload
+
+    @pytest.mark.asyncio
+    async def test_nonzero_exit_raises(self):
+        failing = [sys.executable, "-c", "import sys; sys.exit(3)"]
+        with pytest.raises(ExternalAPIError):
+            async for _ in stream_media_tool(failing):
+                pass
@@ -0,0 +1,160 @@
+"""Unit tests for the in-flight media memory budget."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.schemas import AnalysisResult
+from core.config import settings
+from core.enums import MediaType, ModelUsed, Verdict
+from core.exceptions import Overloaded
+from core.memory_budget import MemoryBudget
+
+HEADERS = {"x-api-secret": settings.api_secret_key}
+
+
+def _se_result(score: float) -> AnalysisResult:
+    return AnalysisResult(
+        verdict=Verdict.FAKE if score >= 0.75 else Verdict.REAL,
+        confidence=score, model_used=ModelUsed.SIGHTENGINE,
+        explanation="test", media_type=MediaType.IMAGE,
+    )
+
+
+class TestMemoryBudget:
+    async def test_waiters_are_granted_in_order(self) -> None:
+        budget = MemoryBudget(100)
+        await budget.acquire(80, "upload")
+        granted: list[str] = []
+
+        async def _take(nbytes: int, name: str) -> None:
+            await budget.acquire(nbytes, "frames")
+            granted.append(name)
+
+        big = asyncio.create_task(_take(60, "big"))
+        small = asyncio.create_task(_take(10, "small"))
+        await asyncio.sleep(0)
+        assert granted == []  # the small charge would fit, but doesn't jump the queue
+        assert budget.stats()["waiting_bytes"] == 70
+        budget.release(80, "upload")
+        await asyncio.gather(big, small)
+        assert granted == ["big", "small"]
+        assert budget.stats()["by_purpose"] == {"frames": 70}
+        assert budget.peak == 80
+
+    async def test_wait_times_out_with_overloaded(self) -> None:
+        budget = MemoryBudget(100, max_wait_s=0.01)
+        await budget.acquire(100, "upload")
+        with pytest.raises(Overloaded) as exc_info:
+            await budget.acquire(1, "decode")
+        assert exc_info.value.kind == "memory"
+        assert budget.stats()["waiting"] == 0
+        assert budget.rejected == 1
+
+    async def test_larger_than_capacity_is_rejected_at_once(self) -> None:
+        budget = MemoryBudget(100)
+        with pytest.raises(Overloaded):
+            await budget.acquire(101, "upload")
+        assert budget.used == 0
+
+    async def test_cancelled_waiter_unblocks_the_queue(self) -> None:
+        budget = MemoryBudget(100)
+        await budget.acquire(50, "upload")
+        big = asyncio.create_task(budget.acquire(80, "upload"))
+        small = asyncio.create_task(budget.acquire(30, "upload"))
+        await asyncio.sleep(0)
+        big.cancel()
+        await asyncio.gather(big, return_exceptions=True)
+        await small
+        assert budget.used == 80
+        assert budget.stats()["waiting"] == 0
+
+    async def test_uploads_leave_the_reserve_to_running_requests(self) -> None:
+        budget = MemoryBudget(100, max_wait_s=0.01, reserve=30)
+        await budget.acquire(35, "upload", admit=True)
+        await budget.acquire(35, "upload", admit=True)
+        upload = asyncio.create_task(budget.acquire(35, "upload", admit=True))
+        await asyncio.sleep(0)
+        await budget.acquire(25, "frames")  # not queued behind the waiting upload
+        with pytest.raises(Overloaded):
+            await upload
+        assert budget.used == 95
+
+    async def test_running_requests_are_served_before_admissions(self) -> None:
+        budget = MemoryBudget(100, reserve=20)
+        await budget.acquire(80, "frames")
+        upload = asyncio.create_task(budget.acquire(10, "upload", admit=True))
+        frames = asyncio.create_task(budget.acquire(90, "frames"))
+        await asyncio.sleep(0)
+        budget.release(80, "frames")
+        await frames
+        assert not upload.done()
+        budget.release(90, "frames")
+        await upload
+
+    async def test_unbounded_only_keeps_the_books(self) -> None:
+        budget = MemoryBudget(None)
+        async with budget.hold(10 ** 12, "upload"):
+            assert budget.stats()["used"] == 10 ** 12
+        assert budget.used == 0
+
+
+class TestMemoryBudgetWiring:
+    def test_upload_waits_then_gets_503_when_budget_stays_full(self) -> None:
+        budget = MemoryBudget(1024, max_wait_s=0.01)
+        budget.used = 1024
+        route = AsyncMock()
+        with patch("api.admission.memory_budget", budget), \
+             patch("api.routers.analyze.media_router.route", route), TestClient(app) as client:
+            response = client.post(
+                "/analyze", headers=HEADERS, data={"user_id": "1"},
+                files={"file": ("photo.jpg", b"jpeg", "image/jpeg")},
+            )
+        assert response.status_code == 503
+        assert "retry-after" in response.headers
+        route.assert_not_awaited()
+
+    def test_upload_is_released_after_the_request(self) -> None:
+        budget = MemoryBudget(10 * 1024 * 1024)
+        with patch("api.admission.memory_budget", budget), \
+             patch("api.routers.analyze.media_router.route", AsyncMock(return_value=_se_result(0.9))), \
+             TestClient(app) as client:
+            response = client.post(
+                "/analyze", headers=HEADERS, data={"user_id": "1"},
+                files={"file": ("photo.jpg", b"jpeg", "image/jpeg")},
+            )
+        assert response.status_code == 200
+        assert budget.used == 0
+        assert budget.peak > 0
+
+    async def test_video_frames_are_charged_until_scored(self) -> None:
+        from adapters.video_pipeline import VideoPipeline
+
+        budget = MemoryBudget(10 * 1024 * 1024)
+        frames = [b"\xff\xd8" + f"frame-{i}".encode() + b"\xff\xd9" for i in range(4)]
+        held: list[int] = []
+
+        async def _analyze(frame: bytes) -> AnalysisResult:
+            held.append(budget.used)
+            return _se_result(0.95)
+
+        async def _iter(_data: bytes, _duration: float = 0.0):
+            for frame in frames:
+                yield frame
+
+        with patch("adapters.video_pipeline.memory_budget", budget), \
+             patch("adapters.video_pipeline._get_duration", AsyncMock(return_value=4.0)), \
+             patch("adapters.video_pipeline._iter_frames", _iter), \
+             patch("adapters.sightengine.SightengineAdapter.analyze", AsyncMock(side_effect=_analyze)), \
+             patch("adapters.video_pipeline.settings.video_dedup_enabled", False):
+            await VideoPipeline().analyze(b"video")
+        assert max(held) == sum(len(f) for f in frames)
+        assert budget.used == 0
+
+    def test_metrics_report_memory(self) -> None:
+        with patch("api.routers.metrics.job_runner.queue", None), TestClient(app) as client:
+            body = client.get("/metrics").json()
+        assert set(body["memory"]) >= {"capacity", "used", "peak", "waiting", "rejected"}
@@ -0,0 +1,102 @@
+"""Unit tests for perceptual hashing and the near-duplicate image index."""
+
+import io
+import threading
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from api.schemas import AnalysisResult
+from core.enums import MediaType, ModelUsed, Verdict
+from core.phash import BKTree, PerceptualIndex, hamming, phash
+from router.media_router import MediaRouter
+
+FAKE_RESULT = AnalysisResult(
+    verdict=Verdict.FAKE,
+    confidence=0.95,
+    model_used=ModelUsed.SIGHTENGINE,
+    explanation="test",
+    media_type=MediaType.IMAGE,
+)
+
+
+def _jpeg(seed: int, size: tuple[int, int] = (640, 360), quality: int = 90) -> bytes:
+    rng = np.random.default_rng(seed)
+    base = Image.fromarray((rng.random((36, 64, 3)) * 255).astype("uint8"))
+    buf = io.BytesIO()
+    base.resize(size, Image.Resampling.BICUBIC).save(buf, "JPEG", quality=quality)
+    return buf.getvalue()
+
+
+class TestPhash:
+    def test_recompressed_resized_copy_is_close(self):
+        original = phash(_jpeg(1))
+        recompressed = phash(_jpeg(1, size=(320, 180), quality=50))
+        assert hamming(original, recompressed) <= 6
+
+    def test_different_images_are_far(self):
+        assert hamming(phash(_jpeg(1)), phash(_jpeg(2))) > 12
+
+    def test_undecodable_returns_none(self):
+        assert phash(b"not an image") is None
+
+
+class TestBKTree:
+    def test_radius_search_nearest_first(self):
+        tree = BKTree()
+        for value in (0b0000, 0b0001, 0b0111, 0b1111_1111):
+            tree.add(value)
+        found = tree.search(0b0000, 3)
+        assert [v for _, v in found] == [0b0000, 0b0001, 0b0111]
+
+    def test_duplicates_not_counted(self):
+        tree = BKTree()
+        tree.add(5)
+        tree.add(5)
+        assert tree.size == 1
+
+
+class TestPerceptualIndex:
+    def test_near_duplicate_hit(self):
+        index = PerceptualIndex(max_distance=6)
+        index.add(phash(_jpeg(1)), FAKE_RESULT)
+        hit = index.lookup(phash(_jpeg(1, size=(320, 180), quality=50)))
+        assert hit is not None
+        assert hit.cached is True
+        assert index.lookup(phash(_jpeg(2))) is None
+
+    def test_eviction_bounds_entries(self):
+        index = PerceptualIndex(max_entries=2)
+        values = (0, 0xFFFF_FFFF, 0xFFFF_FFFF_0000_0000)  # pairwise ≥ 32 bits apart
+        for value in values:
+            index.add(value, FAKE_RESULT)
+        assert index.lookup(values[0]) is None
+        assert index.lookup(values[2]) is not None
+
+    @pytest.mark.asyncio
+    async def test_router_skips_provider_for_near_duplicate(self):
+        mock_analyze = AsyncMock(return_value=FAKE_RESULT)
+        router = MediaRouter(image_index=PerceptualIndex())
+        with patch("router.media_router.SightengineAdapter.analyze", mock_analyze):
+            await router.route(MediaType.IMAGE, _jpeg(3))
+            second = await router.route(MediaType.IMAGE, _jpeg(3, size=(480, 270), quality=60))
+        mock_analyze.assert_awaited_once()
+        assert second.cached is True
+
+    @pytest.mark.asyncio
+    async def test_router_hashes_off_the_event_loop(self):
+        threads = []
+
+        def recording_phash(data: bytes) -> int:
+            threads.append(threading.current_thread())
+            return phash(data)
+
+        router = MediaRouter(image_index=PerceptualIndex())
+        with (
+            patch("router.media_router.phash", recording_phash),
+            patch("router.media_router.SightengineAdapter.analyze", AsyncMock(return_value=FAKE_RESULT)),
+        ):
+            await router.route(MediaType.IMAGE, _jpeg(4))
+        assert threads and threads[0] is not threading.main_thread()
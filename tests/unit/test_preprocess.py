@@ -0,0 +1,73 @@
+"""Unit tests for provider-aware downscaling."""
+
+import io
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from adapters.preprocess import PreprocessProfile, downscale_image, profile_for
+
+
+def _jpeg(size: tuple[int, int]) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, (120, 30, 200)).save(buf, "JPEG", quality=95)
+    return buf.getvalue()
+
+
+class TestDownscale:
+    def test_large_image_fits_profile(self):
+        profile = PreprocessProfile("hf_image", 256, 90)
+        out = downscale_image(_jpeg((2000, 1000)), profile)
+        with Image.open(io.BytesIO(out)) as img:
+            assert max(img.size) == 256
+            assert img.size[0] / img.size[1] == pytest.approx(2.0, rel=0.02)
+
+    def test_small_image_untouched(self):
+        data = _jpeg((200, 100))
+        assert downscale_image(data, PreprocessProfile("hf_image", 256, 90)) is data
+
+    def test_undecodable_untouched(self):
+        assert downscale_image(b"not an image", PreprocessProfile("hf_image", 256, 90)) == b"not an image"
+
+    def test_profile_label_and_qscale(self):
+        profile = profile_for("sightengine")
+        assert profile.label == "sightengine:1024px/q85"
+        assert 2 <= profile.mjpeg_qscale <= 31
+        assert profile_for("sapling") is None
+
+    def test_video_filter_graph_scales_frames(self):
+        from adapters.video_pipeline import _frame_extraction_args
+
+        args = _frame_extraction_args(duration=10.0)
+        assert any("scale=min(iw" in arg for arg in args)
+        assert "-q:v" in args
+
+
+class TestAdapterPreprocessing:
+    @pytest.mark.asyncio
+    async def test_hf_image_uploads_downscaled_bytes(self, mock_http, http_response):
+        from adapters.hf_image import HFImageAdapter
+
+        client = mock_http(http_response(200, [{"label": "REAL", "score": 0.9}]))
+
+        original = _jpeg((1600, 1200))
+        with patch("httpx.AsyncClient", return_value=client):
+            result = await HFImageAdapter().analyze(original)
+
+        sent = client.post.call_args.kwargs["content"]
+        assert len(sent) < len(original)
+        assert result.preprocessing == "hf_image:256px/q90"
+
+    @pytest.mark.asyncio
+    async def test_untouched_image_reports_no_preprocessing(self, mock_http, http_response):
+        from adapters.hf_image import HFImageAdapter
+
+        client = mock_http(http_response(200, [{"label": "REAL", "score": 0.9}]))
+
+        original = _jpeg((200, 100))
+        with patch("httpx.AsyncClient", return_value=client):
+            result = await HFImageAdapter().analyze(original)
+
+        assert client.post.call_args.kwargs["content"] is original
+        assert result.preprocessing is None
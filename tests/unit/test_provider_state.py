@@ -0,0 +1,91 @@
+"""Unit tests for the shared provider quota / server-error state."""
+
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from adapters.sightengine import SightengineAdapter
+from api.main import app
+from core.exceptions import ExternalAPIError
+from core.provider_state import provider_states
+
+
+class TestProviderStates:
+    def test_quota_exhausted_until_retry_after(self) -> None:
+        provider_states.record_quota_exhausted("sightengine", retry_after=30)
+        assert not provider_states.usable("sightengine")
+        assert 29 <= provider_states.stats()["sightengine"]["quota_exhausted_for_s"] <= 30
+
+    def test_quota_expires(self) -> None:
+        provider_states.record_quota_exhausted("sightengine", retry_after=0)
+        assert provider_states.usable("sightengine")
+
+    def test_server_errors_mark_failing_after_threshold(self) -> None:
+        with patch("core.provider_state.settings.provider_server_error_threshold", 3):
+            provider_states.record_server_error("resemble")
+            provider_states.record_server_error("resemble")
+            assert provider_states.usable("resemble")
+            provider_states.record_server_error("resemble")
+            assert not provider_states.usable("resemble")
+            assert provider_states.get("resemble").failing_since is not None
+
+    def test_failing_provider_gets_another_chance_after_cooldown(self) -> None:
+        with patch("core.provider_state.settings.provider_server_error_cooldown_s", 0):
+            for _ in range(5):
+                provider_states.record_server_error("resemble")
+            assert provider_states.usable("resemble")
+
+    def test_success_clears_everything(self) -> None:
+        provider_states.record_quota_exhausted("sightengine", retry_after=60)
+        for _ in range(5):
+            provider_states.record_server_error("sightengine")
+        provider_states.record_success("sightengine")
+        assert provider_states.usable("sightengine")
+        assert provider_states.get("sightengine").failing_since is None
+
+
+class TestFedByAdapters:
+    async def test_final_429_marks_quota_exhausted(self, mock_http, http_response) -> None:
+        client = mock_http(http_response(429, headers={"retry-after": "45"}))
+        with patch("httpx.AsyncClient", return_value=client), \
+             patch("adapters.base.settings.retry_max_attempts", 1):
+            with pytest.raises(ExternalAPIError, match="rate_limit"):
+                await SightengineAdapter().analyze(b"image")
+        assert not provider_states.usable("sightengine")
+
+    async def test_retried_429_that_succeeds_is_not_exhaustion(self, mock_http, http_response) -> None:
+        client = mock_http(
+            http_response(429, headers={"retry-after": "0"}), http_response(200, {"status": "success"})
+        )
+        with patch("httpx.AsyncClient", return_value=client):
+            await SightengineAdapter().analyze(b"image")
+        assert provider_states.usable("sightengine")
+
+    async def test_transport_errors_count_as_server_errors(self, mock_http) -> None:
+        client = mock_http(httpx.ConnectError("down"))
+        with patch("httpx.AsyncClient", return_value=client):
+            with pytest.raises(httpx.ConnectError):
+                await SightengineAdapter().analyze(b"image")
+        assert provider_states.get("sightengine").server_errors == 1
+
+    async def test_hf_cold_start_is_not_a_failure(self, mock_http, http_response) -> None:
+        from adapters.hf_image import HFImageAdapter
+        from core.circuit_breaker import breakers
+
+        client = mock_http(
+            http_response(503, {"error": "Model dima806/deepfake is currently loading", "estimated_time": 20})
+        )
+        with patch("httpx.AsyncClient", return_value=client), patch("asyncio.sleep", new_callable=AsyncMock):
+            await HFImageAdapter().analyze(b"image")
+        assert client.post.await_count == 3
+        assert provider_states.get("hf_image").server_errors == 0
+        assert breakers.get("hf_image").stats()["failures"] == 0
+
+    def test_health_endpoint_reports_state(self) -> None:
+        provider_states.record_quota_exhausted("sapling", retry_after=60)
+        with TestClient(app) as client:
+            body = client.get("/health/providers").json()
+        assert body["sapling"]["usable"] is False
+        assert body["sapling"]["state"] == "closed"
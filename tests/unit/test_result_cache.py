@@ -0,0 +1,107 @@
+"""Unit tests for the content-addressed result cache."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from api.schemas import AnalysisResult
+from core.enums import MediaType, ModelUsed, Verdict
+from core.result_cache import ResultCache
+from router.media_router import MediaRouter
+
+FAKE_RESULT = AnalysisResult(
+    verdict=Verdict.FAKE,
+    confidence=0.95,
+    model_used=ModelUsed.SIGHTENGINE,
+    explanation="test",
+    media_type=MediaType.IMAGE,
+    processing_ms=900,
+)
+
+UNCERTAIN_RESULT = FAKE_RESULT.model_copy(update={"verdict": Verdict.UNCERTAIN, "confidence": 0.5})
+
+
+class TestResultCache:
+    def test_key_depends_on_media_type_and_version(self):
+        cache = ResultCache(version="1")
+        assert cache.key(MediaType.IMAGE, b"x") == cache.key(MediaType.IMAGE, b"x")
+        assert cache.key(MediaType.IMAGE, b"x") != cache.key(MediaType.VIDEO, b"x")
+        assert cache.key(MediaType.IMAGE, b"x") != ResultCache(version="2").key(MediaType.IMAGE, b"x")
+
+    @pytest.mark.parametrize(
+        "name, value",
+        [
+            ("video_dedup_enabled", False),
+            ("video_early_stop", False),
+            ("video_early_stop_z", 1.96),
+            ("hf_image_max_side", 512),
+            ("image_preprocess_enabled", False),
+            ("audio_ensemble_enabled", False),
+            ("audio_ensemble_weight_hf", 0.5),
+            ("audio_ensemble_decisive_fake", 0.95),
+            ("hedge_enabled", False),
+        ],
+    )
+    def test_version_tracks_result_settings(self, name, value):
+        before = ResultCache.from_settings().version
+        with patch(f"core.result_cache.settings.{name}", value):
+            assert ResultCache.from_settings().version != before
+
+    @pytest.mark.asyncio
+    async def test_hit_is_flagged_cached(self):
+        cache = ResultCache()
+        key = cache.key(MediaType.IMAGE, b"img")
+        await cache.put(key, FAKE_RESULT)
+        hit = await cache.get(key)
+        assert hit is not None
+        assert hit.cached is True
+        assert hit.processing_ms == 0
+        assert hit.verdict == Verdict.FAKE
+
+    @pytest.mark.asyncio
+    async def test_uncertain_not_stored(self):
+        cache = ResultCache()
+        key = cache.key(MediaType.IMAGE, b"img")
+        await cache.put(key, UNCERTAIN_RESULT)
+        assert await cache.get(key) is None
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        cache = ResultCache(max_entries=2)
+        keys = [cache.key(MediaType.IMAGE, bytes([i])) for i in range(3)]
+        for key in keys:
+            await cache.put(key, FAKE_RESULT)
+        assert await cache.get(keys[0]) is None
+        assert await cache.get(keys[2]) is not None
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_is_miss(self):
+        cache = ResultCache(ttl_s=-1)
+        key = cache.key(MediaType.IMAGE, b"img")
+        await cache.put(key, FAKE_RESULT)
+        assert await cache.get(key) is None
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_restart(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        first = ResultCache(disk_path=path)
+        key = first.key(MediaType.IMAGE, b"img")
+        await first.put(key, FAKE_RESULT)
+
+        second = ResultCache(disk_path=path)
+        hit = await second.get(key)
+        assert hit is not None
+        assert hit.cached is True
+
+
+class TestRouterCache:
+    @pytest.mark.asyncio
+    async def test_repeated_payload_skips_adapter(self):
+        mock_analyze = AsyncMock(return_value=FAKE_RESULT)
+        router = MediaRouter(cache=ResultCache())
+        with patch("router.media_router.SightengineAdapter.analyze", mock_analyze):
+            first = await router.route(MediaType.IMAGE, b"img_bytes")
+            second = await router.route(MediaType.IMAGE, b"img_bytes")
+        mock_analyze.assert_awaited_once()
+        assert first.cached is False
+        assert second.cached is True
@@ -0,0 +1,80 @@
+"""Unit tests for Retry-After-aware provider retries and the per-provider retry budget."""
+
+import email.utils
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from adapters.sightengine import SightengineAdapter
+from core.enums import Verdict
+from core.exceptions import ExternalAPIError
+from core.retry import RetryBudget, next_delay, parse_retry_after, retry_budgets
+
+SUCCESS = {"status": "success", "type": {"ai_generated": 0.95}}
+
+
+class TestParseRetryAfter:
+    def test_delta_seconds(self) -> None:
+        assert parse_retry_after("3") == 3.0
+
+    def test_http_date(self) -> None:
+        header = email.utils.formatdate(time.time() + 10, usegmt=True)
+        assert 8 <= parse_retry_after(header) <= 10
+
+    @pytest.mark.parametrize("value", [None, "", "soon"])
+    def test_missing_or_garbage(self, value) -> None:
+        assert parse_retry_after(value) is None
+
+
+class TestBackoff:
+    def test_decorrelated_jitter_stays_within_bounds(self) -> None:
+        delay = 0.2
+        for _ in range(50):
+            delay = next_delay(delay, 0.2, 2.0)
+            assert 0.2 <= delay <= 2.0
+
+    def test_budget_is_spent_and_refuses(self) -> None:
+        budget = RetryBudget(ratio=0.5, min_per_s=0.0, max_tokens=2)
+        assert budget.withdraw()
+        assert budget.withdraw()
+        assert not budget.withdraw()
+        budget.deposit()
+        budget.deposit()
+        assert budget.withdraw()
+        assert budget.stats()["denied"] == 1
+
+
+class TestAdapterRetries:
+    async def test_burst_succeeds_on_primary_after_retry_after(self, mock_http, http_response) -> None:
+        client = mock_http(http_response(429, headers={"retry-after": "1.5"}), http_response(200, SUCCESS))
+        sleep = AsyncMock()
+        with patch("httpx.AsyncClient", return_value=client), patch("adapters.base.asyncio.sleep", sleep):
+            result = await SightengineAdapter().analyze(b"image")
+        assert result.verdict == Verdict.FAKE
+        sleep.assert_awaited_once_with(1.5)
+
+    async def test_retry_after_beyond_wait_cap_fails_fast(self, mock_http, http_response) -> None:
+        client = mock_http(http_response(429, headers={"retry-after": "120"}))
+        sleep = AsyncMock()
+        with patch("httpx.AsyncClient", return_value=client), patch("adapters.base.asyncio.sleep", sleep):
+            with pytest.raises(ExternalAPIError, match="rate_limit"):
+                await SightengineAdapter().analyze(b"image")
+        sleep.assert_not_awaited()
+
+    async def test_spent_budget_stops_retries(self, mock_http, http_response) -> None:
+        retry_budgets.get("sightengine").tokens = 0
+        client = mock_http(http_response(429), http_response(200, SUCCESS))
+        with patch("httpx.AsyncClient", return_value=client), \
+             patch("adapters.base.asyncio.sleep", AsyncMock()), \
+             patch("core.retry.RetryBudget._refill"):
+            with pytest.raises(ExternalAPIError, match="rate_limit"):
+                await SightengineAdapter().analyze(b"image")
+        assert client.post.await_count == 1
+
+    async def test_server_errors_are_not_retried(self, mock_http, http_response) -> None:
+        client = mock_http(http_response(500))
+        with patch("httpx.AsyncClient", return_value=client):
+            with pytest.raises(ExternalAPIError, match="server_error"):
+                await SightengineAdapter().analyze(b"image")
+        assert client.post.await_count == 1
@@ -129,14 +129,15 @@ class TestRoute:
     @pytest.mark.asyncio
     async def test_audio_routes_to_resemble(self):
         mock_analyze = AsyncMock(return_value=REAL_RESULT)
-        with patch("router.media_router.ResembleAdapter.analyze", mock_analyze):
+        with patch("router.media_router.ResembleAdapter.analyze", mock_analyze), \
+             patch("router.media_router.HFAudioAdapter.analyze", AsyncMock(return_value=UNCERTAIN_RESULT)):
             result = await MediaRouter().route(MediaType.AUDIO, b"audio_bytes")
         mock_analyze.assert_awaited_once()
         assert result.verdict == Verdict.REAL
 
     @pytest.mark.asyncio
     async def test_audio_calls_hf_fallback_when_resemble_uncertain(self):
-        """When Resemble returns UNCERTAIN, HFAudio must be invoked as fallback."""
+        """When Resemble returns UNCERTAIN, HFAudio's verdict decides."""
         hf_result = AnalysisResult(
             verdict=Verdict.FAKE,
             confidence=0.80,
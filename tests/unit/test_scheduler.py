@@ -0,0 +1,171 @@
+"""Unit tests for the weighted fair scheduler in front of MediaRouter.route."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.schemas import AnalysisResult
+from core.bulkhead import BulkheadRegistry
+from core.enums import MediaType, ModelUsed, Priority, Verdict
+from core.scheduler import FairScheduler, priority_for
+from router.media_router import MediaRouter
+
+FAKE_RESULT = AnalysisResult(
+    verdict=Verdict.FAKE,
+    confidence=0.9,
+    model_used=ModelUsed.SIGHTENGINE,
+    explanation="test",
+    media_type=MediaType.IMAGE,
+)
+
+
+async def _job(scheduler, order, name, priority, user_id, media_type=MediaType.IMAGE, hold=0.01):
+    async with scheduler.slot(priority, user_id, media_type):
+        order.append(name)
+        await asyncio.sleep(hold)
+
+
+class TestFairScheduler:
+    async def test_heavy_user_does_not_block_others(self):
+        scheduler = FairScheduler(max_concurrency=1, costs={MediaType.VIDEO: 4.0})
+        order: list[str] = []
+        tasks = [
+            asyncio.create_task(_job(scheduler, order, f"video{i}", Priority.FREE, 1, MediaType.VIDEO))
+            for i in range(5)
+        ]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(_job(scheduler, order, "photo", Priority.FREE, 2)))
+        await asyncio.gather(*tasks)
+        assert order.index("photo") == 1  # right after the video already running
+
+    async def test_premium_lane_is_served_first(self):
+        scheduler = FairScheduler(max_concurrency=1)
+        order: list[str] = []
+        blocker = asyncio.create_task(_job(scheduler, order, "running", Priority.FREE, 0))
+        await asyncio.sleep(0)
+        tasks = [
+            asyncio.create_task(_job(scheduler, order, "batch", Priority.BATCH, 1)),
+            asyncio.create_task(_job(scheduler, order, "free", Priority.FREE, 2)),
+            asyncio.create_task(_job(scheduler, order, "premium", Priority.PREMIUM, 3)),
+        ]
+        await asyncio.gather(blocker, *tasks)
+        assert order == ["running", "premium", "free", "batch"]
+
+    async def test_per_user_inflight_cap(self):
+        scheduler = FairScheduler(max_concurrency=4, max_inflight_per_flow=2)
+        order: list[str] = []
+        tasks = [asyncio.create_task(_job(scheduler, order, f"v{i}", Priority.FREE, 1, hold=0.05)) for i in range(4)]
+        await asyncio.sleep(0.01)
+        assert scheduler.stats()["running"] == 2
+        assert scheduler.stats()["queued"]["free"] == 2
+        await asyncio.gather(*tasks)
+
+    async def test_cancelled_waiter_leaves_queue(self):
+        scheduler = FairScheduler(max_concurrency=1)
+        order: list[str] = []
+        running = asyncio.create_task(_job(scheduler, order, "a", Priority.FREE, 1, hold=0.05))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(_job(scheduler, order, "b", Priority.FREE, 2))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(running, waiting, return_exceptions=True)
+        stats = scheduler.stats()
+        assert order == ["a"]
+        assert stats["running"] == 0
+        assert stats["queued"]["free"] == 0
+
+    async def test_photo_latency_stays_flat_under_video_backlog(self):
+        scheduler = FairScheduler(max_concurrency=2, max_inflight_per_flow=1, costs={MediaType.VIDEO: 4.0})
+        order: list[str] = []
+        videos = [
+            asyncio.create_task(_job(scheduler, order, f"v{u}{i}", Priority.BATCH, u, MediaType.VIDEO, hold=0.05))
+            for u in (1, 2)
+            for i in range(5)
+        ]
+        await asyncio.sleep(0.01)
+        started = time.monotonic()
+        await _job(scheduler, order, "photo", Priority.FREE, 3)
+        assert time.monotonic() - started < 0.1  # at most one video turnover
+        for task in videos:
+            task.cancel()
+        await asyncio.gather(*videos, return_exceptions=True)
+        assert scheduler.stats()["wait_ms"]["free"]["served"] == 1
+
+    def test_premium_users_from_settings(self):
+        with patch("core.scheduler.settings.premium_user_ids", [42]):
+            assert priority_for(42, Priority.BATCH) == Priority.PREMIUM
+            assert priority_for(7, Priority.BATCH) == Priority.BATCH
+
+
+class TestSchedulerIntegration:
+    async def test_route_runs_inside_a_slot(self):
+        scheduler = FairScheduler(max_concurrency=1)
+        router = MediaRouter(scheduler=scheduler)
+
+        async def _analyze(_data):
+            assert scheduler.stats()["running"] == 1
+            return FAKE_RESULT
+
+        with patch("router.media_router.SightengineAdapter.analyze", AsyncMock(side_effect=_analyze)):
+            result = await router.route(MediaType.IMAGE, b"img", "", Priority.FREE, 1)
+        assert result.verdict == Verdict.FAKE
+        assert scheduler.stats()["running"] == 0
+
+    async def test_user_cap_is_waited_out_before_the_bulkhead(self):
+        scheduler = FairScheduler(max_concurrency=8, max_inflight_per_flow=2)
+        router = MediaRouter(scheduler=scheduler)
+        release = asyncio.Event()
+        started: list[int] = []
+
+        async def _analyze(_data):
+            started.append(len(started))
+            await release.wait()
+            return FAKE_RESULT
+
+        with patch("router.media_router.VideoPipeline.analyze", AsyncMock(side_effect=_analyze)), \
+             patch("core.bulkhead.settings.bulkhead_concurrency", {"video": 3}), \
+             patch("router.media_router.bulkheads", BulkheadRegistry()) as registry:
+            batch = [
+                asyncio.create_task(router.route(MediaType.VIDEO, b"v%d" % i, "", Priority.BATCH, 1))
+                for i in range(4)
+            ]
+            await asyncio.sleep(0.01)
+            assert scheduler.stats()["held_by_user_cap"] == 2
+            assert registry.stats()["video"]["active"] == 2  # the rest of the batch is not in the pool
+            other = asyncio.create_task(router.route(MediaType.VIDEO, b"other", "", Priority.FREE, 2))
+            await asyncio.sleep(0.01)
+            assert len(started) == 3  # another user's video runs at once
+            release.set()
+            await asyncio.gather(*batch, other)
+        assert scheduler.stats()["held_by_user_cap"] == 0
+
+    async def test_bigcheck_items_are_not_held_to_the_user_cap(self):
+        from api.routers.bigcheck import bigcheck_items, run_bigcheck
+
+        scheduler = FairScheduler(max_concurrency=16, max_inflight_per_flow=2)
+        running = peak = 0
+
+        async def _analyze(_data):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+            return FAKE_RESULT
+
+        uploads = [(f"{i}.jpg", "image/jpeg", b"img%d" % i) for i in range(8)]
+        with patch("api.routers.bigcheck.media_router", MediaRouter(scheduler=scheduler)), \
+             patch("api.routers.bigcheck.settings.bigcheck_item_concurrency", 4), \
+             patch("router.media_router.SightengineAdapter.analyze", AsyncMock(side_effect=_analyze)):
+            response = await run_bigcheck(bigcheck_items(uploads, user_id=1))
+        assert response.total_files == 8
+        assert peak == 4  # the batch's own limit, not scheduler_max_inflight_per_user
+        assert scheduler.stats()["held_by_user_cap"] == 0
+
+    def test_metrics_endpoint(self):
+        with TestClient(app) as client:
+            body = client.get("/metrics").json()
+        assert set(body["scheduler"]["queued"]) == {"premium", "free", "batch"}
@@ -0,0 +1,354 @@
+"""Unit tests for VideoPipeline — ffmpeg and providers are mocked."""
+
+import asyncio
+import io
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from api.schemas import AnalysisResult
+from core.enums import MediaType, ModelUsed, Verdict
+from core.exceptions import ExternalAPIError
+
+
+def _frame(i: int) -> bytes:
+    return b"\xff\xd8" + f"frame-{i}".encode() + b"\xff\xd9"
+
+
+def _jpeg_frame(seed: int) -> bytes:
+    rng = np.random.default_rng(seed)
+    img = Image.fromarray((rng.random((18, 32, 3)) * 255).astype("uint8")).resize((320, 180))
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=85)
+    return buf.getvalue()
+
+
+def _se_result(score: float) -> AnalysisResult:
+    verdict = Verdict.FAKE if score >= 0.75 else Verdict.REAL if score <= 0.35 else Verdict.UNCERTAIN
+    return AnalysisResult(
+        verdict=verdict,
+        confidence=score,
+        model_used=ModelUsed.SIGHTENGINE,
+        explanation="test",
+        media_type=MediaType.IMAGE,
+    )
+
+
+def _chunked_stream(payload: bytes, size: int):
+    async def _stream(*args, **kwargs):
+        for i in range(0, len(payload), size):
+            yield payload[i : i + size]
+
+    return _stream
+
+
+def _frames_source(frames: list[bytes]):
+    async def _iter(_data: bytes, _duration: float = 0.0):
+        for frame in frames:
+            yield frame
+
+    return _iter
+
+
+class TestIterFrames:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 1024])
+    async def test_splits_frames_across_chunk_boundaries(self, chunk_size):
+        from adapters.video_pipeline import _iter_frames
+
+        payload = b"".join(_frame(i) for i in range(5))
+        with patch("adapters.video_pipeline.stream_media_tool", _chunked_stream(payload, chunk_size)):
+            frames = [f async for f in _iter_frames(b"video")]
+        assert frames == [_frame(i) for i in range(5)]
+
+
+class TestSamplingModes:
+    @pytest.mark.parametrize(
+        ("mode", "expected"),
+        [
+            ("fps", "fps=fps=1"),
+            ("keyframes", "nokey"),
+            ("scene", "gt(scene\\,0.3)"),
+            ("budget", "fps=fps=16/32.000"),
+        ],
+    )
+    def test_mode_builds_matching_command(self, mode, expected):
+        from adapters.video_pipeline import _frame_extraction_args
+
+        with patch("adapters.video_pipeline.settings.video_sampling_mode", mode):
+            args = _frame_extraction_args(duration=32.0)
+        assert any(expected in arg for arg in args)
+        assert "image2pipe" in args
+
+    def test_budget_caps_frame_count(self):
+        from adapters.video_pipeline import _frame_extraction_args
+
+        with patch("adapters.video_pipeline.settings.video_sampling_mode", "budget"), \
+             patch("adapters.video_pipeline.settings.video_frame_budget", 8):
+            args = _frame_extraction_args(duration=60.0)
+        assert args[args.index("-frames:v") + 1] == "8"
+
+    @pytest.mark.parametrize("mode", ["keyframes", "scene"])
+    def test_selective_modes_spread_the_cap_over_the_clip(self, mode):
+        from adapters.video_pipeline import _frame_extraction_args
+
+        with patch("adapters.video_pipeline.settings.video_sampling_mode", mode), \
+             patch("adapters.video_pipeline.settings.max_video_duration_seconds", 10):
+            spread = _frame_extraction_args(duration=40.0)
+            unknown = _frame_extraction_args(duration=0.0)
+        assert spread[spread.index("-frames:v") + 1] == "10"
+        assert any("gte(t-prev_selected_t\\,4.000)" in arg for arg in spread)
+        assert not any("prev_selected_t" in arg for arg in unknown)
+
+
+class TestVideoPipeline:
+    @pytest.mark.asyncio
+    async def test_all_fake_frames_give_fake_verdict(self):
+        from adapters.video_pipeline import VideoPipeline
+
+        frames = [_frame(i) for i in range(6)]
+        se_analyze = AsyncMock(return_value=_se_result(0.95))
+        with patch("adapters.video_pipeline._get_duration", AsyncMock(return_value=6.0)), \
+             patch("adapters.video_pipeline._iter_frames", _frames_source(frames)), \
+             patch("adapters.sightengine.SightengineAdapter.analyze", se_analyze):
+            result = await VideoPipeline().analyze(b"video")
+        assert result.verdict == Verdict.FAKE
+        assert result.model_used == ModelUsed.SIGHTENGINE_VIDEO
+
+    @pytest.mark.asyncio
+    async def test_first_frame_is_scored_once_without_probe(self):
+        from adapters.video_pipeline import VideoPipeline
+
+        frames = [_frame(i) for i in range(4)]
+        se_analyze = AsyncMock(return_value=_se_result(0.95))
+        with patch("adapters.video_pipeline._get_duration", AsyncMock(return_value=4.0)), \
+             patch("adapters.video_pipeline._iter_frames", _frames_source(frames)), \
+             patch("adapters.sightengine.SightengineAdapter.analyze", se_analyze), \
+             patch("adapters.video_pipeline.settings.video_early_stop", False), \
+             patch("adapters.video_pipeline.settings.video_dedup_enabled", False):
+            await VideoPipeline().analyze(b"video")
+        assert [call.args[-1] for call in se_analyze.await_args_list] == frames
+
+    @pytest.mark.asyncio
+    async def test_exhausted_quota_goes_straight_to_hf(self):
+        from adapters.video_pipeline import VideoPipeline
+        from core.provider_state import provider_states
+
+        provider_states.record_quota_exhausted("sightengine", retry_after=60)
+        se_analyze = AsyncMock()
+        hf_analyze = AsyncMock(return_value=_se_result(0.95))
+        with patch("adapters.video_pipeline._get_duration", AsyncMock(return_value=4.0)), \
+             patch("adapters.video_pipeline._iter_frames", _frames_source([_frame(i) for i in range(4)])), \
+             patch("adapters.sightengine.SightengineAdapter.analyze", se_analyze), \
+             patch("adapters.hf_image.HFImageAdapter.analyze", hf_analyze):
+            result = await VideoPipeline().analyze(b"video")
+        se_analyze.assert_not_awaited()
+        assert result.model_used == ModelUsed.HF_IMAGE
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_frame_moves_video_to_hf(self):
+        from adapters.video_pipeline import VideoPipeline
+
+        frames = [_frame(i) for i in range(8)]
+        se_analyze = AsyncMock(side_effect=[_se_result(0.9)] + [ExternalAPIError("sightengine", "rate_limit")] * 7)
+        hf_analyze = AsyncMock(return_value=_se_result(0.9))
+        with patch("adapters.video_pipeline._get_duration", AsyncMock(return_value=8.0)), \
+             patch("adapters.video_pipeline._iter_frames", _frames_source(frames)), \
+             patch("adapters.sightengine.SightengineAdapter.analyze", se_analyze), \
+             patch("adapters.hf_image.HFImageAdapter.analyze", hf_analyze), \
+             patch("adapters.video_pipeline.settings.video_early_stop", False), \
+             patch("adapters.video_pipeline.settings.video_dedup_enabled", False):
+            result = await VideoPipeline().analyze(b"video")
+
+        assert result.model_used == ModelUsed.HF_IMAGE
+        assert result.frames_analyzed == 8
+        assert hf_analyze.await_count == 7  # every frame Sightengine didn't score, rate-limited ones included
+
+    @pytest.mark.asyncio
+    async def test_scores_of_two_providers_are_not_mixed(self):
+        from adapters.video_pipeline import VideoPipeline
+
+        frames = [_frame(i) for i in range(12)]
+        se_analyze = AsyncMock(
+            side_effect=[_se_result(0.95)] * 8 + [ExternalAPIError("sightengine", "rate_limit")] * 4
+        )
+        hf_analyze = AsyncMock(return_value=_se_result(0.1))  # another model's scale
+        with patch("adapters.video_pipeline._get_duration", AsyncMock(return_value=12.0)), \
+             patch("adapters.video_pipeline._iter_frames", _frames_source(frames)), \
+             patch("adapters.sightengine.SightengineAdapter.analyze", se_analyze), \
+             patch("adapters.hf_image.HFImageAdapter.analyze", hf_analyze), \
+             patch("adapters.video_pipeline.settings.video_early_stop", False), \
+             patch("adapters.video_pipeline.settings.video_dedup_enabled", False):
+            result = await VideoPipeline().analyze(b"video")
+
+        assert result.model_used == ModelUsed.SIGHTENGINE_VIDEO
+        assert result.verdict == Verdict.FAKE
+        assert result.confidence == 0.95
+        assert "не учтены: 4" in result.explanation
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(("max_side", "label"), [(1024, None), (320, "video:sightengine:320px/q85")])
+    async def test_preprocessing_label_only_when_frames_shrink(self, max_side, label):
+        from adapters.video_pipeline import VideoPipeline
+
+        frames = [_jpeg_frame(i) for i in range(3)]  # 320x180 out of the filter graph
+        with patch("adapters.video_pipeline._get_duration", AsyncMock(return_value=3.0)), \
+             patch("adapters.video_pipeline._iter_frames", _frames_source(frames)), \
+             patch("adapters.sightengine.SightengineAdapter.analyze", AsyncMock(return_value=_se_result(0.95))), \
+             patch("adapters.preprocess.settings.sightengine_max_side", max_side):
+            result = await VideoPipeline().analyze(b"video")
+        assert result.preprocessing == label
+
+    @pytest.mark.asyncio
+    async def test_no_frames_returns_uncertain(self):
+        from adapters.video_pipeline import VideoPipeline
+
+        with patch("adapters.video_pipeline._get_duration", AsyncMock(return_value=6.0)), \
+             patch("adapters.video_pipeline._iter_frames", _frames_source([])):
+            result = await VideoPipeline().analyze(b"video")
+        assert result.verdict == Verdict.UNCERTAIN
+
+
+class TestEarlyStop:
+    def test_coarse_to_fine_covers_every_frame_once(self):
+        from adapters.video_pipeline import _coarse_to_fine_order
+
+        order = _coarse_to_fine_order(37)
+        assert sorted(order) == list(range(37))
+        assert order[:3] == [0, 18, 9]
+
+    def test_settled_by_interval_after_confident_fakes(self):
+        from adapters.video_pipeline import _settled_verdict
+
+        assert _settled_verdict(fake=10, scored=10, remaining=50, z=2.58, min_frames=8) == Verdict.FAKE
+
+    def test_not_settled_when_mixed(self):
+        from adapters.video_pipeline import _settled_verdict
+
+        assert _settled_verdict(fake=3, scored=10, remaining=50, z=2.58, min_frames=8) is None
+
+    def test_exact_bound_settles_without_min_frames(self):
+        from adapters.video_pipeline import _settled_verdict
+
+        # 50 of 60 already fake: no outcome of the other 10 can drop below 40 %
+        assert _settled_verdict(fake=50, scored=50, remaining=10, z=2.58, min_frames=100) == Verdict.FAKE
+
+    @pytest.mark.asyncio
+    async def test_early_stop_skips_frames(self):
+        from adapters.video_pipeline import VideoPipeline
+
+        frames = [_frame(i) for i in range(60)]
+        se_analyze = AsyncMock(return_value=_se_result(0.97))
+        with patch("adapters.video_pipeline._get_duration", AsyncMock(return_value=60.0)), \
+             patch("adapters.video_pipeline._iter_frames", _frames_source(frames)), \
+             patch("adapters.sightengine.SightengineAdapter.analyze", se_analyze), \
+             patch("adapters.video_pipeline.settings.video_early_stop", True):
+            result = await VideoPipeline().analyze(b"video")
+        assert result.verdict == Verdict.FAKE
+        assert result.frames_skipped > 0
+        assert result.frames_analyzed + result.frames_skipped == 60
+        assert se_analyze.await_count < 20
+
+    @pytest.mark.asyncio
+    async def test_scores_while_decoding_and_stops_decoder(self):
+        from adapters.video_pipeline import VideoPipeline
+
+        decoded: list[int] = []
+        decoded_at_first_score: list[int] = []
+
+        async def _slow_frames(_data: bytes, _duration: float = 0.0):
+            for i in range(60):
+                await asyncio.sleep(0.002)
+                decoded.append(i)
+                yield _frame(i)
+
+        async def _analyze(frame: bytes) -> AnalysisResult:
+            decoded_at_first_score.append(len(decoded))
+            return _se_result(0.97)
+
+        with patch("adapters.video_pipeline._get_duration", AsyncMock(return_value=60.0)), \
+             patch("adapters.video_pipeline._iter_frames", _slow_frames), \
+             patch("adapters.sightengine.SightengineAdapter.analyze", AsyncMock(side_effect=_analyze)), \
+             patch("adapters.video_pipeline.settings.video_early_stop", True):
+            result = await VideoPipeline().analyze(b"video")
+        assert decoded_at_first_score[0] < 60
+        assert len(decoded) < 60  # ffmpeg was stopped along with the scoring
+        assert result.verdict == Verdict.FAKE
+        assert result.frames_analyzed + result.frames_skipped == 60
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(("mode", "duration"), [("fps", 59.6), ("keyframes", 600.0)])
+    async def test_skipped_counts_only_real_frames(self, mode, duration):
+        from adapters.video_pipeline import VideoPipeline
+
+        decoded: list[int] = []
+
+        async def _slow_frames(_data: bytes, _duration: float = 0.0):
+            for i in range(60):
+                await asyncio.sleep(0.002)
+                decoded.append(i)
+                yield _frame(i)
+
+        with patch("adapters.video_pipeline._get_duration", AsyncMock(return_value=duration)), \
+             patch("adapters.video_pipeline._iter_frames", _slow_frames), \
+             patch("adapters.sightengine.SightengineAdapter.analyze", AsyncMock(return_value=_se_result(0.97))), \
+             patch("adapters.video_pipeline.settings.max_video_duration_seconds", 600), \
+             patch("adapters.video_pipeline.settings.video_sampling_mode", mode), \
+             patch("adapters.video_pipeline.settings.video_early_stop", True):
+            result = await VideoPipeline().analyze(b"video")
+        assert len(decoded) < 60  # stopped early
+        if mode == "fps":  # ffmpeg emits round(59.6 * 1) frames, not the 61 of -frames:v
+            assert result.frames_analyzed + result.frames_skipped == 60
+        else:  # key frames not decoded yet are unknown, not frame_cap
+            assert result.frames_analyzed + result.frames_skipped == len(decoded)
+
+    @pytest.mark.asyncio
+    async def test_disabled_scores_every_frame(self):
+        from adapters.video_pipeline import VideoPipeline
+
+        frames = [_frame(i) for i in range(12)]
+        se_analyze = AsyncMock(return_value=_se_result(0.97))
+        with patch("adapters.video_pipeline._get_duration", AsyncMock(return_value=12.0)), \
+             patch("adapters.video_pipeline._iter_frames", _frames_source(frames)), \
+             patch("adapters.sightengine.SightengineAdapter.analyze", se_analyze), \
+             patch("adapters.video_pipeline.settings.video_early_stop", False):
+            result = await VideoPipeline().analyze(b"video")
+        assert result.frames_analyzed == 12
+        assert result.frames_skipped == 0
+
+
+class TestFrameDedup:
+    @pytest.mark.asyncio
+    async def test_static_runs_scored_once_and_weighted(self):
+        from adapters.video_pipeline import VideoPipeline
+
+        scene_a, scene_b = _jpeg_frame(1), _jpeg_frame(2)
+        frames = [scene_a] * 9 + [scene_b] * 3
+        scores = {scene_a: _se_result(0.95), scene_b: _se_result(0.10)}
+        se_analyze = AsyncMock(side_effect=lambda frame: scores[frame])
+        with patch("adapters.video_pipeline._get_duration", AsyncMock(return_value=12.0)), \
+             patch("adapters.video_pipeline._iter_frames", _frames_source(frames)), \
+             patch("adapters.sightengine.SightengineAdapter.analyze", se_analyze), \
+             patch("adapters.video_pipeline.settings.video_early_stop", False):
+            result = await VideoPipeline().analyze(b"video")
+
+        assert result.frames_analyzed == 2
+        assert se_analyze.await_count == 2  # one per cluster, no probe call
+        assert result.verdict == Verdict.FAKE  # 9 of 12 frames weighted fake
+        assert "12 кадров" in result.explanation
+
+    @pytest.mark.asyncio
+    async def test_dedup_disabled_scores_every_frame(self):
+        from adapters.video_pipeline import VideoPipeline
+
+        frames = [_jpeg_frame(1)] * 5
+        se_analyze = AsyncMock(return_value=_se_result(0.95))
+        with patch("adapters.video_pipeline._get_duration", AsyncMock(return_value=5.0)), \
+             patch("adapters.video_pipeline._iter_frames", _frames_source(frames)), \
+             patch("adapters.sightengine.SightengineAdapter.analyze", se_analyze), \
+             patch("adapters.video_pipeline.settings.video_early_stop", False), \
+             patch("adapters.video_pipeline.settings.video_dedup_enabled", False):
+            result = await VideoPipeline().analyze(b"video")
+        assert result.frames_analyzed == 5
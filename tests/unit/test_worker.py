@@ -0,0 +1,174 @@
+"""Unit tests for the lease-based task queue and the worker tier."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from api.routers.jobs import TaskPayload
+from api.schemas import AnalysisResult, JobInfo
+from core.enums import JobStatus, MediaType, ModelUsed, Verdict
+from core.jobs import MemoryJobStore
+from core.task_queue import LocalRedis, RedisTaskQueue, SQLiteTaskQueue
+from worker.main import Worker
+
+FAKE_RESULT = AnalysisResult(
+    verdict=Verdict.FAKE,
+    confidence=0.9,
+    model_used=ModelUsed.SIGHTENGINE,
+    explanation="test",
+    media_type=MediaType.IMAGE,
+)
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def queue(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteTaskQueue(str(tmp_path / "tasks.sqlite3"))
+    return RedisTaskQueue(LocalRedis())
+
+
+def _payload() -> bytes:
+    return TaskPayload(kind="analyze", media_type=MediaType.IMAGE, uploads=[("a.jpg", "image/jpeg", b"\xff\xd8")]).to_bytes()
+
+
+async def _job(store: MemoryJobStore, job_id: str) -> None:
+    await store.create(JobInfo(job_id=job_id, kind="analyze", status=JobStatus.QUEUED, created_at=time.time()))
+
+
+class TestTaskQueue:
+    async def test_lease_is_exclusive_and_complete_removes(self, queue):
+        await queue.enqueue("t1", b"payload")
+        lease = await queue.lease(30)
+        assert (lease.task_id, lease.payload, lease.attempt) == ("t1", b"payload", 1)
+        assert await queue.lease(30) is None
+        assert await queue.complete(lease) is True
+        assert await queue.depth() == 0
+
+    async def test_expired_lease_is_redelivered_and_stale_holder_rejected(self, queue):
+        await queue.enqueue("t1", b"payload")
+        first = await queue.lease(0.05)
+        await asyncio.sleep(0.1)
+        second = await queue.lease(30)
+        assert second.task_id == "t1"
+        assert second.attempt == 2
+        assert await queue.heartbeat(first, 30) is False
+        assert await queue.complete(first) is False
+        assert await queue.complete(second) is True
+
+    async def test_release_makes_task_visible_again(self, queue):
+        await queue.enqueue("t1", b"payload")
+        lease = await queue.lease(30)
+        await queue.release(lease)
+        again = await queue.lease(30)
+        assert again is not None and again.task_id == "t1"
+
+    async def test_fifo_order(self, queue):
+        for task_id in ("a", "b", "c"):
+            await queue.enqueue(task_id, b"x")
+        assert [(await queue.lease(30)).task_id for _ in range(3)] == ["a", "b", "c"]
+
+
+class TestRedisTaskQueue:
+    async def test_task_claimed_by_a_worker_that_died_before_leasing_is_recovered(self):
+        client = LocalRedis()
+        queue = RedisTaskQueue(client)
+        await queue.enqueue("t1", b"payload")
+        # the claimer died right after LMOVE, before recording its lease
+        await client.lmove(RedisTaskQueue.PENDING, RedisTaskQueue.PROCESSING, "LEFT", "RIGHT")
+        assert await queue.lease(0.05) is None  # first sighting only starts the grace period
+        assert await queue.depth() == 1
+        await asyncio.sleep(0.1)
+        lease = await queue.lease(0.05)
+        assert (lease.task_id, lease.payload) == ("t1", b"payload")
+        assert await queue.complete(lease) is True
+        assert await queue.depth() == 0
+
+
+class TestTaskPayload:
+    def test_binary_uploads_round_trip(self):
+        payload = TaskPayload(kind="bigcheck", text_content="текст", uploads=[("a.jpg", "image/jpeg", bytes(range(256)))])
+        assert TaskPayload.from_bytes(payload.to_bytes()) == payload
+
+
+class TestWorker:
+    async def _run_until(self, worker: Worker, condition, timeout: float = 2.0) -> None:
+        stop = asyncio.Event()
+        runner = asyncio.create_task(worker.run(stop))
+        deadline = time.monotonic() + timeout
+        while not await condition() and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        stop.set()
+        await runner
+
+    async def test_runs_task_and_writes_result_back(self, queue):
+        store = MemoryJobStore()
+        await _job(store, "j1")
+        await queue.enqueue("j1", _payload())
+        worker = Worker(queue, store, poll_interval_s=0.01)
+
+        async def _done():
+            return (await store.get("j1")).status == JobStatus.SUCCEEDED
+
+        with patch("worker.main.run_task", AsyncMock(return_value=FAKE_RESULT)):
+            await self._run_until(worker, _done)
+
+        job = await store.get("j1")
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.result["verdict"] == "FAKE"
+        assert await queue.depth() == 0
+
+    async def test_task_from_crashed_worker_is_retried(self, queue):
+        store = MemoryJobStore()
+        await _job(store, "j1")
+        await queue.enqueue("j1", _payload())
+        await queue.lease(0.05)  # a worker took it and died without completing
+        await asyncio.sleep(0.1)
+        worker = Worker(queue, store, poll_interval_s=0.01)
+
+        async def _done():
+            return (await store.get("j1")).status == JobStatus.SUCCEEDED
+
+        with patch("worker.main.run_task", AsyncMock(return_value=FAKE_RESULT)):
+            await self._run_until(worker, _done)
+        assert (await store.get("j1")).status == JobStatus.SUCCEEDED
+
+    async def test_gives_up_after_max_attempts(self, queue):
+        store = MemoryJobStore()
+        await _job(store, "j1")
+        await queue.enqueue("j1", _payload())
+        for _ in range(2):
+            await queue.lease(0.01)
+            await asyncio.sleep(0.05)
+        worker = Worker(queue, store, poll_interval_s=0.01, max_attempts=2)
+        run_task = AsyncMock(return_value=FAKE_RESULT)
+
+        async def _done():
+            return (await store.get("j1")).status == JobStatus.FAILED
+
+        with patch("worker.main.run_task", run_task):
+            await self._run_until(worker, _done)
+        run_task.assert_not_awaited()
+        assert await queue.depth() == 0
+
+    async def test_shutdown_hands_lease_back(self, queue):
+        store = MemoryJobStore()
+        await _job(store, "j1")
+        await queue.enqueue("j1", _payload())
+        worker = Worker(queue, store, poll_interval_s=0.01)
+        started = asyncio.Event()
+
+        async def _slow(_payload):
+            started.set()
+            await asyncio.sleep(10)
+
+        async def _started():
+            return started.is_set()
+
+        with patch("worker.main.run_task", _slow):
+            await self._run_until(worker, _started)
+
+        assert (await store.get("j1")).status == JobStatus.QUEUED
+        lease = await queue.lease(30)
+        assert lease is not None and lease.task_id == "j1"
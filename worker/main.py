@@ -0,0 +1,145 @@
+"""Worker entry point — runs queued analysis jobs (``job_executor=queue``).
+
+Start one or more of these next to the API: ``python -m worker.main``. They
+share the task queue and the job store (``task_queue_*`` / ``job_store_*``
+settings) with the API, which only enqueues and serves job status.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import signal
+import socket
+import time
+
+from adapters.http_client import http_clients
+from api.routers.jobs import TaskPayload, run_task
+from core.config import settings
+from core.enums import JobStatus
+from core.jobs import JobStore, create_job_store, execute_job, notify_webhook
+from core.task_queue import Lease, TaskQueue, create_task_queue
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """Leases tasks and runs up to ``concurrency`` of them, heartbeating each lease."""
+
+    def __init__(
+        self,
+        queue: TaskQueue,
+        store: JobStore,
+        concurrency: int = 2,
+        lease_s: float = 60.0,
+        poll_interval_s: float = 0.5,
+        max_attempts: int = 3,
+    ) -> None:
+        self.queue = queue
+        self.store = store
+        self.concurrency = concurrency
+        self.lease_s = lease_s
+        self.poll_interval_s = poll_interval_s
+        self.max_attempts = max_attempts
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: set[asyncio.Task] = set()
+
+    async def run(self, stop: asyncio.Event) -> None:
+        slots = asyncio.Semaphore(self.concurrency)
+        logger.info("Worker %s started (concurrency=%s)", self.name, self.concurrency)
+        try:
+            while not stop.is_set():
+                await slots.acquire()
+                try:
+                    lease = await self.queue.lease(self.lease_s)
+                except Exception as exc:  # noqa: BLE001
+                    logger.error("Cannot lease from task queue: %s", exc)
+                    lease = None
+                if lease is None:
+                    slots.release()
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(stop.wait(), self.poll_interval_s)
+                    continue
+                task = asyncio.create_task(self._process(lease), name=f"task-{lease.task_id}")
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+                task.add_done_callback(lambda _: slots.release())
+        finally:
+            await self.shutdown()
+
+    async def shutdown(self) -> None:
+        """Stop in-flight tasks and hand their leases back so another worker picks them up."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _process(self, lease: Lease) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(lease))
+        try:
+            await self._execute(lease)
+            if not await self.queue.complete(lease):
+                logger.warning("Lease on task %s was lost before completion", lease.task_id)
+        except asyncio.CancelledError:
+            job = await self.store.get(lease.task_id)
+            if job is not None and job.status == JobStatus.RUNNING:
+                await self.store.save(job.model_copy(update={"status": JobStatus.QUEUED}))
+            await self.queue.release(lease)
+            raise
+        except Exception as exc:  # noqa: BLE001
+            # Store/queue trouble: leave the lease to expire so the task is retried.
+            logger.exception("Task %s crashed: %s", lease.task_id, exc)
+        finally:
+            heartbeat.cancel()
+
+    async def _execute(self, lease: Lease) -> None:
+        job = await self.store.get(lease.task_id)
+        if job is None:
+            logger.warning("Task %s has no job record (expired?), dropping it", lease.task_id)
+            return
+        if lease.attempt > self.max_attempts:
+            logger.error("Task %s exceeded %s attempts, giving up", lease.task_id, self.max_attempts)
+            job = job.model_copy(update={
+                "status": JobStatus.FAILED,
+                "finished_at": time.time(),
+                "error": "Задача не выполнена: сбой обработчика",
+            })
+            await self.store.save(job)
+            if job.callback_url:
+                await notify_webhook(job)
+            return
+        if lease.attempt > 1:
+            logger.warning("Retrying task %s (attempt %s)", lease.task_id, lease.attempt)
+        payload = TaskPayload.from_bytes(lease.payload)
+        await execute_job(self.store, job, lambda: run_task(payload))
+
+    async def _heartbeat(self, lease: Lease) -> None:
+        while True:
+            await asyncio.sleep(self.lease_s / 3)
+            if not await self.queue.heartbeat(lease, self.lease_s):
+                logger.warning("Lost lease on task %s", lease.task_id)
+                return
+
+
+async def main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError):
+            loop.add_signal_handler(sig, stop.set)
+
+    worker = Worker(
+        create_task_queue(),
+        create_job_store(),
+        concurrency=settings.worker_concurrency,
+        lease_s=settings.task_lease_s,
+        poll_interval_s=settings.worker_poll_interval_s,
+        max_attempts=settings.task_max_attempts,
+    )
+    async with http_clients.lifespan():
+        await worker.run(stop)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())